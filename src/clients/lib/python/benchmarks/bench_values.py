@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+Micro-benchmarks for the conversions between python objects and xmmsv
+values done by the python bindings. No daemon is required.
+
+Run with PYTHONPATH pointing to a directory containing xmmsclient.
+"""
+
+import sys
+import timeit
+from array import array
+
+import xmmsclient
+
+def bench(name, stmt, number = 10):
+	t = min(timeit.repeat(stmt, number = number, repeat = 3)) / number
+	sys.stdout.write("%-40s %10.3f ms\n" % (name, t * 1000))
+
+def bench_create_native_value(size):
+	ids = list(range(size))
+	ids_array = array('i', ids)
+	strings = ["artist %d" % (i % 1000) for i in ids]
+	blob = b"\0" * (size * 8)
+	XmmsValue = xmmsclient.XmmsValue
+
+	bench("list of %d ints" % size, lambda: XmmsValue(pyval = ids))
+	bench("array('i') of %d ints" % size, lambda: XmmsValue(pyval = ids_array))
+	bench("memoryview of %d ints" % size, lambda: XmmsValue(pyval = memoryview(ids_array)))
+	bench("list of %d strings" % size, lambda: XmmsValue(pyval = strings))
+	bench("bytes of %d bytes" % len(blob), lambda: XmmsValue(pyval = blob))
+	bench("bytearray of %d bytes" % len(blob), lambda: XmmsValue(pyval = bytearray(blob)))
+
+def wrapper_value(xv):
+	"""
+	Convert a value the way it was done before the native converter: one
+	XmmsValue wrapper per node, through the list and dict iterators.
+	"""
+	t = xv.get_type()
+	if t == xmmsclient.VALUE_TYPE_LIST:
+		return [wrapper_value(v) for v in xv.get_list_iter()]
+	elif t == xmmsclient.VALUE_TYPE_DICT:
+		return dict([(k, wrapper_value(v)) for k, v in xv.get_dict_iter()])
+	return xv.value()
+
+def wrapper_propdict(xv):
+	ret = xmmsclient.PropDict(xv.sourcepref if hasattr(xv, 'sourcepref') else [])
+	for key, values in xv.get_dict_iter():
+		for source, value in values.get_dict_iter():
+			ret[(source, key)] = value.value()
+	return ret
+
+def bench_value_conversion(size):
+	rows = [dict(id = i, artist = "artist %d" % (i % 1000),
+			title = "title %d" % i, duration = i * 1000)
+			for i in range(size)]
+	infos = [dict((k, {"plugin/id3v2": v, "server": v}) for k, v in row.items())
+			for row in rows[:size // 100]]
+	XmmsValue = xmmsclient.XmmsValue
+	xrows = XmmsValue(pyval = rows)
+	xinfos = [XmmsValue(["server"], pyval = info) for info in infos]
+
+	bench("%d rows, wrapper per node" % size, lambda: wrapper_value(xrows), 3)
+	bench("%d rows, get_list()" % size, lambda: xrows.get_list(), 3)
+	bench("%d rows, get_columns()" % size, lambda: xrows.get_columns(), 3)
+	bench("%d propdicts, wrapper per node" % len(xinfos),
+			lambda: [wrapper_propdict(x) for x in xinfos], 3)
+	bench("%d propdicts, get_propdict()" % len(xinfos),
+			lambda: [x.get_propdict() for x in xinfos], 3)
+
+if __name__ == '__main__':
+	size = len(sys.argv) > 1 and int(sys.argv[1]) or 100000
+	bench_create_native_value(size)
+	bench_value_conversion(size)
@@ -81,8 +81,8 @@ cdef extern from "xmmsclient/xmmsclient.h":
 
 	void xmmsc_io_disconnect (xmmsc_connection_t *c)
 	bint xmmsc_io_want_out   (xmmsc_connection_t *c)
-	bint xmmsc_io_out_handle (xmmsc_connection_t *c)
-	bint xmmsc_io_in_handle  (xmmsc_connection_t *c)
+	bint xmmsc_io_out_handle (xmmsc_connection_t *c) nogil
+	bint xmmsc_io_in_handle  (xmmsc_connection_t *c) nogil
 	int  xmmsc_io_fd_get     (xmmsc_connection_t *c)
 
 	char *xmmsc_get_last_error (xmmsc_connection_t *c)
@@ -240,6 +240,7 @@ cdef extern from "xmmsclient/xmmsclient.h":
 	xmmsc_result_t *xmmsc_c2c_get_connected_clients (xmmsc_connection_t *c)
 	xmmsc_result_t *xmmsc_c2c_ready (xmmsc_connection_t *c)
 	xmmsc_result_t *xmmsc_c2c_get_ready_clients (xmmsc_connection_t *c)
+	xmmsc_result_t *xmmsc_c2c_get_message_stats (xmmsc_connection_t *c)
 
 	xmmsc_result_t *xmmsc_broadcast_c2c_message (xmmsc_connection_t *c)
 	xmmsc_result_t *xmmsc_broadcast_c2c_ready (xmmsc_connection_t *c)
@@ -252,6 +253,7 @@ cdef extern from "xmmsclient/xmmsclient.h":
 		XMMSC_SC_CALL
 		XMMSC_SC_BROADCAST_SUBSCRIBE
 		XMMSC_SC_INTROSPECT
+		XMMSC_SC_CALL_BATCH
 
 	# XXX Requires an explicit cast to <char *> when used
 	enum:
@@ -286,8 +288,13 @@ cdef extern from "xmmsclient/xmmsclient.h":
 	xmmsc_result_t *xmmsc_sc_broadcast_subscribe (xmmsc_connection_t *c, int dest, xmmsv_t *broadcast)
 
 	xmmsc_result_t *xmmsc_sc_call (xmmsc_connection_t *c, int dest, xmmsv_t *method, xmmsv_t *pargs, xmmsv_t *nargs)
+	xmmsc_result_t *xmmsc_sc_call_batch (xmmsc_connection_t *c, int dest, xmmsv_t *calls)
+	int xmmsc_sc_reply_defer (xmmsc_connection_t *c)
+	bint xmmsc_sc_reply_can_defer (xmmsc_connection_t *c)
+	bint xmmsc_sc_reply (xmmsc_connection_t *c, int msgid, xmmsv_t *value)
 
 	xmmsc_result_t *xmmsc_sc_introspect_namespace (xmmsc_connection_t *c, int dest, xmmsv_t *nms)
+	xmmsc_result_t *xmmsc_sc_introspect_namespace_recursive (xmmsc_connection_t *c, int dest, xmmsv_t *nms)
 	xmmsc_result_t *xmmsc_sc_introspect_method (xmmsc_connection_t *c, int dest, xmmsv_t *method)
 	xmmsc_result_t *xmmsc_sc_introspect_broadcast (xmmsc_connection_t *c, int dest, xmmsv_t *broadcast)
 	xmmsc_result_t *xmmsc_sc_introspect_constant (xmmsc_connection_t *c, int dest, xmmsv_t *nms, const_char *key)
@@ -305,6 +312,6 @@ cdef extern from "xmmsclient/xmmsclient.h":
 
 	void xmmsc_result_notifier_set      (xmmsc_result_t *res, xmmsc_result_notifier_t func, void *user_data)
 	void xmmsc_result_notifier_set_full (xmmsc_result_t *res, xmmsc_result_notifier_t func, void *user_data, xmmsc_user_data_free_func_t free_func)
-	void xmmsc_result_wait              (xmmsc_result_t *res)
+	void xmmsc_result_wait              (xmmsc_result_t *res) nogil
 
 	xmmsv_t *xmmsc_result_get_value (xmmsc_result_t *res)
@@ -75,7 +75,7 @@ cdef extern from "xmmsc/xmmsv.h":
 
 	xmmsv_t *xmmsv_new_none   ()
 	xmmsv_t *xmmsv_new_error  (char *errstr)
-	xmmsv_t *xmmsv_new_int    (int i)
+	xmmsv_t *xmmsv_new_int    (int64_t i)
 	xmmsv_t *xmmsv_new_string (char *s)
 	xmmsv_t *xmmsv_new_coll   (xmmsv_coll_type_t type)
 	xmmsv_t *xmmsv_new_bin    (unsigned char *data, unsigned int len)
@@ -122,7 +122,7 @@ cdef extern from "xmmsc/xmmsv.h":
 	bint xmmsv_list_insert_int    (xmmsv_t *v, int pos, int val)
 
 	bint xmmsv_list_append_string (xmmsv_t *v, const_char *val)
-	bint xmmsv_list_append_int    (xmmsv_t *v, int val)
+	bint xmmsv_list_append_int    (xmmsv_t *v, int64_t val)
 
 	xmmsv_t *xmmsv_list_flatten (xmmsv_t *list, int depth)
 
@@ -215,6 +215,7 @@ cdef extern from "xmmsc/xmmsv.h":
 	bint               xmmsv_coll_is_type    (xmmsv_t *val, xmmsv_coll_type_t t)
 	xmmsv_coll_type_t  xmmsv_coll_get_type   (xmmsv_t *coll)
 	xmmsv_t           *xmmsv_coll_idlist_get (xmmsv_t *coll)
+	void               xmmsv_coll_idlist_set (xmmsv_t *coll, xmmsv_t *idlist)
 
 	void xmmsv_coll_attribute_set_string (xmmsv_t *coll, char *key, char *value)
 	void xmmsv_coll_attribute_set_int    (xmmsv_t *coll, char *key, int value)
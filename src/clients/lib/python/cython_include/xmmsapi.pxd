@@ -2,19 +2,23 @@ from xmmsvalue cimport Collection, XmmsValue
 from cxmmsvalue cimport *
 from cxmmsclient cimport *
 
-cdef bint ResultNotifier(xmmsv_t *res, void *o)
-cdef void ResultDestroyNotifier(void *o)
+cdef bint ResultNotifier(xmmsv_t *res, void *o) noexcept with gil
+cdef void ResultDestroyNotifier(void *o) noexcept with gil
 
 cdef class XmmsSourcePreference:
 	cdef object sources
 
 cdef class XmmsResult
 cdef class XmmsResultTracker:
-	cdef object results
+	cdef dict results
 
 	cdef track_result(self, XmmsResult r)
 	cdef release_result(self, XmmsResult r)
 	cdef disconnect_all(self, bint unset_result)
+	cdef _get_results(self, result_class)
+	cpdef counts(self)
+	cpdef pending(self, result_class=*)
+	cpdef oldest(self, result_class=*)
 
 cdef class XmmsResult:
 	cdef xmmsc_result_t *res
@@ -23,6 +27,8 @@ cdef class XmmsResult:
 	cdef XmmsSourcePreference source_pref
 	cdef int ispropdict
 	cdef XmmsResultTracker result_tracker
+	cdef object _trace
+	cdef bint _ready
 
 	cdef set_sourcepref(self, XmmsSourcePreference sourcepref)
 	cdef set_result(self, xmmsc_result_t *res)
@@ -30,9 +36,11 @@ cdef class XmmsResult:
 
 	cpdef disconnect(self)
 	cpdef wait(self)
+	cdef trace_completed(self)
+	cpdef is_ready(self)
 	cpdef is_error(self)
 	cpdef xmmsvalue(self)
-	cpdef value(self)
+	cpdef value(self, lazy=*)
 
 ctypedef int VisResultCommand
 cdef enum:
@@ -51,10 +59,16 @@ cdef class XmmsVisResult(XmmsResult):
 	cdef _start_xmmsvalue(self)
 	cpdef xmmsvalue(self)
 
+cdef enum:
+	VIS_CHUNK_MAX_SAMPLES = 2 * XMMSC_VISUALIZATION_WINDOW_SIZE
+
 cdef class XmmsVisChunk:
 	cdef short *data
 	cdef int sample_count
+	cdef Py_ssize_t shape[1]
+	cdef Py_ssize_t strides[1]
 
+	cdef short *get_storage(self) except NULL
 	cdef set_data(self, short *data, int sample_count)
 	cpdef get_buffer(self)
 	cpdef get_data(self)
@@ -80,7 +94,19 @@ cdef class service_broadcast:
 	cdef bind(self, XmmsServiceNamespace namespace, name=*)
 	cpdef emit(self, value=*)
 
-cdef xmmsv_t *service_method_proxy(xmmsv_t *pargs, xmmsv_t *nargs, void *udata)
+cdef class service_deferred:
+	cdef XmmsCore xmms
+	cdef readonly int msgid
+	cdef readonly bint done
+	cdef xmmsv_t *_reply
+
+	cpdef reply(self, value=*)
+	cpdef error(self, message)
+	cdef _resolve(self, xmmsv_t *val)
+	cdef _defer(self, XmmsCore xmms)
+	cdef xmmsv_t *_take_reply(self)
+
+cdef xmmsv_t *service_method_proxy(xmmsv_t *pargs, xmmsv_t *nargs, void *udata) noexcept with gil
 cdef xmmsc_sc_namespace_t *_namespace_get(xmmsc_connection_t *c, path, bint create)
 
 cdef class _XmmsServiceClient
@@ -116,8 +142,9 @@ cdef class XmmsCore:
 	cdef object disconnect_fun
 	cdef object needout_fun
 	cdef readonly XmmsSourcePreference source_preference
-	cdef XmmsResultTracker result_tracker
+	cdef readonly XmmsResultTracker result_tracker
 	cdef readonly object clientname
+	cdef public object instrumentation
 
 	cdef new_connection(self)
 	cpdef get_source_preference(self)
@@ -131,12 +158,12 @@ cdef class XmmsCore:
 	cpdef set_need_out_fun(self, fun)
 	cpdef get_fd(self)
 	cpdef connect(self, path=*, disconnect_func=*)
-	cdef XmmsResult _create_result(self, cb, xmmsc_result_t *res, Cls)
-	cdef XmmsResult create_result(self, cb, xmmsc_result_t *res)
-	cdef XmmsResult create_vis_result(self, cb, xmmsc_result_t *res, VisResultCommand cmd)
+	cdef XmmsResult _create_result(self, cb, xmmsc_result_t *res, Cls, name)
+	cdef XmmsResult create_result(self, cb, xmmsc_result_t *res, name=*)
+	cdef XmmsResult create_vis_result(self, cb, xmmsc_result_t *res, VisResultCommand cmd, name=*)
 
-cdef void python_need_out_fun(int i, void *obj)
-cdef void python_disconnect_fun(void *obj)
+cdef void python_need_out_fun(int i, void *obj) noexcept with gil
+cdef void python_disconnect_fun(void *obj) noexcept with gil
 cpdef userconfdir_get()
 
 cdef class XmmsApi(XmmsCore):
@@ -211,6 +238,7 @@ cdef class XmmsApi(XmmsCore):
 	cpdef XmmsResult coll_rename(self, oldname, newname, ns=*, cb=*)
 	cpdef XmmsResult coll_idlist_from_playlist_file(self, path, cb=*)
 	cpdef XmmsResult coll_query(self, Collection coll, fetch, cb=*)
+	cdef XmmsResult _medialib_infos_query(self, ids, fetch)
 	cpdef XmmsResult coll_query_ids(self, Collection coll, start=*, leng=*, order=*, cb=*)
 	cpdef XmmsResult coll_query_infos(self, Collection coll, fields, start=*, leng=*, order=*, groupby=*, cb=*)
 	#C2C
@@ -222,6 +250,7 @@ cdef class XmmsApi(XmmsCore):
 	cpdef XmmsResult c2c_ready(self, cb=*)
 	cpdef XmmsResult c2c_get_connected_clients(self, cb=*)
 	cpdef XmmsResult c2c_get_ready_clients(self, cb=*)
+	cpdef XmmsResult c2c_get_message_stats(self, cb=*)
 	cpdef XmmsResult broadcast_c2c_ready(self, cb=*)
 	cpdef XmmsResult broadcast_c2c_client_connected(self, cb=*)
 	cpdef XmmsResult broadcast_c2c_client_disconnected(self, cb=*)
@@ -230,7 +259,9 @@ cdef class XmmsApi(XmmsCore):
 	cpdef bint sc_broadcast_emit(self, broadcast, value=*)
 	cpdef XmmsResult sc_broadcast_subscribe(self, int dest, broadcast, cb=*)
 	cpdef XmmsResult sc_call(self, int dest, method, args=*, kargs=*, cb=*)
+	cpdef XmmsResult sc_call_batch(self, int dest, calls, cb=*)
 	cpdef XmmsResult sc_introspect_namespace(self, int dest, path=*, cb=*)
+	cpdef XmmsResult sc_introspect_namespace_recursive(self, int dest, path=*, cb=*)
 	cpdef XmmsResult sc_introspect_method(self, int dest, path, cb=*)
 	cpdef XmmsResult sc_introspect_broadcast(self, int dest, path, cb=*)
 	cpdef XmmsResult sc_introspect_constant(self, int dest, path, cb=*)
@@ -248,9 +279,13 @@ cdef class XmmsApi(XmmsCore):
 	cpdef bint visualization_errored(self, int handle)
 	cpdef XmmsResult visualization_property_set(self, int handle, key, value, cb=*)
 	cpdef XmmsResult visualization_properties_set(self, int handle, props=*, cb=*)
-	cpdef XmmsVisChunk visualization_chunk_get(self, int handle, int drawtime=*, bint blocking=*)
+	cpdef visualization_chunk_get(self, int handle, int drawtime=*, bint blocking=*, chunk=*)
 	cpdef visualization_shutdown(self, int handle)
 
 cdef class XmmsLoop(XmmsApi):
 	cdef bint do_loop
 	cdef object wakeup
+	cdef list timers
+	cdef long timer_seq
+
+	cdef _run_timers(self)
@@ -1,10 +1,25 @@
 #needs to reimport required symbols from .h files.
+from libc.stdint cimport int64_t, uint64_t
+from xmmsutils cimport const_char
+from cpython cimport array
 
 cdef extern from "xmmsc/xmmsv.h":
 	ctypedef struct xmmsv_t
 	ctypedef struct xmmsv_dict_iter_t
 	ctypedef struct xmmsv_list_iter_t
 
+cdef class XmmsStringCache:
+	cdef Py_ssize_t size
+	cdef uint64_t *hashes
+	cdef list keys
+	cdef list values
+	cdef readonly unsigned long long hits
+	cdef readonly unsigned long long misses
+
+	cdef lookup(self, const_char *s)
+	cpdef clear(self)
+	cpdef stats(self)
+
 cdef class XmmsValue:
 	cdef object sourcepref
 	cdef xmmsv_t *val
@@ -26,7 +41,11 @@ cdef class XmmsValue:
 	cpdef get_propdict(self)
 	cpdef get_list(self)
 	cpdef get_list_iter(self)
-	cpdef value(self)
+	cpdef get_columns(self, fields=*)
+	cpdef get_list_view(self)
+	cpdef get_dict_view(self)
+	cpdef value(self, lazy=*)
+	cpdef serialize(self)
 	cpdef copy(self, cls=*)
 
 cdef class XmmsValueC2C(XmmsValue):
@@ -42,6 +61,36 @@ cdef class XmmsDictIter:
 	cdef xmmsv_t *val
 	cdef xmmsv_dict_iter_t *it
 
+cdef class ColumnBuilder:
+	cdef int size
+	cdef int filled
+	cdef bytes name
+	cdef array.array ints
+	cdef list objs
+	cdef const_char *last
+	cdef object last_str
+
+	cdef set_int(self, int i, int64_t v)
+	cdef set_obj(self, int i, object v)
+	cdef set_value(self, int i, xmmsv_t *val, object sourcepref)
+	cdef to_list(self)
+	cdef column(self)
+
+cdef class XmmsListView:
+	cdef object sourcepref
+	cdef xmmsv_t *val
+
+	cdef set_value(self, xmmsv_t *value, object sourcepref)
+	cdef item(self, int i)
+	cpdef list(self)
+
+cdef class XmmsDictView:
+	cdef object sourcepref
+	cdef xmmsv_t *val
+
+	cdef set_value(self, xmmsv_t *value, object sourcepref)
+	cpdef dict(self)
+
 cdef class CollectionRef:
 	cdef xmmsv_t *coll
 
@@ -57,6 +106,9 @@ cdef class Collection(CollectionRef):
 	cdef init_operands(self)
 
 	cpdef copy(self)
+	cpdef serialize(self)
+	cpdef canonical(self)
+	cpdef structural_hash(self)
 
 cdef class CollectionAttributes(CollectionRef):
 	cpdef get_dict(self)
@@ -98,6 +150,7 @@ cdef class CollectionOperands(CollectionRef):
 
 
 cdef class CollectionIDList(CollectionRef):
+	cpdef array.array to_array(self)
 	cpdef append(self, int v)
 	cpdef extend(self, v)
 	cpdef insert(self, int v, int i)
@@ -105,6 +158,15 @@ cdef class CollectionIDList(CollectionRef):
 	cpdef pop(self, int i = *)
 	cpdef clear(self)
 
+cdef decode_string(const_char *s)
+cdef object native_value(xmmsv_t *val, object sourcepref)
+cdef list native_list(xmmsv_t *val, object sourcepref)
+cdef dict native_dict(xmmsv_t *val, object sourcepref)
+cdef native_propdict(xmmsv_t *val, object sourcepref)
+cdef view_value(xmmsv_t *val, object sourcepref)
+cdef serialize_native(xmmsv_t *val)
+cdef xmmsv_t *deserialize_native(object data) except NULL
 cdef create_coll(xmmsv_t *coll)
 cdef xmmsv_t *create_native_value(value) except NULL
+cdef xmmsv_t *create_native_list(object items) except NULL
 cdef get_default_source_pref()
@@ -5,12 +5,24 @@ Python bindings for XMMS2.
 # CImports
 from cpython.mem cimport PyMem_Malloc, PyMem_Free
 from cpython.bytes cimport PyBytes_FromStringAndSize
+from cpython.buffer cimport PyObject_GetBuffer, PyBuffer_Release, PyBUF_SIMPLE
+from cpython.buffer cimport PyBUF_WRITABLE, PyBUF_C_CONTIGUOUS, PyBUF_FORMAT, PyBUF_ND, PyBUF_STRIDES
+from libc.string cimport memcpy
 cimport cython
 from xmmsutils cimport from_unicode, to_unicode
 from cxmmsvalue cimport *
 from cxmmsclient cimport *
 from xmmsvalue cimport *
 
+from collections import OrderedDict
+from heapq import heappush, heappop
+from itertools import islice
+from operator import itemgetter
+try:
+	from time import monotonic as _monotonic
+except ImportError:
+	from time import time as _monotonic
+
 # The following constants are meant for interpreting the return value of
 # XMMS.playback_status ()
 PLAYBACK_STATUS_STOP  = XMMS_PLAYBACK_STATUS_STOP
@@ -44,6 +56,12 @@ COLLECTION_CHANGED_REMOVE = XMMS_COLLECTION_CHANGED_REMOVE
 PLAYBACK_SEEK_CUR = XMMS_PLAYBACK_SEEK_CUR
 PLAYBACK_SEEK_SET = XMMS_PLAYBACK_SEEK_SET
 
+VISUALIZATION_CHUNK_MAX_SAMPLES = VIS_CHUNK_MAX_SAMPLES
+
+RESULT_CLASS_DEFAULT   = XMMSC_RESULT_CLASS_DEFAULT
+RESULT_CLASS_SIGNAL    = XMMSC_RESULT_CLASS_SIGNAL
+RESULT_CLASS_BROADCAST = XMMSC_RESULT_CLASS_BROADCAST
+
 COLLECTION_NS_COLLECTIONS = to_unicode(<char *>XMMS_COLLECTION_NS_COLLECTIONS)
 COLLECTION_NS_PLAYLISTS = to_unicode(<char *>XMMS_COLLECTION_NS_PLAYLISTS)
 COLLECTION_NS_ALL = to_unicode(<char *>XMMS_COLLECTION_NS_ALL)
@@ -84,10 +102,13 @@ cdef char *check_namespace(object ns, bint can_be_all) except NULL:
 		raise ValueError("Bad namespace")
 	return n
 
-cdef bint ResultNotifier(xmmsv_t *res, void *o) noexcept:
-	cdef object xres
-	xres = <object> o
+cdef bint ResultNotifier(xmmsv_t *res, void *o) noexcept with gil:
+	cdef XmmsResult xres
+	xres = <XmmsResult> o
+	xres._ready = True
 	try:
+		if xres._trace is not None:
+			xres.trace_completed()
 		return xres()
 	except:
 		import traceback, sys
@@ -95,10 +116,18 @@ cdef bint ResultNotifier(xmmsv_t *res, void *o) noexcept:
 		traceback.print_exception(*exc)
 		return False
 
-cdef void ResultDestroyNotifier(void *o) noexcept:
+cdef void ResultDestroyNotifier(void *o) noexcept with gil:
 	cdef XmmsResult obj
 	obj = <XmmsResult>o
 	obj._cb = None
+	if obj._trace is not None: # Disconnected before the reply came.
+		trace = obj._trace
+		obj._trace = None
+		try:
+			trace[0].abandoned(trace[1])
+		except:
+			import traceback, sys
+			traceback.print_exception(*sys.exc_info())
 	obj.result_tracker.release_result(obj)
 
 cdef class XmmsSourcePreference:
@@ -122,25 +151,81 @@ cdef class XmmsSourcePreference:
 cdef class XmmsResultTracker:
 	"""
 	Class used by XmmsCore to track results that set a notifier.
+
+	Results are kept by class (`RESULT_CLASS_DEFAULT`, `RESULT_CLASS_SIGNAL`
+	or `RESULT_CLASS_BROADCAST`) in the order they were tracked, which also
+	allows to inspect the requests still in flight.
 	"""
-	#cdef object results
+	#cdef dict results
 
 	def __cinit__(self):
-		self.results = []
+		self.results = {
+			XMMSC_RESULT_CLASS_DEFAULT: OrderedDict(),
+			XMMSC_RESULT_CLASS_SIGNAL: OrderedDict(),
+			XMMSC_RESULT_CLASS_BROADCAST: OrderedDict()
+		}
 
 	cdef track_result(self, XmmsResult r):
-		self.results.append(r)
+		self.results[xmmsc_result_get_class(r.res)][r] = _monotonic()
 
 	cdef release_result(self, XmmsResult r):
-		self.results.remove(r)
+		for results in self.results.values():
+			if results.pop(r, None) is not None:
+				break
 
 	cdef disconnect_all(self, bint unset_result):
 		cdef XmmsResult r
-		for r in self.results[:]: # Create a copy because r.disconnect() will remove the result from the list.
-			r.disconnect()
-			if unset_result: #This would become useless if results didn't xmmsc_ref() the connection.
-				xmmsc_result_unref(r.res)
-				r.res = NULL
+		for results in self.results.values():
+			for r in list(results): # Create a copy because r.disconnect() will remove the result.
+				r.disconnect()
+				if unset_result: #This would become useless if results didn't xmmsc_ref() the connection.
+					xmmsc_result_unref(r.res)
+					r.res = NULL
+
+	cdef _get_results(self, result_class):
+		try:
+			return self.results[result_class]
+		except KeyError:
+			raise ValueError("Bad result class")
+
+	def __len__(self):
+		return sum([len(results) for results in self.results.values()])
+
+	cpdef counts(self):
+		"""
+		:return: A dict mapping each result class to the number of results
+		         of that class being tracked.
+		"""
+		return dict([(c, len(results)) for c, results in self.results.items()])
+
+	cpdef pending(self, result_class = None):
+		"""
+		:param result_class: Only list results of that class.
+		:return: A list of (result, age) tuples, oldest first, age being the
+		         number of seconds elapsed since the result was tracked.
+		"""
+		now = _monotonic()
+		if result_class is None:
+			items = []
+			for results in self.results.values():
+				items.extend(results.items())
+			items.sort(key = itemgetter(1))
+		else:
+			items = self._get_results(result_class).items()
+		return [(r, now - t) for r, t in items]
+
+	cpdef oldest(self, result_class = XMMSC_RESULT_CLASS_DEFAULT):
+		"""
+		:param result_class: The class of result to look at. Defaults to
+		                     regular requests, broadcasts and signals
+		                     being long-lived by design.
+		:return: A (result, age) tuple for the oldest tracked result of that
+		         class, or None.
+		"""
+		results = self._get_results(result_class)
+		for r, t in results.items():
+			return (r, _monotonic() - t)
+		return None
 
 cdef class XmmsResult:
 	"""
@@ -152,11 +237,14 @@ cdef class XmmsResult:
 	#cdef XmmsSourcePreference source_pref
 	#cdef int ispropdict
 	#cdef XmmsResultTracker result_tracker
+	#cdef object _trace
+	#cdef bint _ready
 
 	def __cinit__(self):
 		self.res = NULL
 		self.ispropdict = 0
 		self._cb_issetup = False
+		self._ready = False
 
 	def __dealloc__(self):
 		if self.res != NULL:
@@ -174,7 +262,11 @@ cdef class XmmsResult:
 		if cb is not None and not hasattr(cb, '__call__'):
 			raise TypeError("Type '%s' is not callable" % cb.__class__.__name__)
 		self._cb = cb
-		if cb is not None and not self._cb_issetup:
+		if self._cb_issetup:
+			return
+		# Single replies are always notified, so that a result can tell it
+		# is ready even if it had no callback meanwhile.
+		if cb is not None or xmmsc_result_get_class(self.res) == XMMSC_RESULT_CLASS_DEFAULT:
 			self.result_tracker = rt
 			rt.track_result(self)
 			xmmsc_result_notifier_set_full(self.res, ResultNotifier, <void *> self, ResultDestroyNotifier)
@@ -190,6 +282,36 @@ cdef class XmmsResult:
 	property callback:
 		def __get__(self):
 			return self._cb
+		def __set__(self, cb):
+			if self.result_tracker is None:
+				raise RuntimeError("Uninitialized result")
+			self.set_callback(self.result_tracker, cb)
+
+	cpdef is_ready(self):
+		"""
+		:return: Whether a reply has been received. Broadcasts and signals
+		         are only seen once they have a callback.
+		"""
+		return self._ready
+
+	def __await__(self):
+		"""
+		Wait for the result from a coroutine. The connection has to be
+		driven by an asyncio event loop, see `xmmsclient.aio`.
+
+		:return: The value of the result.
+		:raise XmmsError: If the result is an error.
+		"""
+		from xmmsclient.aio import result_future
+		return result_future(self).__await__()
+
+	def __aiter__(self):
+		"""
+		Iterate over the values of a broadcast or signal from a coroutine,
+		see `xmmsclient.aio`.
+		"""
+		from xmmsclient.aio import XmmsResultIterator
+		return XmmsResultIterator(self)
 
 	# XXX Kept for compatibility.
 	@deprecated
@@ -215,11 +337,24 @@ cdef class XmmsResult:
 	cpdef wait(self):
 		"""
 		Wait for the result from the daemon.
+
+		Other threads may run while waiting, but the connection must not
+		be used by any of them in the meantime. Use one connection per
+		thread instead, e.g. from an `XmmsPool`.
 		"""
 		if self.res == NULL:
 			raise RuntimeError("Uninitialized result")
 
-		xmmsc_result_wait(self.res)
+		with nogil:
+			xmmsc_result_wait(self.res)
+
+		if self._trace is not None:
+			self.trace_completed()
+
+	cdef trace_completed(self):
+		trace = self._trace
+		self._trace = None
+		trace[0].completed(trace[1], XmmsResult.xmmsvalue(self))
 
 	cpdef is_error(self):
 		"""
@@ -257,8 +392,14 @@ cdef class XmmsResult:
 		"""
 		return self.xmmsvalue()
 
-	cpdef value(self):
-		return self.xmmsvalue().value()
+	cpdef value(self, lazy = False):
+		"""
+		:param lazy: If true, lists and dicts are returned as read-only views
+		             converting their content only when accessed. See
+		             `XmmsValue.value`.
+		:return: The value of the result.
+		"""
+		return self.xmmsvalue().value(lazy)
 
 
 cdef class XmmsVisResult(XmmsResult):
@@ -329,8 +470,19 @@ cdef class XmmsVisResult(XmmsResult):
 			return XmmsResult.xmmsvalue(self)
 
 cdef class XmmsVisChunk:
+	"""
+	A chunk of visualization data.
+
+	The samples are exposed through the buffer protocol as native shorts,
+	so that e.g. ``numpy.frombuffer(chunk, dtype = numpy.int16)`` works
+	without copying. A chunk can be passed back to
+	`XmmsApi.visualization_chunk_get` to be refilled in place; objects
+	sharing its buffer then see the new samples.
+	"""
 	#cdef short *data
 	#cdef int sample_count
+	#cdef Py_ssize_t shape[1]
+	#cdef Py_ssize_t strides[1]
 
 	def __cinit__(self):
 		self.data = NULL
@@ -340,20 +492,48 @@ cdef class XmmsVisChunk:
 		if self.data != NULL:
 			PyMem_Free(self.data)
 
-	cdef set_data(self, short *data, int sample_count):
-		if self.data != NULL:
-			PyMem_Free(self.data)
-			self.sample_count = 0
-		self.data = <short *>PyMem_Malloc(sizeof (short) * sample_count)
+	cdef short *get_storage(self) except NULL:
+		"""
+		Get the chunk storage, allocated once with room for the largest
+		chunk so that it never moves.
+		"""
 		if self.data == NULL:
-			raise RuntimeError("Failed to initialize chunk data")
-		for i in range(sample_count):
-			self.data[i] = data[i]
+			self.data = <short *>PyMem_Malloc(sizeof (short) * VIS_CHUNK_MAX_SAMPLES)
+			if self.data == NULL:
+				raise RuntimeError("Failed to initialize chunk data")
+		return self.data
+
+	cdef set_data(self, short *data, int sample_count):
+		if sample_count > VIS_CHUNK_MAX_SAMPLES:
+			raise ValueError("Too many samples for a chunk")
+		memcpy(self.get_storage(), data, sizeof (short) * sample_count)
 		self.sample_count = sample_count
 
 	def __len__(self):
 		return self.sample_count
 
+	def __getbuffer__(self, Py_buffer *buffer, int flags):
+		if self.data == NULL:
+			raise BufferError("chunk data not initialized")
+		self.shape[0] = self.sample_count
+		self.strides[0] = sizeof (short)
+		buffer.buf = <char *>self.data
+		buffer.obj = self
+		buffer.len = sizeof (short) * self.sample_count
+		buffer.readonly = 0
+		buffer.itemsize = sizeof (short)
+		buffer.format = NULL
+		if flags & PyBUF_FORMAT:
+			buffer.format = b"h"
+		buffer.ndim = 1
+		buffer.shape = self.shape if flags & PyBUF_ND else NULL
+		buffer.strides = self.strides if flags & PyBUF_STRIDES else NULL
+		buffer.suboffsets = NULL
+		buffer.internal = NULL
+
+	def __releasebuffer__(self, Py_buffer *buffer):
+		pass
+
 	cpdef get_buffer(self):
 		"""
 		Get the chunk buffer
@@ -455,6 +635,129 @@ class service_constant:
 	def __init__(self, value):
 		self.value = value
 
+cdef class service_deferred:
+	"""
+	The pending reply to a service method call.
+
+	A method decorated with `service_method` may return one instead of a
+	value, and call `reply` or `error` later, e.g. from the callback of a
+	request to the daemon, so that other calls are handled in the
+	meantime. Returning an `XmmsResult` without a callback replies with its
+	value, and coroutines or other awaitables are run on the asyncio event
+	loop, which then has to drive the connection (see `xmmsclient.aio`).
+	Calls which are part of a batch can't be replied to later.
+	"""
+	#cdef XmmsCore xmms
+	#cdef readonly int msgid
+	#cdef readonly bint done
+	#cdef xmmsv_t *_reply
+
+	def __cinit__(self):
+		self.msgid = 0
+		self.done = False
+		self._reply = NULL
+
+	def __dealloc__(self):
+		if self._reply != NULL:
+			xmmsv_unref(self._reply)
+			self._reply = NULL
+
+	cpdef reply(self, value = None):
+		"""
+		Reply to the call with a value.
+		"""
+		self._resolve(create_native_value(value))
+
+	cpdef error(self, message):
+		"""
+		Reply to the call with an error.
+		"""
+		s = from_unicode("%s" % message)
+		self._resolve(xmmsv_new_error(<char *>s))
+
+	cdef _resolve(self, xmmsv_t *val):
+		if self.done:
+			xmmsv_unref(val)
+			raise RuntimeError("The call has already been replied to")
+		self.done = True
+		if self.xmms is None:
+			# Not returned by the method yet.
+			self._reply = val
+			return
+		xmmsc_sc_reply(self.xmms.conn, self.msgid, val)
+		xmmsv_unref(val)
+		self.xmms = None
+
+	cdef _defer(self, XmmsCore xmms):
+		if self.xmms is not None:
+			raise RuntimeError("The reply is already deferred to another call")
+		_check_can_defer(xmms)
+		self.msgid = xmmsc_sc_reply_defer(xmms.conn)
+		self.xmms = xmms
+
+	cdef xmmsv_t *_take_reply(self):
+		cdef xmmsv_t *val
+		val = self._reply
+		self._reply = NULL
+		return val
+
+	def _result_ready(self, xvalue):
+		if xvalue.is_error():
+			self.error(xvalue.get_error())
+		else:
+			self.reply(xvalue.value())
+		return False
+
+	def _future_done(self, fut):
+		if fut.cancelled():
+			self.error("Cancelled")
+		elif fut.exception() is not None:
+			self.error(fut.exception())
+		else:
+			try:
+				self.reply(fut.result())
+			except Exception as e:
+				self.error(e)
+
+cdef _check_can_defer(XmmsCore xmms):
+	if not xmmsc_sc_reply_can_defer(xmms.conn):
+		raise RuntimeError("Failed to defer the reply, batched calls cannot defer")
+
+cdef service_deferred _service_deferred_from(obj, XmmsCore xmms):
+	# Nothing may be scheduled before the call is known to be deferrable,
+	# it would otherwise go on without anything to reply to.
+	cdef service_deferred deferred
+	if isinstance(obj, service_deferred):
+		return obj
+	if isinstance(obj, XmmsResult):
+		if obj.callback is not None:
+			raise TypeError("Cannot reply with a result that already has a callback")
+		deferred = service_deferred()
+		if obj.is_ready():
+			deferred._result_ready(obj.xmmsvalue())
+			return deferred
+		_check_can_defer(xmms)
+		obj.callback = deferred._result_ready
+		return deferred
+	if hasattr(obj, '__await__'):
+		import asyncio
+		try:
+			loop = asyncio.get_running_loop()
+		except RuntimeError:
+			loop = None
+		try:
+			if loop is None:
+				raise TypeError("Cannot reply with an awaitable, the connection is not driven by an asyncio event loop")
+			_check_can_defer(xmms)
+		except:
+			if hasattr(obj, 'close'):
+				obj.close()
+			raise
+		deferred = service_deferred()
+		asyncio.ensure_future(obj, loop = loop).add_done_callback(deferred._future_done)
+		return deferred
+	return None
+
 cdef class XmmsServiceNamespace:
 	namespace_path = ()
 
@@ -614,9 +917,11 @@ cdef class XmmsServiceNamespace:
 
 		# We need this to prevent bound function wrapper to be recycled on
 		# return, leading to weird behaviour
-		self._bound_methods[name] = meth
+		# The connection is passed along to defer replies.
+		udata = (meth, self.xmms)
+		self._bound_methods[name] = udata
 
-		xmmsc_sc_namespace_add_method(ns, service_method_proxy, <char *>name, <char *>doc, positional, named, va_pos, va_named, <void *>meth)
+		xmmsc_sc_namespace_add_method(ns, service_method_proxy, <char *>name, <char *>doc, positional, named, va_pos, va_named, <void *>udata)
 		xmmsv_unref(positional)
 		xmmsv_unref(named)
 
@@ -670,20 +975,32 @@ cdef xmmsc_sc_namespace_t *_namespace_get(xmmsc_connection_t *c, path, bint crea
 
 	return ns
 
-cdef xmmsv_t *service_method_proxy(xmmsv_t *pargs, xmmsv_t *nargs, void *udata) noexcept:
+cdef xmmsv_t *service_method_proxy(xmmsv_t *pargs, xmmsv_t *nargs, void *udata) noexcept with gil:
 	cdef object method
+	cdef XmmsCore xmms
 	cdef XmmsValue args
 	cdef XmmsValue kargs
+	cdef service_deferred deferred
 	cdef xmmsv_t *res
 
-	method = <object> udata
+	method, xmms = <object> udata
 	args = XmmsValue()
 	args.set_value(pargs)
 	kargs = XmmsValue()
 	kargs.set_value(nargs)
 	try:
 		ret = method(*args.get_list(), **kargs.get_dict())
-		res = create_native_value(ret)
+		deferred = _service_deferred_from(ret, xmms)
+		if deferred is None:
+			res = create_native_value(ret)
+		elif deferred.done:
+			res = deferred._take_reply()
+			if res == NULL:
+				raise RuntimeError("The call has already been replied to")
+		else:
+			# The reply is sent when the deferred is resolved.
+			deferred._defer(xmms)
+			res = NULL
 	except:
 		import traceback, sys
 		exc = sys.exc_info()
@@ -788,6 +1105,9 @@ class XmmsServiceClient(_XmmsServiceClient):
 		else:
 			return
 
+		self._set_description(payload, recursive, cb)
+
+	def _set_description(self, payload, recursive = False, cb = None):
 		self.__doc__ = payload.get('docstring', '')
 
 		try:
@@ -821,13 +1141,21 @@ class XmmsServiceClient(_XmmsServiceClient):
 			setattr(self, name, client_method(self, name, doc, m))
 
 		for ns in payload.get('namespaces', []):
+			desc = None
+			if isinstance(ns, dict): # Recursive introspection
+				desc = ns
+				ns = desc.get('name')
+				if not ns:
+					continue
 			if hasattr(self.__class__, ns):
 				continue
 			sc = XmmsServiceClient(self._xmms, self._clientid,
 					path = self._path + (ns,),
 					_async = self._async)
 			setattr(self, ns, sc)
-			if recursive:
+			if desc is not None:
+				sc._set_description(desc)
+			elif recursive:
 				sc(recursive, cb)
 
 	def _update_api_callback(self, cb = None, recursive = False):
@@ -838,9 +1166,23 @@ class XmmsServiceClient(_XmmsServiceClient):
 		return _update_api
 
 	def __call__(self, recursive = False, cb = None):
+		"""
+		Retrieve the API of the namespace.
+
+		:param recursive: Whether to retrieve the subnamespaces as well.
+		                  The whole tree comes in a single reply, unless the
+		                  remote client does not support recursive
+		                  introspection, in which case each subnamespace is
+		                  introspected in turn and cb called for each.
+		:param cb: Called as cb(namespace, xvalue) once the API is known.
+		"""
 		cdef XmmsResult res
 		cb = self._update_api_callback(cb, recursive)
-		res = self._xmms.sc_introspect_namespace(self._clientid, self._path, cb = self._async and cb or None)
+		if recursive:
+			introspect = self._xmms.sc_introspect_namespace_recursive
+		else:
+			introspect = self._xmms.sc_introspect_namespace
+		res = introspect(self._clientid, self._path, cb = self._async and cb or None)
 
 		if self._async:
 			return res
@@ -852,12 +1194,12 @@ class XmmsServiceClient(_XmmsServiceClient):
 		cb(xvalue)
 
 
-cdef void python_need_out_fun(int i, void *obj) noexcept:
+cdef void python_need_out_fun(int i, void *obj) noexcept with gil:
 	cdef object o
 	o = <object> obj
 	o._needout_cb(i)
 
-cdef void python_disconnect_fun(void *obj) noexcept:
+cdef void python_disconnect_fun(void *obj) noexcept with gil:
 	cdef object o
 	o = <object> obj
 	o._disconnect_cb()
@@ -899,14 +1241,18 @@ cdef class XmmsCore:
 	"""
 	This is the class representing the XMMS2 client itself. The methods in
 	this class may be used to control and interact with XMMS2.
+
+	Requests can be measured by setting the instrumentation attribute,
+	see `xmmsclient.instrument`.
 	"""
 	#cdef xmmsc_connection_t *conn
 	#cdef int isconnected
 	#cdef object disconnect_fun
 	#cdef object needout_fun
 	#cdef readonly XmmsSourcePreference source_preference
-	#cdef XmmsResultTracker result_tracker
+	#cdef readonly XmmsResultTracker result_tracker
 	#cdef readonly object clientname
+	#cdef public object instrumentation
 
 	def __cinit__(self, *args, **kargs): #Trick to allow subclass with init arguments
 		"""
@@ -970,16 +1316,26 @@ cdef class XmmsCore:
 		Read data from the daemon, when available.
 		Note: This is a low level function that should only be used in
 		certain circumstances. e.g. a custom event loop
+
+		Other threads may run meanwhile, but must not use the connection.
 		"""
-		return xmmsc_io_in_handle(self.conn)
+		cdef bint ret
+		with nogil:
+			ret = xmmsc_io_in_handle(self.conn)
+		return ret
 
 	cpdef ioout(self):
 		"""
 		Write data out to the daemon, when available. Note: This is a
 		low level function that should only be used in certain
 		circumstances. e.g. a custom event loop
+
+		Other threads may run meanwhile, but must not use the connection.
 		"""
-		return xmmsc_io_out_handle(self.conn)
+		cdef bint ret
+		with nogil:
+			ret = xmmsc_io_out_handle(self.conn)
+		return ret
 
 	cpdef want_ioout(self):
 		"""
@@ -1039,22 +1395,25 @@ cdef class XmmsCore:
 	def is_connected(self):
 		return self.isconnected != 0
 
-	cdef XmmsResult _create_result(self, cb, xmmsc_result_t *res, Cls):
+	cdef XmmsResult _create_result(self, cb, xmmsc_result_t *res, Cls, name):
 		cdef XmmsResult ret
 		if res == NULL:
 			raise RuntimeError("xmmsc_result_t couldn't be allocated")
 		ret = Cls()
 		ret.set_sourcepref(self.source_preference)
 		ret.set_result(res)
-		if cb is not None:
-			ret.set_callback(self.result_tracker, cb) # property that setup all.
+		ret.result_tracker = self.result_tracker
+		instrumentation = self.instrumentation
+		if instrumentation is not None and xmmsc_result_get_class(res) == XMMSC_RESULT_CLASS_DEFAULT:
+			ret._trace = (instrumentation, instrumentation.issued(name))
+		ret.set_callback(self.result_tracker, cb) # property that setup all.
 		return ret
 
-	cdef XmmsResult create_result(self, cb, xmmsc_result_t *res):
-		return self._create_result(cb, res, XmmsResult)
+	cdef XmmsResult create_result(self, cb, xmmsc_result_t *res, name = None):
+		return self._create_result(cb, res, XmmsResult, name)
 
-	cdef XmmsResult create_vis_result(self, cb, xmmsc_result_t *res, VisResultCommand cmd):
-		cdef XmmsVisResult vres = self._create_result(cb, res, XmmsVisResult)
+	cdef XmmsResult create_vis_result(self, cb, xmmsc_result_t *res, VisResultCommand cmd, name = None):
+		cdef XmmsVisResult vres = self._create_result(cb, res, XmmsVisResult, name)
 		vres.set_command(cmd, self.conn)
 		return vres
 
@@ -1073,7 +1432,7 @@ cdef class XmmsApi(XmmsCore):
 
 		:return: The result of the operation.
 		"""
-		return self.create_result(cb, xmmsc_quit(self.conn))
+		return self.create_result(cb, xmmsc_quit(self.conn), "quit")
 
 	cpdef XmmsResult plugin_list(self, typ, cb = None):
 		"""
@@ -1081,7 +1440,7 @@ cdef class XmmsApi(XmmsCore):
 
 		:return: The result of the operation.
 		"""
-		return self.create_result(cb, xmmsc_main_list_plugins(self.conn, typ))
+		return self.create_result(cb, xmmsc_main_list_plugins(self.conn, typ), "plugin_list")
 
 	cpdef XmmsResult playback_start(self, cb = None):
 		"""
@@ -1090,7 +1449,7 @@ cdef class XmmsApi(XmmsCore):
 
 		:return: The result of the operation.
 		"""
-		return self.create_result(cb, xmmsc_playback_start(self.conn))
+		return self.create_result(cb, xmmsc_playback_start(self.conn), "playback_start")
 
 	cpdef XmmsResult playback_stop(self, cb = None):
 		"""
@@ -1099,7 +1458,7 @@ cdef class XmmsApi(XmmsCore):
 
 		:return: The result of the operation.
 		"""
-		return self.create_result(cb, xmmsc_playback_stop(self.conn))
+		return self.create_result(cb, xmmsc_playback_stop(self.conn), "playback_stop")
 
 	cpdef XmmsResult playback_tickle(self, cb = None):
 		"""
@@ -1107,7 +1466,7 @@ cdef class XmmsApi(XmmsCore):
 
 		:return: The result of the operation.
 		"""
-		return self.create_result(cb, xmmsc_playback_tickle(self.conn))
+		return self.create_result(cb, xmmsc_playback_tickle(self.conn), "playback_tickle")
 
 	cpdef XmmsResult playback_pause(self, cb = None):
 		"""
@@ -1115,14 +1474,14 @@ cdef class XmmsApi(XmmsCore):
 
 		:return: The result of the operation.
 		"""
-		return self.create_result(cb, xmmsc_playback_pause(self.conn))
+		return self.create_result(cb, xmmsc_playback_pause(self.conn), "playback_pause")
 
 	cpdef XmmsResult playback_current_id(self, cb = None):
 		"""
 
 		:return: The medialib id of the item currently selected.
 		"""
-		return self.create_result(cb, xmmsc_playback_current_id(self.conn))
+		return self.create_result(cb, xmmsc_playback_current_id(self.conn), "playback_current_id")
 
 	cpdef XmmsResult playback_seek_ms(self, int ms, xmms_playback_seek_mode_t whence = PLAYBACK_SEEK_SET, cb = None):
 		"""
@@ -1131,7 +1490,7 @@ cdef class XmmsApi(XmmsCore):
 		:return: The result of the operation.
 		"""
 		if whence == PLAYBACK_SEEK_SET or whence == PLAYBACK_SEEK_CUR:
-			return self.create_result(cb, xmmsc_playback_seek_ms(self.conn, ms, whence))
+			return self.create_result(cb, xmmsc_playback_seek_ms(self.conn, ms, whence), "playback_seek_ms")
 		else:
 			raise ValueError("Bad whence parameter")
 
@@ -1142,7 +1501,7 @@ cdef class XmmsApi(XmmsCore):
 		:return: The result of the operation.
 		"""
 		if whence == PLAYBACK_SEEK_SET or whence == PLAYBACK_SEEK_CUR:
-			return self.create_result(cb, xmmsc_playback_seek_samples(self.conn, samples, whence))
+			return self.create_result(cb, xmmsc_playback_seek_samples(self.conn, samples, whence), "playback_seek_samples")
 		else:
 			raise ValueError("Bad whence parameter")
 
@@ -1156,21 +1515,21 @@ cdef class XmmsApi(XmmsCore):
 
 		:return: Current playback status
 		"""
-		return self.create_result(cb, xmmsc_playback_status(self.conn))
+		return self.create_result(cb, xmmsc_playback_status(self.conn), "playback_status")
 
 	cpdef XmmsResult broadcast_playback_status(self, cb = None):
 		"""
 		Set a method to handle the playback status broadcast from the
 		XMMS2 daemon.
 		"""
-		return self.create_result(cb, xmmsc_broadcast_playback_status(self.conn))
+		return self.create_result(cb, xmmsc_broadcast_playback_status(self.conn), "broadcast_playback_status")
 
 	cpdef XmmsResult broadcast_playback_current_id(self, cb = None):
 		"""
 		Set a method to handle the playback id broadcast from the
 		XMMS2 daemon.
 		"""
-		return self.create_result(cb, xmmsc_broadcast_playback_current_id(self.conn))
+		return self.create_result(cb, xmmsc_broadcast_playback_current_id(self.conn), "broadcast_playback_current_id")
 
 	cpdef XmmsResult playback_playtime(self, cb = None):
 		"""
@@ -1179,39 +1538,39 @@ cdef class XmmsApi(XmmsCore):
 
 		:return: The result of the operation (playtime in milliseconds).
 		"""
-		return self.create_result(cb, xmmsc_playback_playtime(self.conn))
+		return self.create_result(cb, xmmsc_playback_playtime(self.conn), "playback_playtime")
 
 	cpdef XmmsResult signal_playback_playtime(self, cb = None):
 		"""
 		Set a method to handle the playback playtime signal from the
 		XMMS2 daemon.
 		"""
-		return self.create_result(cb, xmmsc_signal_playback_playtime(self.conn))
+		return self.create_result(cb, xmmsc_signal_playback_playtime(self.conn), "signal_playback_playtime")
 
 	cpdef XmmsResult playback_volume_set(self, channel, int volume, cb = None):
 		"""
 		Set the playback volume for specified channel
 		"""
 		c = from_unicode(channel)
-		return self.create_result(cb, xmmsc_playback_volume_set(self.conn, c, volume))
+		return self.create_result(cb, xmmsc_playback_volume_set(self.conn, c, volume), "playback_volume_set")
 
 	cpdef XmmsResult playback_volume_get(self, cb = None):
 		"""
 		Get the playback for all channels
 		"""
-		return self.create_result(cb, xmmsc_playback_volume_get(self.conn))
+		return self.create_result(cb, xmmsc_playback_volume_get(self.conn), "playback_volume_get")
 
 	cpdef XmmsResult broadcast_playback_volume_changed(self, cb = None):
 		"""
 		Set a broadcast callback for volume updates
 		"""
-		return self.create_result(cb, xmmsc_broadcast_playback_volume_changed(self.conn))
+		return self.create_result(cb, xmmsc_broadcast_playback_volume_changed(self.conn), "broadcast_playback_volume_changed")
 
 	cpdef XmmsResult broadcast_playlist_loaded(self, cb = None):
 		"""
 		Set a broadcast callback for loaded playlist event
 		"""
-		return self.create_result(cb, xmmsc_broadcast_playlist_loaded(self.conn))
+		return self.create_result(cb, xmmsc_broadcast_playlist_loaded(self.conn), "broadcast_playlist_loaded")
 
 	cpdef XmmsResult playlist_load(self, playlist, cb = None):
 		"""
@@ -1220,7 +1579,7 @@ cdef class XmmsApi(XmmsCore):
 		:return: The result of the operation.
 		"""
 		p = check_playlist(playlist, False)
-		return self.create_result(cb, xmmsc_playlist_load(self.conn, <char *>p))
+		return self.create_result(cb, xmmsc_playlist_load(self.conn, <char *>p), "playlist_load")
 
 	cpdef XmmsResult playlist_list(self, cb = None):
 		"""
@@ -1228,7 +1587,7 @@ cdef class XmmsApi(XmmsCore):
 
 		:return: The result of the operation.
 		"""
-		return self.create_result(cb, xmmsc_playlist_list(self.conn))
+		return self.create_result(cb, xmmsc_playlist_list(self.conn), "playlist_list")
 
 	cpdef XmmsResult playlist_remove(self, playlist, cb = None):
 		"""
@@ -1237,7 +1596,7 @@ cdef class XmmsApi(XmmsCore):
 		:return: The result of the operation.
 		"""
 		p = check_playlist(playlist, False)
-		return self.create_result(cb, xmmsc_playlist_remove(self.conn, <char *>p))
+		return self.create_result(cb, xmmsc_playlist_remove(self.conn, <char *>p), "playlist_remove")
 
 	cpdef XmmsResult playlist_shuffle(self, playlist = None, cb = None):
 		"""
@@ -1246,7 +1605,7 @@ cdef class XmmsApi(XmmsCore):
 		:return: The result of the operation.
 		"""
 		p = check_playlist(playlist, True)
-		return self.create_result(cb, xmmsc_playlist_shuffle(self.conn, <char *>p))
+		return self.create_result(cb, xmmsc_playlist_shuffle(self.conn, <char *>p), "playlist_shuffle")
 
 	cpdef XmmsResult playlist_rinsert(self, int pos, url, playlist = None, cb = None, encoded = False):
 		"""
@@ -1264,7 +1623,7 @@ cdef class XmmsApi(XmmsCore):
 			res = xmmsc_playlist_rinsert_encoded(self.conn, <char *>p, pos, <char *>c)
 		else:
 			res = xmmsc_playlist_rinsert(self.conn, <char *>p, pos, <char *>c)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "playlist_rinsert")
 
 	@deprecated
 	def playlist_rinsert_encoded(self, int pos, url, playlist = None, cb = None):
@@ -1290,7 +1649,7 @@ cdef class XmmsApi(XmmsCore):
 			res = xmmsc_playlist_insert_encoded(self.conn, <char *>p, pos, <char *>c)
 		else:
 			res = xmmsc_playlist_insert_url(self.conn, <char *>p, pos, <char *>c)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "playlist_insert_url")
 
 	@deprecated
 	def playlist_insert_encoded(self, int pos, url, playlist = None, cb = None):
@@ -1308,7 +1667,7 @@ cdef class XmmsApi(XmmsCore):
 		:return: The result of the operation.
 		"""
 		p = check_playlist(playlist, True)
-		return self.create_result(cb, xmmsc_playlist_insert_id(self.conn, <char *>p, pos, id))
+		return self.create_result(cb, xmmsc_playlist_insert_id(self.conn, <char *>p, pos, id), "playlist_insert_id")
 
 
 	cpdef XmmsResult playlist_insert_collection(self, int pos, Collection coll, order = None, playlist = None, cb = None):
@@ -1327,7 +1686,7 @@ cdef class XmmsApi(XmmsCore):
 		order_val = create_native_value(order)
 		res = xmmsc_playlist_insert_collection(self.conn, <char *>p, pos, coll.coll, order_val)
 		xmmsv_unref(order_val)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "playlist_insert_collection")
 
 	cpdef XmmsResult playlist_radd(self, url, playlist = None, cb = None, encoded = False):
 		"""
@@ -1344,7 +1703,7 @@ cdef class XmmsApi(XmmsCore):
 			res = xmmsc_playlist_radd_encoded(self.conn, <char *>p, <char *>c)
 		else:
 			res = xmmsc_playlist_radd(self.conn, <char *>p, <char *>c)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "playlist_radd")
 
 	@deprecated
 	def playlist_radd_encoded(self, url, playlist = None, cb = None):
@@ -1369,7 +1728,7 @@ cdef class XmmsApi(XmmsCore):
 			res = xmmsc_playlist_add_encoded(self.conn, <char *>p, <char *>c)
 		else:
 			res = xmmsc_playlist_add_url(self.conn, <char *>p, <char *>c)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "playlist_add_url")
 
 	@deprecated
 	def playlist_add_encoded(self, url, playlist = None, cb = None):
@@ -1385,7 +1744,7 @@ cdef class XmmsApi(XmmsCore):
 		:return: The result of the operation.
 		"""
 		p = check_playlist(playlist, True)
-		return self.create_result(cb, xmmsc_playlist_add_id(self.conn, <char *>p, id))
+		return self.create_result(cb, xmmsc_playlist_add_id(self.conn, <char *>p, id), "playlist_add_id")
 
 	cpdef XmmsResult playlist_add_collection(self, Collection coll, order = None, playlist = None, cb = None):
 		"""
@@ -1402,7 +1761,7 @@ cdef class XmmsApi(XmmsCore):
 		order_val = create_native_value(order)
 		res = xmmsc_playlist_add_collection(self.conn, <char *>p, coll.coll, order_val)
 		xmmsv_unref(order_val)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "playlist_add_collection")
 
 	cpdef XmmsResult playlist_remove_entry(self, int id, playlist = None, cb = None):
 		"""
@@ -1412,7 +1771,7 @@ cdef class XmmsApi(XmmsCore):
 		:return: The result of the operation.
 		"""
 		p = check_playlist(playlist, True)
-		return self.create_result(cb, xmmsc_playlist_remove_entry(self.conn, <char *>p, id))
+		return self.create_result(cb, xmmsc_playlist_remove_entry(self.conn, <char *>p, id), "playlist_remove_entry")
 
 	cpdef XmmsResult playlist_clear(self, playlist = None, cb = None):
 		"""
@@ -1421,7 +1780,7 @@ cdef class XmmsApi(XmmsCore):
 		:return: The result of the operation.
 		"""
 		p = check_playlist(playlist, True)
-		return self.create_result(cb, xmmsc_playlist_clear(self.conn, <char *>p))
+		return self.create_result(cb, xmmsc_playlist_clear(self.conn, <char *>p), "playlist_clear")
 
 	cpdef XmmsResult playlist_list_entries(self, playlist = None, cb = None):
 		"""
@@ -1432,7 +1791,7 @@ cdef class XmmsApi(XmmsCore):
 		:return: The current playlist.
 		"""
 		p = check_playlist(playlist, True)
-		return self.create_result(cb, xmmsc_playlist_list_entries(self.conn, <char *>p))
+		return self.create_result(cb, xmmsc_playlist_list_entries(self.conn, <char *>p), "playlist_list_entries")
 
 	cpdef XmmsResult playlist_sort(self, props, playlist = None, cb = None):
 		"""
@@ -1447,7 +1806,7 @@ cdef class XmmsApi(XmmsCore):
 		props_val = create_native_value(props)
 		res = xmmsc_playlist_sort(self.conn, <char *>p, props_val)
 		xmmsv_unref(props_val)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "playlist_sort")
 
 	cpdef XmmsResult playlist_set_next_rel(self, int position, cb = None):
 		"""
@@ -1455,14 +1814,14 @@ cdef class XmmsApi(XmmsCore):
 		but sets the next position relative to the current position.
 		You can do set_next_rel(-1) to move backwards for example.
 		"""
-		return self.create_result(cb, xmmsc_playlist_set_next_rel(self.conn, position))
+		return self.create_result(cb, xmmsc_playlist_set_next_rel(self.conn, position), "playlist_set_next_rel")
 
 	cpdef XmmsResult playlist_set_next(self, int position, cb = None):
 		"""
 		Sets the position to move to, next, in the playlist. Calling
 		`playback_tickle` will perform the jump to that position.
 		"""
-		return self.create_result(cb, xmmsc_playlist_set_next(self.conn, position))
+		return self.create_result(cb, xmmsc_playlist_set_next(self.conn, position), "playlist_set_next")
 
 	cpdef XmmsResult playlist_move(self, int cur_pos, int new_pos, playlist = None, cb = None):
 		"""
@@ -1471,7 +1830,7 @@ cdef class XmmsApi(XmmsCore):
 		:return: The result of the operation.
 		"""
 		p = check_playlist(playlist, True)
-		return self.create_result(cb, xmmsc_playlist_move_entry(self.conn, <char *>p, cur_pos, new_pos))
+		return self.create_result(cb, xmmsc_playlist_move_entry(self.conn, <char *>p, cur_pos, new_pos), "playlist_move")
 
 	cpdef XmmsResult playlist_create(self, playlist, cb = None):
 		"""
@@ -1480,7 +1839,7 @@ cdef class XmmsApi(XmmsCore):
 		:return: The result of the operation.
 		"""
 		p = check_playlist(playlist, False)
-		return self.create_result(cb, xmmsc_playlist_create(self.conn, <char *>p))
+		return self.create_result(cb, xmmsc_playlist_create(self.conn, <char *>p), "playlist_create")
 
 	cpdef XmmsResult playlist_current_pos(self, playlist = None, cb = None):
 		"""
@@ -1489,13 +1848,13 @@ cdef class XmmsApi(XmmsCore):
 		list is 0.
 		"""
 		p = check_playlist(playlist, True)
-		return self.create_result(cb, xmmsc_playlist_current_pos(self.conn, <char *>p))
+		return self.create_result(cb, xmmsc_playlist_current_pos(self.conn, <char *>p), "playlist_current_pos")
 
 	cpdef XmmsResult playlist_current_active(self, cb = None):
 		"""
 		Returns the name of the current active playlist
 		"""
-		return self.create_result(cb, xmmsc_playlist_current_active(self.conn))
+		return self.create_result(cb, xmmsc_playlist_current_active(self.conn), "playlist_current_active")
 
 	cpdef XmmsResult broadcast_playlist_current_pos(self, cb = None):
 		"""
@@ -1504,7 +1863,7 @@ cdef class XmmsApi(XmmsCore):
 		jumps from one playlist position to another. (not when moving
 		a playlist item from one position to another)
 		"""
-		return self.create_result(cb, xmmsc_broadcast_playlist_current_pos(self.conn))
+		return self.create_result(cb, xmmsc_broadcast_playlist_current_pos(self.conn), "broadcast_playlist_current_pos")
 
 	cpdef XmmsResult broadcast_playlist_changed(self, cb = None):
 		"""
@@ -1512,7 +1871,7 @@ cdef class XmmsApi(XmmsCore):
 		XMMS2 daemon. Updated data is sent whenever the daemon's
 		playlist changes.
 		"""
-		return self.create_result(cb, xmmsc_broadcast_playlist_changed(self.conn))
+		return self.create_result(cb, xmmsc_broadcast_playlist_changed(self.conn), "broadcast_playlist_changed")
 
 	cpdef XmmsResult broadcast_config_value_changed(self, cb = None):
 		"""
@@ -1523,7 +1882,7 @@ cdef class XmmsApi(XmmsCore):
 
 		:return: The modified config key and its value.
 		"""
-		return self.create_result(cb, xmmsc_broadcast_config_value_changed(self.conn))
+		return self.create_result(cb, xmmsc_broadcast_config_value_changed(self.conn), "broadcast_config_value_changed")
 
 	cpdef XmmsResult config_set_value(self, key, val, cb = None):
 		"""
@@ -1533,7 +1892,7 @@ cdef class XmmsApi(XmmsCore):
 		"""
 		k = from_unicode(key)
 		v = from_unicode(val)
-		return self.create_result(cb, xmmsc_config_set_value(self.conn, <char *>k, <char *>v))
+		return self.create_result(cb, xmmsc_config_set_value(self.conn, <char *>k, <char *>v), "config_set_value")
 
 	cpdef XmmsResult config_get_value(self, key, cb = None):
 		"""
@@ -1542,7 +1901,7 @@ cdef class XmmsApi(XmmsCore):
 		:return: The result of the operation.
 		"""
 		k = from_unicode(key)
-		return self.create_result(cb, xmmsc_config_get_value(self.conn, <char *>k))
+		return self.create_result(cb, xmmsc_config_get_value(self.conn, <char *>k), "config_get_value")
 
 	cpdef XmmsResult config_list_values(self, cb = None):
 		"""
@@ -1552,7 +1911,7 @@ cdef class XmmsApi(XmmsCore):
 
 		:return: The result of the operation.
 		"""
-		return self.create_result(cb, xmmsc_config_list_values(self.conn))
+		return self.create_result(cb, xmmsc_config_list_values(self.conn), "config_list_values")
 
 	cpdef XmmsResult config_register_value(self, valuename, defaultvalue, cb = None):
 		"""
@@ -1564,7 +1923,7 @@ cdef class XmmsApi(XmmsCore):
 		"""
 		v = from_unicode(valuename)
 		dv = from_unicode(defaultvalue)
-		return self.create_result(cb, xmmsc_config_register_value(self.conn, <char *>v, <char *>dv))
+		return self.create_result(cb, xmmsc_config_register_value(self.conn, <char *>v, <char *>dv), "config_register_value")
 
 	cpdef XmmsResult medialib_add_entry(self, path, cb = None, encoded = False):
 		"""
@@ -1578,7 +1937,7 @@ cdef class XmmsApi(XmmsCore):
 			res = xmmsc_medialib_add_entry_encoded(self.conn, <char *>p)
 		else:
 			res = xmmsc_medialib_add_entry(self.conn, <char *>p)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "medialib_add_entry")
 
 	@deprecated
 	def medialib_add_entry_encoded(self, path, cb = None):
@@ -1593,7 +1952,7 @@ cdef class XmmsApi(XmmsCore):
 
 		:return: The result of the operation.
 		"""
-		return self.create_result(cb, xmmsc_medialib_remove_entry(self.conn, id))
+		return self.create_result(cb, xmmsc_medialib_remove_entry(self.conn, id), "medialib_remove_entry")
 
 	cpdef XmmsResult medialib_move_entry(self, int id,  url, cb = None, encoded = False):
 		"""
@@ -1608,7 +1967,7 @@ cdef class XmmsApi(XmmsCore):
 				from urllib.parse import unquote_plus
 			url = unquote_plus(url)
 		u = from_unicode(url)
-		return self.create_result(cb, xmmsc_medialib_move_entry(self.conn, id, <char *>u))
+		return self.create_result(cb, xmmsc_medialib_move_entry(self.conn, id, <char *>u), "medialib_move_entry")
 
 	cpdef XmmsResult medialib_get_info(self, int id, cb = None):
 		"""
@@ -1616,7 +1975,7 @@ cdef class XmmsApi(XmmsCore):
 		:return: Information about the medialib entry position specified.
 		"""
 		cdef XmmsResult res
-		res = self.create_result(cb, xmmsc_medialib_get_info(self.conn, id))
+		res = self.create_result(cb, xmmsc_medialib_get_info(self.conn, id), "medialib_get_info")
 		res.ispropdict = 1
 		return res
 
@@ -1626,7 +1985,7 @@ cdef class XmmsApi(XmmsCore):
 
 		:return: The result of the operation.
 		"""
-		return self.create_result(cb, xmmsc_medialib_rehash(self.conn, id))
+		return self.create_result(cb, xmmsc_medialib_rehash(self.conn, id), "medialib_rehash")
 
 	cpdef XmmsResult medialib_get_id(self, url, cb = None, encoded = False):
 		"""
@@ -1640,7 +1999,7 @@ cdef class XmmsApi(XmmsCore):
 			res = xmmsc_medialib_get_id_encoded(self.conn, <char *>u)
 		else:
 			res = xmmsc_medialib_get_id(self.conn, <char *>u)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "medialib_get_id")
 
 	cpdef XmmsResult medialib_import_path(self, path, cb = None, encoded = False):
 		"""
@@ -1655,7 +2014,7 @@ cdef class XmmsApi(XmmsCore):
 			res = xmmsc_medialib_import_path_encoded(self.conn, <char *>p)
 		else:
 			res = xmmsc_medialib_import_path(self.conn, <char *>p)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "medialib_import_path")
 
 	@deprecated
 	def medialib_path_import(self, path, cb = None, encoded = False):
@@ -1692,7 +2051,7 @@ cdef class XmmsApi(XmmsCore):
 				res = xmmsc_medialib_entry_property_set_str_with_source(self.conn, id, <char *>s, <char *>k, <char *>v)
 			else:
 				res = xmmsc_medialib_entry_property_set_str(self.conn, id, <char *>k, <char *>v)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "medialib_property_set")
 
 	cpdef XmmsResult medialib_property_remove(self, int id, key, source = None, cb = None):
 		"""
@@ -1707,14 +2066,14 @@ cdef class XmmsApi(XmmsCore):
 			res = xmmsc_medialib_entry_property_remove_with_source(self.conn, id, <char *>s, <char *>k)
 		else:
 			res = xmmsc_medialib_entry_property_remove(self.conn, id, <char *>k)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "medialib_property_remove")
 
 	cpdef XmmsResult broadcast_medialib_entry_added(self, cb = None):
 		"""
 		Set a method to handle the medialib entry added broadcast
 		from the XMMS2 daemon. (i.e. a new entry has been added)
 		"""
-		return self.create_result(cb, xmmsc_broadcast_medialib_entry_added(self.conn))
+		return self.create_result(cb, xmmsc_broadcast_medialib_entry_added(self.conn), "broadcast_medialib_entry_added")
 
 	@deprecated
 	def broadcast_medialib_entry_changed(self, cb = None):
@@ -1730,21 +2089,21 @@ cdef class XmmsApi(XmmsCore):
 		Updated data is sent when the metadata for a song is updated
 		in the medialib.
 		"""
-		return self.create_result(cb, xmmsc_broadcast_medialib_entry_updated(self.conn))
+		return self.create_result(cb, xmmsc_broadcast_medialib_entry_updated(self.conn), "broadcast_medialib_entry_updated")
 
 	cpdef XmmsResult broadcast_medialib_entry_removed(self, cb = None):
 		"""
 		Set a method to handle the medialib entry removed broadcast
 		from the XMMS2 daemon. (i.e. an entry has been removed)
 		"""
-		return self.create_result(cb, xmmsc_broadcast_medialib_entry_removed(self.conn))
+		return self.create_result(cb, xmmsc_broadcast_medialib_entry_removed(self.conn), "broadcast_medialib_entry_removed")
 
 	cpdef XmmsResult broadcast_collection_changed(self, cb = None):
 		"""
 		Set a method to handle the collection changed broadcast
 		from the XMMS2 daemon.
 		"""
-		return self.create_result(cb, xmmsc_broadcast_collection_changed(self.conn))
+		return self.create_result(cb, xmmsc_broadcast_collection_changed(self.conn), "broadcast_collection_changed")
 
 	cpdef XmmsResult signal_mediainfo_reader_unindexed(self, cb = None):
 		"""
@@ -1752,7 +2111,7 @@ cdef class XmmsApi(XmmsCore):
 
 		:return: The result of the operation.
 		"""
-		return self.create_result(cb, xmmsc_signal_mediainfo_reader_unindexed(self.conn))
+		return self.create_result(cb, xmmsc_signal_mediainfo_reader_unindexed(self.conn), "signal_mediainfo_reader_unindexed")
 
 	cpdef XmmsResult broadcast_mediainfo_reader_status(self, cb = None):
 		"""
@@ -1760,7 +2119,7 @@ cdef class XmmsApi(XmmsCore):
 
 		:return: The result of the operation.
 		"""
-		return self.create_result(cb, xmmsc_broadcast_mediainfo_reader_status(self.conn))
+		return self.create_result(cb, xmmsc_broadcast_mediainfo_reader_status(self.conn), "broadcast_mediainfo_reader_status")
 
 	cpdef XmmsResult xform_media_browse(self, url, cb = None, encoded = False):
 		"""
@@ -1774,7 +2133,7 @@ cdef class XmmsApi(XmmsCore):
 			res = xmmsc_xform_media_browse_encoded(self.conn, <char *>u)
 		else:
 			res = xmmsc_xform_media_browse(self.conn, <char *>u)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "xform_media_browse")
 
 	@deprecated
 	def xform_media_browse_encoded(self, url, cb = None):
@@ -1792,7 +2151,7 @@ cdef class XmmsApi(XmmsCore):
 		cdef char *n
 		n = check_namespace(ns, False)
 		nam = from_unicode(name)
-		return self.create_result(cb, xmmsc_coll_get(self.conn, nam, n))
+		return self.create_result(cb, xmmsc_coll_get(self.conn, nam, n), "coll_get")
 
 	cpdef XmmsResult coll_list(self, ns = "Collections", cb = None):
 		"""
@@ -1802,7 +2161,7 @@ cdef class XmmsApi(XmmsCore):
 		"""
 		cdef char *n
 		n = check_namespace(ns, False)
-		return self.create_result(cb, xmmsc_coll_list(self.conn, n))
+		return self.create_result(cb, xmmsc_coll_list(self.conn, n), "coll_list")
 
 	cpdef XmmsResult coll_save(self, Collection coll, name, ns = "Collections", cb = None):
 		"""
@@ -1813,7 +2172,7 @@ cdef class XmmsApi(XmmsCore):
 		cdef char *n
 		n = check_namespace(ns, False)
 		nam = from_unicode(name)
-		return self.create_result(cb, xmmsc_coll_save(self.conn, coll.coll, <char *>nam, n))
+		return self.create_result(cb, xmmsc_coll_save(self.conn, coll.coll, <char *>nam, n), "coll_save")
 
 	cpdef XmmsResult coll_remove(self, name, ns = "Collections", cb = None):
 		"""
@@ -1824,7 +2183,7 @@ cdef class XmmsApi(XmmsCore):
 		cdef char *n
 		n = check_namespace(ns, False)
 		nam = from_unicode(name)
-		return self.create_result(cb, xmmsc_coll_remove(self.conn, <char *>nam, n))
+		return self.create_result(cb, xmmsc_coll_remove(self.conn, <char *>nam, n), "coll_remove")
 
 	cpdef XmmsResult coll_rename(self, oldname, newname, ns = "Collections", cb = None):
 		"""
@@ -1837,7 +2196,7 @@ cdef class XmmsApi(XmmsCore):
 
 		oldnam = from_unicode(oldname)
 		newnam = from_unicode(newname)
-		return self.create_result(cb, xmmsc_coll_rename(self.conn, <char *>oldnam, <char *>newnam, n))
+		return self.create_result(cb, xmmsc_coll_rename(self.conn, <char *>oldnam, <char *>newnam, n), "coll_rename")
 
 	cpdef XmmsResult coll_idlist_from_playlist_file(self, path, cb = None):
 		"""
@@ -1846,7 +2205,7 @@ cdef class XmmsApi(XmmsCore):
 		:return: The result of the operation.
 		"""
 		p = from_unicode(path)
-		return self.create_result(cb, xmmsc_coll_idlist_from_playlist_file(self.conn, <char *>p))
+		return self.create_result(cb, xmmsc_coll_idlist_from_playlist_file(self.conn, <char *>p), "coll_idlist_from_playlist_file")
 
 	cpdef XmmsResult coll_query(self, Collection coll, fetch, cb = None):
 		"""
@@ -1856,9 +2215,74 @@ cdef class XmmsApi(XmmsCore):
 		"""
 		cdef xmmsv_t *fetch_val
 		fetch_val = create_native_value(fetch)
-		res = self.create_result(cb, xmmsc_coll_query(self.conn, coll.coll, fetch_val))
+		res = self.create_result(cb, xmmsc_coll_query(self.conn, coll.coll, fetch_val), "coll_query")
 		return res
 
+	cdef XmmsResult _medialib_infos_query(self, ids, fetch):
+		cdef xmmsv_t *coll
+		cdef xmmsv_t *fetch_val
+		cdef xmmsc_result_t *res
+		coll = xmmsv_new_coll(XMMS_COLLECTION_TYPE_IDLIST)
+		try:
+			xmmsv_coll_attribute_set_string(coll, <char *>"type", <char *>"list")
+			for i in ids:
+				xmmsv_coll_idlist_append(coll, i)
+			fetch_val = create_native_value(fetch)
+			res = xmmsc_coll_query(self.conn, coll, fetch_val)
+			xmmsv_unref(fetch_val)
+		finally:
+			xmmsv_unref(coll)
+		return self.create_result(None, res, "medialib_get_infos")
+
+	def medialib_get_infos(self, ids, fields = None, int chunk = 1000):
+		"""
+		Get information about many medialib entries, with one `coll_query`
+		per chunk of ids. The next chunk is requested before the entries
+		of the current one are handed out, so that only two chunks are
+		held in memory and the daemon is kept busy.
+
+		:param ids: An iterable of ids.
+		:param fields: The fields to retrieve, all of them if None.
+		:param chunk: Number of entries to retrieve per request.
+		:return: A generator of `PropDict`, like the values returned by
+		         `medialib_get_info`, in the order of ids. Ids missing
+		         from the medialib are skipped.
+		:raise XmmsError: If a query fails.
+		"""
+		cdef XmmsResult res
+		cdef XmmsValue infos
+		cdef xmmsv_t *info
+		if chunk < 1:
+			raise ValueError("chunk must be positive")
+		fetch = {
+			'type': 'metadata',
+			'get': ['id', 'field', 'source', 'value'],
+			'aggregate': 'first'
+		}
+		if fields is not None:
+			fetch['fields'] = list(fields)
+		it = iter(ids)
+		chunk_ids = list(islice(it, chunk))
+		res = self._medialib_infos_query(chunk_ids, fetch) if chunk_ids else None
+		while res is not None:
+			current_ids, current = chunk_ids, res
+			chunk_ids = list(islice(it, chunk))
+			res = self._medialib_infos_query(chunk_ids, fetch) if chunk_ids else None
+			current.wait()
+			infos = current.xmmsvalue()
+			if infos.is_error():
+				raise infos.get_error()
+			if xmmsv_get_type(infos.val) != XMMSV_TYPE_DICT:
+				continue # No entry was found
+			sourcepref = self.source_preference.get()
+			for id in current_ids:
+				key = from_unicode(str(id))
+				if not xmmsv_dict_get(infos.val, <char *>key, &info):
+					continue
+				ret = native_propdict(info, sourcepref)
+				ret[('server', 'id')] = id
+				yield ret
+
 	cpdef XmmsResult coll_query_ids(self, Collection coll, start = 0, leng = 0, order = None, cb = None):
 		"""
 		Retrive a list of ids of the media matching the collection
@@ -1873,7 +2297,7 @@ cdef class XmmsApi(XmmsCore):
 		order_val = create_native_value(order)
 		res = xmmsc_coll_query_ids(self.conn, coll.coll, order_val, start, leng)
 		xmmsv_unref(order_val)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "coll_query_ids")
 
 	cpdef XmmsResult coll_query_infos(self, Collection coll, fields, start = 0, leng = 0, order = None, groupby = None, cb = None):
 		"""
@@ -1897,7 +2321,46 @@ cdef class XmmsApi(XmmsCore):
 		xmmsv_unref(order_val)
 		xmmsv_unref(fields_val)
 		xmmsv_unref(groupby_val)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "coll_query_infos")
+
+	def coll_query_infos_iter(self, Collection coll, fields, order = None, groupby = None, int page = 1000):
+		"""
+		Iterate over the mediainfo of the media matching the collection,
+		retrieved one page at a time with `coll_query_infos`. The next
+		page is requested before the rows of the current one are handed
+		out, and no more pages are requested once the iteration stops.
+
+		Pages are only consistent with each other if the collection does
+		not change meanwhile and order gives a total order.
+
+		:param page: Number of rows to retrieve per request.
+		:return: A generator of dicts, converted as they are consumed.
+		:raise XmmsError: If a query fails.
+		"""
+		cdef XmmsResult res
+		cdef XmmsResult current
+		cdef XmmsValue rows
+		cdef int start = 0
+		if page < 1:
+			raise ValueError("page must be positive")
+		res = self.coll_query_infos(coll, fields, start, page, order, groupby)
+		while res is not None:
+			current = res
+			current.wait()
+			rows = current.xmmsvalue()
+			if rows.is_error():
+				raise rows.get_error()
+			view = rows.get_list_view()
+			if len(view) < page:
+				res = None
+			else:
+				start += page
+				res = self.coll_query_infos(coll, fields, start, page, order, groupby)
+				# Send the request now rather than on the next wait().
+				if xmmsc_io_want_out(self.conn):
+					xmmsc_io_out_handle(self.conn)
+			for row in view:
+				yield row.dict()
 
 	cpdef XmmsResult c2c_ready(self, cb = None):
 		"""
@@ -1913,7 +2376,7 @@ cdef class XmmsApi(XmmsCore):
 			cb = _noop
 
 		res = xmmsc_c2c_ready(self.conn)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "c2c_ready")
 
 	cpdef XmmsResult c2c_get_connected_clients(self, cb = None):
 		"""
@@ -1924,7 +2387,7 @@ cdef class XmmsApi(XmmsCore):
 		cdef xmmsc_result_t *res
 
 		res = xmmsc_c2c_get_connected_clients (self.conn)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "c2c_get_connected_clients")
 
 	cpdef XmmsResult c2c_get_ready_clients(self, cb = None):
 		"""
@@ -1935,7 +2398,20 @@ cdef class XmmsApi(XmmsCore):
 		cdef xmmsc_result_t *res
 
 		res = xmmsc_c2c_get_ready_clients (self.conn)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "c2c_get_ready_clients")
+
+	cpdef XmmsResult c2c_get_message_stats(self, cb = None):
+		"""
+		Get counters of the client-to-client messages expecting a reply:
+		the number of pending ones, and the numbers of expired and replied
+		ones since the server started.
+
+		:return: The result of the operation.
+		"""
+		cdef xmmsc_result_t *res
+
+		res = xmmsc_c2c_get_message_stats (self.conn)
+		return self.create_result(cb, res, "c2c_get_message_stats")
 
 	cpdef XmmsResult broadcast_c2c_ready(self, cb = None):
 		"""
@@ -1946,7 +2422,7 @@ cdef class XmmsApi(XmmsCore):
 		cdef xmmsc_result_t *res
 
 		res = xmmsc_broadcast_c2c_ready(self.conn)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "broadcast_c2c_ready")
 
 
 	cpdef XmmsResult broadcast_c2c_client_connected(self, cb = None):
@@ -1958,7 +2434,7 @@ cdef class XmmsApi(XmmsCore):
 		cdef xmmsc_result_t *res
 
 		res = xmmsc_broadcast_c2c_client_connected(self.conn)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "broadcast_c2c_client_connected")
 
 	cpdef XmmsResult broadcast_c2c_client_disconnected(self, cb = None):
 		"""
@@ -1969,7 +2445,7 @@ cdef class XmmsApi(XmmsCore):
 		cdef xmmsc_result_t *res
 
 		res = xmmsc_broadcast_c2c_client_disconnected(self.conn)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "broadcast_c2c_client_disconnected")
 
 	cpdef bint sc_init(self):
 		"""
@@ -2009,7 +2485,7 @@ cdef class XmmsApi(XmmsCore):
 		bc_path = create_native_value(broadcast)
 		res = xmmsc_sc_broadcast_subscribe(self.conn, dest, bc_path)
 		xmmsv_unref(bc_path)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "sc_broadcast_subscribe")
 
 	cpdef XmmsResult sc_call(self, int dest, method, args = (), kargs = dict(), cb = None):
 		"""
@@ -2029,7 +2505,25 @@ cdef class XmmsApi(XmmsCore):
 		xmmsv_unref(m_path)
 		xmmsv_unref(m_pos)
 		xmmsv_unref(m_named)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "sc_call")
+
+	cpdef XmmsResult sc_call_batch(self, int dest, calls, cb = None):
+		"""
+		Call several remote methods in a single message. The methods are
+		called in order and reply together, see `XmmsServiceBatch`.
+
+		:param calls: An iterable of (method, args, kargs) tuples.
+		:return: The result of the operation, whose payload is the list of
+		         the return values of the methods, with an error in place
+		         of the value of failed calls.
+		"""
+		cdef xmmsv_t *m_calls
+		cdef xmmsc_result_t *res
+
+		m_calls = create_native_value([[method, args, kargs] for method, args, kargs in calls])
+		res = xmmsc_sc_call_batch(self.conn, dest, m_calls)
+		xmmsv_unref(m_calls)
+		return self.create_result(cb, res, "sc_call_batch")
 
 	cpdef XmmsResult sc_introspect_namespace(self, int dest, path = (), cb = None):
 		"""
@@ -2043,7 +2537,24 @@ cdef class XmmsApi(XmmsCore):
 		i_path = create_native_value(path)
 		res = xmmsc_sc_introspect_namespace(self.conn, dest, i_path)
 		xmmsv_unref(i_path)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "sc_introspect_namespace")
+
+	cpdef XmmsResult sc_introspect_namespace_recursive(self, int dest, path = (), cb = None):
+		"""
+		Get informations about a namespace on a remote client, along with
+		all its subnamespaces, in a single request. The "namespaces" entry
+		of the description is a list of descriptions instead of names,
+		unless the remote client does not support recursive introspection.
+
+		:return: The result of the operation.
+		"""
+		cdef xmmsv_t *i_path
+		cdef xmmsc_result_t *res
+
+		i_path = create_native_value(path)
+		res = xmmsc_sc_introspect_namespace_recursive(self.conn, dest, i_path)
+		xmmsv_unref(i_path)
+		return self.create_result(cb, res, "sc_introspect_namespace_recursive")
 
 	cpdef XmmsResult sc_introspect_method(self, int dest, path, cb = None):
 		"""
@@ -2057,7 +2568,7 @@ cdef class XmmsApi(XmmsCore):
 		i_path = create_native_value(path)
 		res = xmmsc_sc_introspect_method(self.conn, dest, i_path)
 		xmmsv_unref(i_path)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "sc_introspect_method")
 
 	cpdef XmmsResult sc_introspect_broadcast(self, int dest, path, cb = None):
 		"""
@@ -2071,7 +2582,7 @@ cdef class XmmsApi(XmmsCore):
 		i_path = create_native_value(path)
 		res = xmmsc_sc_introspect_broadcast(self.conn, dest, i_path)
 		xmmsv_unref(i_path)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "sc_introspect_broadcast")
 
 	cpdef XmmsResult sc_introspect_constant(self, int dest, path, cb = None):
 		"""
@@ -2086,7 +2597,7 @@ cdef class XmmsApi(XmmsCore):
 		i_path = create_native_value(ns)
 		res = xmmsc_sc_introspect_constant(self.conn, dest, i_path, <char *>key)
 		xmmsv_unref(i_path)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "sc_introspect_constant")
 
 	cpdef XmmsResult sc_introspect_docstring(self, int dest, path, cb = None):
 		"""
@@ -2100,17 +2611,24 @@ cdef class XmmsApi(XmmsCore):
 		i_path = create_native_value(path)
 		res = xmmsc_sc_introspect_docstring(self.conn, dest, i_path)
 		xmmsv_unref(i_path)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "sc_introspect_docstring")
 
 	cpdef XmmsResult bindata_add(self, data, cb = None):
 		"""
 		Add a datafile to the server
 
+		:param data: bytes or any object supporting the buffer protocol.
 		:return: The result of the operation.
 		"""
-		cdef char *t
-		t = <char *>data
-		return self.create_result(cb, xmmsc_bindata_add(self.conn,<unsigned char *>t,len(data)))
+		cdef Py_buffer buf
+		cdef xmmsc_result_t *res
+
+		PyObject_GetBuffer(data, &buf, PyBUF_SIMPLE)
+		try:
+			res = xmmsc_bindata_add(self.conn, <unsigned char *>buf.buf, buf.len)
+		finally:
+			PyBuffer_Release(&buf)
+		return self.create_result(cb, res, "bindata_add")
 
 	cpdef XmmsResult bindata_retrieve(self, hash, cb = None):
 		"""
@@ -2119,7 +2637,7 @@ cdef class XmmsApi(XmmsCore):
 		:return: The result of the operation.
 		"""
 		h = from_unicode(hash)
-		return self.create_result(cb, xmmsc_bindata_retrieve(self.conn, <char *>h))
+		return self.create_result(cb, xmmsc_bindata_retrieve(self.conn, <char *>h), "bindata_retrieve")
 
 	cpdef XmmsResult bindata_remove(self, hash, cb = None):
 		"""
@@ -2128,7 +2646,7 @@ cdef class XmmsApi(XmmsCore):
 		:return: The result of the operation.
 		"""
 		h = from_unicode(hash)
-		return self.create_result(cb, xmmsc_bindata_remove(self.conn, <char *>h))
+		return self.create_result(cb, xmmsc_bindata_remove(self.conn, <char *>h), "bindata_remove")
 
 	cpdef XmmsResult bindata_list(self, cb = None):
 		"""
@@ -2136,7 +2654,7 @@ cdef class XmmsApi(XmmsCore):
 
 		:return: The result of the operation.
 		"""
-		return self.create_result(cb, xmmsc_bindata_list(self.conn))
+		return self.create_result(cb, xmmsc_bindata_list(self.conn), "bindata_list")
 
 	cpdef XmmsResult stats(self, cb = None):
 		"""
@@ -2144,7 +2662,7 @@ cdef class XmmsApi(XmmsCore):
 
 		:return: The result of the operation.
 		"""
-		return self.create_result(cb, xmmsc_main_stats(self.conn))
+		return self.create_result(cb, xmmsc_main_stats(self.conn), "stats")
 
 	cpdef XmmsResult visualization_version(self, cb = None):
 		"""
@@ -2152,7 +2670,7 @@ cdef class XmmsApi(XmmsCore):
 
 		:return: The result of the operation.
 		"""
-		return self.create_result(cb, xmmsc_visualization_version(self.conn))
+		return self.create_result(cb, xmmsc_visualization_version(self.conn), "visualization_version")
 
 	cpdef XmmsResult visualization_init(self, cb = None):
 		"""
@@ -2160,7 +2678,7 @@ cdef class XmmsApi(XmmsCore):
 
 		:return: The result of the operation
 		"""
-		return self.create_vis_result(cb, xmmsc_visualization_init(self.conn), VIS_RESULT_CMD_INIT)
+		return self.create_vis_result(cb, xmmsc_visualization_init(self.conn), VIS_RESULT_CMD_INIT, "visualization_init")
 
 	cpdef XmmsResult visualization_start(self, int handle, cb = None):
 		"""
@@ -2168,7 +2686,7 @@ cdef class XmmsApi(XmmsCore):
 
 		:return: The result of the operation
 		"""
-		return self.create_vis_result(cb, xmmsc_visualization_start(self.conn, handle), VIS_RESULT_CMD_START)
+		return self.create_vis_result(cb, xmmsc_visualization_start(self.conn, handle), VIS_RESULT_CMD_START, "visualization_start")
 
 	cpdef bint visualization_started(self, int handle):
 		"""
@@ -2194,7 +2712,7 @@ cdef class XmmsApi(XmmsCore):
 		"""
 		k = from_unicode(key)
 		v = from_unicode(value)
-		return self.create_result(cb, xmmsc_visualization_property_set(self.conn, handle, <char *>k, <char *>v))
+		return self.create_result(cb, xmmsc_visualization_property_set(self.conn, handle, <char *>k, <char *>v), "visualization_property_set")
 
 	cpdef XmmsResult visualization_properties_set(self, int handle, props = {}, cb = None):
 		"""
@@ -2208,28 +2726,41 @@ cdef class XmmsApi(XmmsCore):
 		_props = create_native_value(props)
 		res = xmmsc_visualization_properties_set(self.conn, handle, _props)
 		xmmsv_unref(_props)
-		return self.create_result(cb, res)
+		return self.create_result(cb, res, "visualization_properties_set")
 
-	cpdef XmmsVisChunk visualization_chunk_get(self, int handle, int drawtime = 0, bint blocking = False):
+	cpdef visualization_chunk_get(self, int handle, int drawtime = 0, bint blocking = False, chunk = None):
 		"""
 		Fetches the next available data chunk
 
-
-		:return: Visualization chunk.
+		:param chunk: Where to store the data. Either an `XmmsVisChunk` to
+		              refill in place, or a writable buffer with room for
+		              `VISUALIZATION_CHUNK_MAX_SAMPLES` native shorts. A new
+		              `XmmsVisChunk` is created if omitted.
+		:return: Visualization chunk, or the number of samples written when
+		         chunk is a buffer.
 		"""
-		cdef short *buf
+		cdef XmmsVisChunk vchunk
+		cdef Py_buffer buf
 		cdef int size
-		cdef XmmsVisChunk chunk
 
-		buf = <short *>PyMem_Malloc(2 * XMMSC_VISUALIZATION_WINDOW_SIZE * sizeof (short))
-		size = xmmsc_visualization_chunk_get (self.conn, handle, buf, drawtime, blocking)
+		if chunk is None or isinstance(chunk, XmmsVisChunk):
+			vchunk = chunk if chunk is not None else XmmsVisChunk()
+			size = xmmsc_visualization_chunk_get(self.conn, handle, vchunk.get_storage(), drawtime, blocking)
+			if size < 0:
+				raise VisualizationError("Unrecoverable error in visualization")
+			vchunk.sample_count = size
+			return vchunk
+
+		PyObject_GetBuffer(chunk, &buf, PyBUF_WRITABLE | PyBUF_C_CONTIGUOUS)
+		try:
+			if buf.len < sizeof (short) * VIS_CHUNK_MAX_SAMPLES:
+				raise ValueError("Buffer too small for a visualization chunk")
+			size = xmmsc_visualization_chunk_get(self.conn, handle, <short *>buf.buf, drawtime, blocking)
+		finally:
+			PyBuffer_Release(&buf)
 		if size < 0:
-			PyMem_Free(buf)
 			raise VisualizationError("Unrecoverable error in visualization")
-		chunk = XmmsVisChunk()
-		chunk.set_data(buf, size)
-		PyMem_Free(buf)
-		return chunk
+		return size
 
 	cpdef visualization_shutdown(self, int handle):
 		"""
@@ -2242,6 +2773,33 @@ cdef class XmmsApi(XmmsCore):
 class XmmsDisconnectException(Exception):
 	pass
 
+class XmmsTimer(object):
+	"""
+	A callback scheduled with `XmmsLoop.call_later` or a similar method of
+	another main loop.
+	"""
+	__slots__ = ('when', 'seq', 'callback', 'args', 'cancelled')
+
+	def __init__(self, when, seq, callback, args):
+		self.when = when
+		self.seq = seq
+		self.callback = callback
+		self.args = args
+		self.cancelled = False
+
+	def __lt__(self, other):
+		if self.when == other.when:
+			return self.seq < other.seq
+		return self.when < other.when
+
+	def cancel(self):
+		"""
+		Do not run the callback.
+		"""
+		self.cancelled = True
+		self.callback = None
+		self.args = None
+
 cdef class XmmsLoop(XmmsApi):
 	"""
 	A simple main loop to drive async communication.
@@ -2256,9 +2814,13 @@ cdef class XmmsLoop(XmmsApi):
 	"""
 	#cdef bint do_loop
 	#cdef object wakeup
+	#cdef list timers
+	#cdef long timer_seq
 
 	def __cinit__(self):
 		self.do_loop = 0
+		self.timers = []
+		self.timer_seq = 0
 
 	def _loop_set_wakeup(self, fd):
 		"""
@@ -2331,12 +2893,49 @@ cdef class XmmsLoop(XmmsApi):
 				raise XmmsDisconnectException()
 		return (i, o, e) #Can be used by overridding methods for extra handling.
 
+	def call_later(self, delay, callback, *args):
+		"""
+		Call callback(*args) from `loop` in delay seconds.
+
+		:return: An `XmmsTimer` which can be cancelled.
+		"""
+		self.timer_seq += 1
+		timer = XmmsTimer(_monotonic() + delay, self.timer_seq, callback, args)
+		heappush(self.timers, timer)
+		return timer
+
+	cdef _run_timers(self):
+		"""
+		Run the timers that are due.
+
+		:return: The number of seconds until the next timer, or -1.
+		"""
+		timers = self.timers
+		while timers:
+			timer = timers[0]
+			if timer.cancelled:
+				heappop(timers)
+				continue
+			delay = timer.when - _monotonic()
+			if delay > 0:
+				return delay
+			heappop(timers)
+			callback, args = timer.callback, timer.args
+			timer.cancel()
+			try:
+				callback(*args)
+			except:
+				import traceback, sys
+				traceback.print_exception(*sys.exc_info())
+		return -1
+
 	def loop(self):
 		"""
 		Main client loop for most python clients. Call this to run the
 		client once everything has been set up. This function blocks
 		until `exit_loop` is called. One can override `loop_iter` to
-		perform extra processing.
+		perform extra processing. Callbacks scheduled with `call_later`
+		are run from this loop.
 		"""
 		from os import pipe, read
 		(r, w) = pipe()
@@ -2346,7 +2945,10 @@ cdef class XmmsLoop(XmmsApi):
 
 		while self.do_loop:
 			try:
-				(i, o, e) = self.loop_iter(infd = [r])
+				timeout = self._run_timers()
+				if not self.do_loop:
+					break
+				(i, o, e) = self.loop_iter(infd = [r], timeout = timeout)
 				if r in i:
 					read(r, 1) # Purge wakeup stream (each wakeup signal should not write more than one byte)
 			except XmmsDisconnectException:
@@ -7,10 +7,11 @@ import sys, os
 sys.path.append(os.path.dirname(__file__))
 
 import xmmsapi, xmmsvalue
-from xmmsapi import Xmms, XmmsLoop, XmmsResult, userconfdir_get
-from xmmsvalue import XmmsValue, XmmsValueC2C
+from xmmsapi import Xmms, XmmsLoop, XmmsResult, XmmsTimer, userconfdir_get
+from xmmsvalue import XmmsValue, XmmsValueC2C, XmmsListView, XmmsDictView
 from xmmsvalue import coll_parse
-from sync import XmmsSync, XmmsError
+from sync import XmmsSync, XmmsSyncBatch, XmmsError
+from pool import XmmsPool
 from propdict import PropDict
 from consts import *
 
@@ -0,0 +1,166 @@
+"""
+
+ An asyncio connector
+
+ AsyncioConnector(xmms, loop): drive the connection from an asyncio event
+                               loop.
+
+ Once the connection is driven by the event loop, results can be awaited
+ and broadcasts or signals iterated from coroutines, without blocking:
+
+	xc = xmmsclient.Xmms('clientname')
+	xc.connect()
+	AsyncioConnector(xc)
+
+	status = await xc.playback_status()
+	async for id in xc.broadcast_playback_current_id():
+		...
+
+ Any number of requests may be pending at the same time, e.g. using
+ asyncio.gather().
+
+"""
+import asyncio
+from collections import deque
+
+class AsyncioConnector(object):
+	def __init__(self, xmms, loop = None):
+		if loop is None:
+			loop = asyncio.get_event_loop()
+		self.loop = loop
+		self.fd = None
+		self.writing = False
+		self.reconnect(xmms)
+
+	def need_out(self, i):
+		if self.fd is not None and self.xmms.want_ioout() and not self.writing:
+			self.loop.add_writer(self.fd, self.handle_out)
+			self.writing = True
+
+	def handle_in(self):
+		if not self.xmms.ioin():
+			self.disconnect()
+
+	def handle_out(self):
+		if self.xmms.want_ioout():
+			self.xmms.ioout()
+		if not self.xmms.want_ioout() and self.writing:
+			self.loop.remove_writer(self.fd)
+			self.writing = False
+
+	def reconnect(self, xmms = None):
+		self.disconnect()
+		if not xmms is None:
+			self.xmms = xmms
+		self.fd = self.xmms.get_fd()
+		self.xmms.set_need_out_fun(self.need_out)
+		self.loop.add_reader(self.fd, self.handle_in)
+		# Flush the requests issued before the connector was set up.
+		self.need_out(1)
+
+	def disconnect(self):
+		if self.fd is None:
+			return
+		self.loop.remove_reader(self.fd)
+		if self.writing:
+			self.loop.remove_writer(self.fd)
+			self.writing = False
+		self.fd = None
+
+
+def _get_loop(loop):
+	if loop is None:
+		loop = asyncio.get_event_loop()
+	return loop
+
+def result_future(result, loop = None):
+	"""
+	Get a future holding the value of a result. This is what awaiting an
+	`XmmsResult` does.
+
+	The result may be awaited after its reply was processed, the future is
+	then resolved right away.
+
+	:return: A future resolved with the value of the result, or with an
+	         `XmmsError` if the result is an error.
+	:raise RuntimeError: If the result already has a callback.
+	"""
+	if result.callback is not None:
+		raise RuntimeError("Can't await a result which has a callback")
+	fut = _get_loop(loop).create_future()
+	def _resolve(xvalue):
+		if xvalue.is_error():
+			fut.set_exception(xvalue.get_error())
+		else:
+			fut.set_result(xvalue.value())
+	def _cb(xvalue):
+		if not fut.done(): # Cancelled
+			_resolve(xvalue)
+		return False
+	if result.is_ready():
+		_resolve(result.xmmsvalue())
+	else:
+		result.callback = _cb
+	return fut
+
+class XmmsResultIterator(object):
+	"""
+	Asynchronous iterator over the values of a broadcast or signal result.
+	This is what iterating over an `XmmsResult` with ``async for`` does.
+
+	Values received while nobody is waiting are queued. An error value is
+	raised as `XmmsError` and ends the iteration. Leaving the loop early
+	does not unsubscribe, use `close` for that.
+	"""
+	def __init__(self, result, loop = None):
+		self.result = result
+		self.loop = _get_loop(loop)
+		self.values = deque()
+		self.waiter = None
+		self.closed = False
+		result.callback = self._push
+
+	def _push(self, xvalue):
+		if self.closed:
+			return False
+		if xvalue.is_error():
+			self.values.append((False, xvalue.get_error()))
+			self.closed = True
+		else:
+			self.values.append((True, xvalue.value()))
+		self._wakeup()
+		return not self.closed
+
+	def _wakeup(self):
+		if self.waiter is not None and not self.waiter.done():
+			self.waiter.set_result(None)
+
+	def __aiter__(self):
+		return self
+
+	async def __anext__(self):
+		while not self.values:
+			if self.closed:
+				raise StopAsyncIteration
+			self.waiter = self.loop.create_future()
+			try:
+				await self.waiter
+			finally:
+				self.waiter = None
+		ok, value = self.values.popleft()
+		if not ok:
+			raise value
+		return value
+
+	def close(self):
+		"""
+		Stop listening to the broadcast or signal. Pending values can still
+		be consumed.
+		"""
+		if not self.closed:
+			self.closed = True
+			self.result.disconnect()
+			self._wakeup()
+
+	async def aclose(self):
+		self.close()
@@ -0,0 +1,331 @@
+"""
+
+ Client-side caches kept up to date with the daemon broadcasts.
+
+ MedialibInfoCache(xmms, size): LRU cache of medialib_get_info results.
+ QueryCache(xmms, size): LRU cache of coll_query and coll_query_infos
+                         results.
+
+ The caches subscribe to broadcasts on the connection they are given, so
+ that connection has to be driven by a main loop (`XmmsLoop`, one of the
+ connectors...) for them to be invalidated. Clients without a main loop
+ can pass poll=True to process pending broadcasts on every lookup.
+
+"""
+from collections import OrderedDict
+from select import select
+try:
+	from time import monotonic as _time
+except ImportError:
+	from time import time as _time
+
+from xmmsclient import XmmsValue, VALUE_TYPE_LIST
+
+class _BroadcastCache(object):
+	"""
+	LRU cache of result values, bounded by the total cost of its entries.
+	"""
+	def __init__(self, xmms, size, ttl, poll):
+		if size < 1:
+			raise ValueError("size must be positive")
+		self.xmms = xmms
+		self.size = size
+		self.ttl = ttl
+		self.poll = poll
+		self.used = 0
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self.expirations = 0
+		self.invalidations = 0
+		self._entries = OrderedDict()
+		self._pending = {}
+		self._broadcasts = []
+
+	def _subscribe(self, broadcast, cb):
+		def _cb(xvalue):
+			if not xvalue.is_error():
+				cb(xvalue.value())
+			return True
+		self._broadcasts.append(broadcast(cb = _cb))
+
+	def _process_broadcasts(self):
+		fd = self.xmms.get_fd()
+		if select([fd], [], [], 0)[0]:
+			self.xmms.ioin()
+
+	def _cost(self, xvalue):
+		return 1
+
+	def _expired(self, entry):
+		"""
+		Account for an entry removed from the cache if it has expired.
+		"""
+		xvalue, cost, expires = entry
+		if expires is not None and expires <= _time():
+			self.used -= cost
+			self.expirations += 1
+			return True
+		return False
+
+	def _lookup(self, key):
+		if self.poll:
+			self._process_broadcasts()
+		try:
+			entry = self._entries.pop(key)
+		except KeyError:
+			self.misses += 1
+			return None
+		if self._expired(entry):
+			self.misses += 1
+			return None
+		xvalue, cost, expires = entry
+		self._entries[key] = entry # Most recently used
+		self.hits += 1
+		return xvalue
+
+	def _store(self, key, xvalue):
+		cost = self._cost(xvalue)
+		if cost > self.size:
+			return
+		entries = self._entries
+		old = entries.pop(key, None)
+		if old is not None:
+			self.used -= old[1]
+		expires = None
+		if self.ttl is not None:
+			expires = _time() + self.ttl
+		entries[key] = (xvalue, cost, expires)
+		self.used += cost
+		while self.used > self.size:
+			self.used -= entries.popitem(last = False)[1][1]
+			self.evictions += 1
+
+	def _fetch(self, key, request, cb):
+		pending = self._pending.get(key)
+		if pending is not None:
+			pending[0].append(cb)
+			return pending[1]
+		callbacks = [cb]
+		def _reply(xvalue):
+			# Not cached if invalidated while the request was in flight.
+			if self._pending.get(key, (None,))[0] is callbacks:
+				del self._pending[key]
+				if not xvalue.is_error():
+					self._store(key, xvalue)
+			for f in callbacks:
+				f(xvalue)
+			return False
+		res = request(cb = _reply)
+		self._pending[key] = (callbacks, res)
+		return res
+
+	def _get_async(self, key, request, cb):
+		xvalue = self._lookup(key)
+		if xvalue is None:
+			self._fetch(key, request, cb)
+		else:
+			cb(xvalue)
+
+	def _get(self, key, request):
+		xvalue = self._lookup(key)
+		if xvalue is None:
+			ret = []
+			self._fetch(key, request, ret.append).wait()
+			xvalue = ret[0]
+		if xvalue.is_error():
+			raise xvalue.get_error()
+		return xvalue.value()
+
+	def _drop(self, key):
+		entry = self._entries.pop(key, None)
+		if entry is not None:
+			self.used -= entry[1]
+			self.invalidations += 1
+		self._pending.pop(key, None)
+
+	def __len__(self):
+		return len(self._entries)
+
+	def stats(self):
+		"""
+		:return: A dict with the number of hits, misses, evictions (entries
+		         dropped to honor the size bound), expirations and
+		         invalidations (entries dropped because of a broadcast) so
+		         far, along with the current number of entries and their
+		         total cost.
+		"""
+		return {
+			'hits': self.hits,
+			'misses': self.misses,
+			'evictions': self.evictions,
+			'expirations': self.expirations,
+			'invalidations': self.invalidations,
+			'entries': len(self._entries),
+			'used': self.used
+		}
+
+	def invalidate_all(self, *a):
+		"""
+		Drop all the entries of the cache, counting them as invalidated.
+		"""
+		self.invalidations += len(self._entries)
+		self.clear()
+
+	def clear(self):
+		"""
+		Drop all the entries of the cache.
+		"""
+		self._entries.clear()
+		self._pending.clear()
+		self.used = 0
+
+	def close(self):
+		"""
+		Unsubscribe from the broadcasts and empty the cache.
+		"""
+		for res in self._broadcasts:
+			res.disconnect()
+		self._broadcasts = []
+		self.clear()
+
+class MedialibInfoCache(_BroadcastCache):
+	"""
+	A size-bounded LRU cache of `XmmsApi.medialib_get_info` results.
+
+	Entries are evicted as soon as the daemon broadcasts that they have been
+	updated or removed. Concurrent lookups of an id missing from the cache
+	share a single request.
+
+	>>> cache = MedialibInfoCache(xc, 4096)
+	>>> cache.medialib_get_info(id, cb = handle_info) # Like xc.medialib_get_info
+	>>> info = cache.get_info(id) # Waits on a miss
+	"""
+	def __init__(self, xmms, size = 1024, ttl = None, poll = False):
+		"""
+		:param xmms: The `XmmsApi` connection to fetch information with.
+		:param size: Maximum number of entries.
+		:param ttl: Number of seconds after which entries expire, or None.
+		:param poll: Whether to process pending broadcasts before every
+		             lookup, for clients without a main loop.
+		"""
+		super(MedialibInfoCache, self).__init__(xmms, size, ttl, poll)
+		self._subscribe(xmms.broadcast_medialib_entry_updated, self.invalidate)
+		self._subscribe(xmms.broadcast_medialib_entry_removed, self.invalidate)
+
+	def __contains__(self, id):
+		entry = self._entries.get(id)
+		if entry is None:
+			return False
+		if self._expired(entry):
+			del self._entries[id]
+			return False
+		return True
+
+	def _request(self, id):
+		return lambda cb: self.xmms.medialib_get_info(id, cb = cb)
+
+	def medialib_get_info(self, id, cb):
+		"""
+		Get information about a medialib entry, from the cache if possible.
+		On a hit, cb is called right away.
+
+		:param cb: Called with the `XmmsValue` of the information, like a
+		           callback of `XmmsApi.medialib_get_info`.
+		"""
+		self._get_async(id, self._request(id), cb)
+
+	def get_info(self, id):
+		"""
+		Get information about a medialib entry, from the cache if possible,
+		waiting for the daemon otherwise.
+
+		:return: A `PropDict`
+		:raise XmmsError: If the information could not be retrieved.
+		"""
+		return self._get(id, self._request(id))
+
+	def invalidate(self, id):
+		"""
+		Drop an entry from the cache.
+		"""
+		self._drop(id)
+
+class QueryCache(_BroadcastCache):
+	"""
+	A size-bounded LRU cache of `XmmsApi.coll_query` and
+	`XmmsApi.coll_query_infos` results, keyed on the serialized collection
+	and query parameters.
+
+	As there is no telling which queries a change affects, the whole cache
+	is dropped whenever a collection changes or a medialib entry is added,
+	updated or removed.
+
+	>>> cache = QueryCache(xc, ttl = 60)
+	>>> cache.coll_query_infos(coll, ['artist'], groupby = ['artist'], cb = handle_artists)
+	>>> artists = cache.query_infos(coll, ['artist'], groupby = ['artist']) # Waits on a miss
+	"""
+	def __init__(self, xmms, size = 65536, ttl = None, poll = False):
+		"""
+		:param xmms: The `XmmsApi` connection to query.
+		:param size: Maximum number of cached rows, a result counting for
+		             the length of its list (or one if it is not a list).
+		:param ttl: Number of seconds after which results expire, or None.
+		:param poll: Whether to process pending broadcasts before every
+		             lookup, for clients without a main loop.
+		"""
+		super(QueryCache, self).__init__(xmms, size, ttl, poll)
+		self._subscribe(xmms.broadcast_collection_changed, self.invalidate_all)
+		self._subscribe(xmms.broadcast_medialib_entry_added, self.invalidate_all)
+		self._subscribe(xmms.broadcast_medialib_entry_updated, self.invalidate_all)
+		self._subscribe(xmms.broadcast_medialib_entry_removed, self.invalidate_all)
+
+	def _cost(self, xvalue):
+		if xvalue.get_type() == VALUE_TYPE_LIST:
+			return max(len(xvalue.get_list_view()), 1)
+		return 1
+
+	def _query(self, coll, fetch):
+		key = (coll.serialize(), XmmsValue(pyval = fetch).serialize())
+		return key, lambda cb: self.xmms.coll_query(coll, fetch, cb = cb)
+
+	def _query_infos(self, coll, fields, start, leng, order, groupby):
+		params = [fields, start, leng, order or [], groupby or []]
+		key = (coll.serialize(), XmmsValue(pyval = params).serialize())
+		return key, lambda cb: self.xmms.coll_query_infos(coll, fields, start, leng, order, groupby, cb = cb)
+
+	def coll_query(self, coll, fetch, cb):
+		"""
+		Like `XmmsApi.coll_query`, from the cache if possible. On a hit, cb
+		is called right away.
+		"""
+		key, request = self._query(coll, fetch)
+		self._get_async(key, request, cb)
+
+	def coll_query_infos(self, coll, fields, start = 0, leng = 0, order = None, groupby = None, cb = None):
+		"""
+		Like `XmmsApi.coll_query_infos`, from the cache if possible. On a
+		hit, cb is called right away.
+		"""
+		if cb is None:
+			raise TypeError("A callback is required, use query_infos to wait for the result")
+		key, request = self._query_infos(coll, fields, start, leng, order, groupby)
+		self._get_async(key, request, cb)
+
+	def query(self, coll, fetch):
+		"""
+		Like `XmmsApi.coll_query`, waiting for the daemon on a miss.
+
+		:return: The value of the query.
+		:raise XmmsError: If the query failed.
+		"""
+		return self._get(*self._query(coll, fetch))
+
+	def query_infos(self, coll, fields, start = 0, leng = 0, order = None, groupby = None):
+		"""
+		Like `XmmsApi.coll_query_infos`, waiting for the daemon on a miss.
+
+		:return: A list of dicts.
+		:raise XmmsError: If the query failed.
+		"""
+		return self._get(*self._query_infos(coll, fields, start, leng, order, groupby))
@@ -0,0 +1,121 @@
+"""
+
+ Coalescing of broadcasts
+
+ XmmsCoalescer(broadcast, callback): deliver the values of a broadcast in
+                                     batches.
+
+ Some operations (adding a large collection to a playlist, importing a
+ directory...) make the daemon send thousands of broadcasts in a row.
+ Instead of handling them one by one, values are buffered for a time
+ window or up to a number of values, duplicates are merged, and the
+ callback gets them all at once:
+
+	xc = xmmsclient.XmmsLoop('clientname')
+	xc.connect()
+	XmmsCoalescer(xc.broadcast_medialib_entry_updated, refresh_entries,
+	              window = 0.2, key = lambda id: id)
+	xc.loop()
+
+ The window is timed by the main loop driving the connection, through its
+ call_later method: `XmmsLoop`, the GLib connectors, `XmmsEventLoop` and
+ asyncio event loops all provide one.
+
+"""
+from collections import OrderedDict
+
+class XmmsCoalescer(object):
+	"""
+	Buffers the values of a broadcast and passes them to a callback as a
+	list, at most window seconds after the first of them was received.
+	"""
+	def __init__(self, broadcast, callback, window = 0.1, max_values = None,
+	             key = None, scheduler = None):
+		"""
+		:param broadcast: The broadcast method to subscribe to, e.g.
+		                  xc.broadcast_playlist_changed.
+		:param callback: Called with the list of buffered values.
+		:param window: Maximum number of seconds a value is buffered.
+		:param max_values: Number of buffered values after which they are
+		                   delivered right away, or None.
+		:param key: If given, values with the same key(value) are merged,
+		            keeping the position of the first one and the latest
+		            value.
+		:param scheduler: An object with a call_later(delay, callback)
+		                  method returning a cancellable timer, typically
+		                  the main loop or connector driving the connection.
+		                  Defaults to the connection itself, which works
+		                  for `XmmsLoop`.
+		"""
+		if scheduler is None:
+			scheduler = getattr(broadcast, '__self__', None)
+		if not hasattr(scheduler, 'call_later'):
+			raise TypeError("A scheduler with a call_later method is required")
+		self.callback = callback
+		self.window = window
+		self.max_values = max_values
+		self.key = key
+		self.scheduler = scheduler
+		self.received = 0
+		self.merged = 0
+		self.batches = 0
+		self._timer = None
+		self._values = self._new_buffer()
+		self.result = broadcast(cb = self._push)
+
+	def _new_buffer(self):
+		if self.key is None:
+			return []
+		return OrderedDict()
+
+	def _push(self, xvalue):
+		if xvalue.is_error():
+			return True
+		value = xvalue.value()
+		self.received += 1
+		values = self._values
+		if self.key is None:
+			values.append(value)
+		else:
+			k = self.key(value)
+			if k in values:
+				self.merged += 1
+			values[k] = value
+		if self.max_values is not None and len(values) >= self.max_values:
+			self.flush()
+		elif self._timer is None:
+			self._timer = self.scheduler.call_later(self.window, self.flush)
+		return True
+
+	def __len__(self):
+		return len(self._values)
+
+	def flush(self):
+		"""
+		Deliver the buffered values now, if any.
+		"""
+		if self._timer is not None:
+			self._timer.cancel()
+			self._timer = None
+		values = self._values
+		if not values:
+			return
+		self._values = self._new_buffer()
+		if self.key is not None:
+			values = list(values.values())
+		self.batches += 1
+		self.callback(values)
+
+	def close(self, flush = True):
+		"""
+		Unsubscribe from the broadcast.
+
+		:param flush: Whether to deliver the values still buffered.
+		"""
+		self.result.disconnect()
+		if flush:
+			self.flush()
+		elif self._timer is not None:
+			self._timer.cancel()
+			self._timer = None
+		self._values = self._new_buffer()
@@ -60,6 +60,10 @@ from xmmsapi import COLLECTION_CHANGED_REMOVE
 from xmmsapi import PLAYBACK_SEEK_SET
 from xmmsapi import PLAYBACK_SEEK_CUR
 
+from xmmsapi import RESULT_CLASS_DEFAULT
+from xmmsapi import RESULT_CLASS_SIGNAL
+from xmmsapi import RESULT_CLASS_BROADCAST
+
 from xmmsapi import COLLECTION_NS_COLLECTIONS
 from xmmsapi import COLLECTION_NS_PLAYLISTS
 from xmmsapi import COLLECTION_NS_ALL
@@ -0,0 +1,274 @@
+"""
+
+ A main loop based on the selectors module
+
+ XmmsEventLoop(): a main loop driving any number of connections, along with
+                  scheduled callbacks.
+
+ Unlike `XmmsLoop`, the file descriptors are registered once with the
+ selector (epoll, kqueue, ... depending on the platform) and only updated
+ when a connection starts or stops having data to send.
+
+"""
+import os
+import sys
+import heapq
+import selectors
+try:
+	from time import monotonic as _time
+except ImportError:
+	from time import time as _time
+
+from xmmsclient import XmmsTimer
+
+def _print_exception():
+	import traceback
+	traceback.print_exception(*sys.exc_info())
+
+class _Connection(object):
+	def __init__(self, loop, xmms):
+		self.loop = loop
+		self.xmms = xmms
+		self.fd = xmms.get_fd()
+		self.events = selectors.EVENT_READ
+
+	def _set_events(self, events):
+		if self.fd is not None and events != self.events:
+			self.events = events
+			self.loop.selector.modify(self.fd, events, self)
+
+	def need_out(self, i):
+		if self.xmms.want_ioout():
+			self._set_events(selectors.EVENT_READ | selectors.EVENT_WRITE)
+
+	def __call__(self, mask):
+		if mask & selectors.EVENT_READ:
+			if not self.xmms.ioin():
+				self.loop.remove_connection(self.xmms)
+				return
+		if self.fd is None: # Removed by a callback
+			return
+		if mask & selectors.EVENT_WRITE:
+			if self.xmms.want_ioout() and not self.xmms.ioout():
+				self.loop.remove_connection(self.xmms)
+				return
+			if not self.xmms.want_ioout():
+				self._set_events(selectors.EVENT_READ)
+
+class _Reader(object):
+	def __init__(self, callback, args):
+		self.callback = callback
+		self.args = args
+
+	def __call__(self, mask):
+		self.callback(*self.args)
+
+class XmmsEventLoop(object):
+	"""
+	A main loop driving several connections to XMMS2 daemons.
+
+	>>> import xmmsclient
+	>>> from xmmsclient.eventloop import XmmsEventLoop
+	>>> loop = XmmsEventLoop()
+	>>> for path in paths:
+	>>>   xc = xmmsclient.Xmms('clientname')
+	>>>   xc.connect(path)
+	>>>   loop.add_connection(xc)
+	>>>   xc.playback_status(cb=handle_status)
+	>>> loop.call_later(60, loop.exit_loop)
+	>>> loop.loop()
+	"""
+	def __init__(self, selector = None):
+		if selector is None:
+			selector = selectors.DefaultSelector()
+		self.selector = selector
+		self.timers = []
+		self.do_loop = False
+		self._seq = 0
+		self._connections = {}
+		self._readers = {}
+		self._wakeup_r, self._wakeup_w = os.pipe()
+		for fd in (self._wakeup_r, self._wakeup_w):
+			_set_nonblocking(fd)
+		self.selector.register(self._wakeup_r, selectors.EVENT_READ, _Reader(self._purge_wakeup, ()))
+
+	def add_connection(self, xmms):
+		"""
+		Drive a connected `XmmsCore` from this loop. It is removed from the
+		loop when disconnected from the daemon.
+		"""
+		if xmms in self._connections:
+			return
+		conn = _Connection(self, xmms)
+		self.selector.register(conn.fd, conn.events, conn)
+		self._connections[xmms] = conn
+		xmms.set_need_out_fun(conn.need_out)
+		# Flush the requests issued before the connection was added.
+		conn.need_out(1)
+
+	def remove_connection(self, xmms):
+		"""
+		Stop driving a connection from this loop.
+		"""
+		conn = self._connections.pop(xmms, None)
+		if conn is None:
+			return
+		xmms.set_need_out_fun(None)
+		try:
+			self.selector.unregister(conn.fd)
+		except (KeyError, ValueError):
+			pass
+		conn.fd = None
+
+	def connections(self):
+		"""
+		:return: The list of connections driven by this loop.
+		"""
+		return list(self._connections)
+
+	def add_reader(self, fd, callback, *args):
+		"""
+		Call callback(*args) whenever fd is readable.
+		"""
+		reader = _Reader(callback, args)
+		self.selector.register(fd, selectors.EVENT_READ, reader)
+		self._readers[fd] = reader
+
+	def remove_reader(self, fd):
+		if self._readers.pop(fd, None) is not None:
+			self.selector.unregister(fd)
+
+	def call_at(self, when, callback, *args):
+		"""
+		Call callback(*args) once the monotonic clock reaches when.
+
+		:return: An `XmmsTimer` which can be cancelled.
+		"""
+		self._seq += 1
+		timer = XmmsTimer(when, self._seq, callback, args)
+		heapq.heappush(self.timers, timer)
+		return timer
+
+	def call_later(self, delay, callback, *args):
+		"""
+		Call callback(*args) in delay seconds.
+
+		:return: An `XmmsTimer` which can be cancelled.
+		"""
+		return self.call_at(_time() + delay, callback, *args)
+
+	def call_soon(self, callback, *args):
+		"""
+		Call callback(*args) in the next iteration of the loop.
+
+		:return: An `XmmsTimer` which can be cancelled.
+		"""
+		return self.call_at(0, callback, *args)
+
+	def time(self):
+		"""
+		:return: The current time according to the clock used for timers.
+		"""
+		return _time()
+
+	def exit_loop(self):
+		"""
+		Exits from the `loop` call
+		"""
+		self.do_loop = False
+		self.loop_tickle()
+
+	def loop_tickle(self):
+		"""
+		Wake the loop up, e.g. after scheduling a callback from another
+		thread.
+		"""
+		try:
+			os.write(self._wakeup_w, b'1')
+		except OSError: # Pipe full, the loop will wake up anyway.
+			pass
+
+	def _purge_wakeup(self):
+		try:
+			while os.read(self._wakeup_r, 4096):
+				pass
+		except OSError:
+			pass
+
+	def _has_timers(self):
+		timers = self.timers
+		while timers and timers[0].cancelled:
+			heapq.heappop(timers)
+		return len(timers) > 0
+
+	def _next_timeout(self, timeout):
+		timers = self.timers
+		if self._has_timers():
+			delay = max(0, timers[0].when - _time())
+			if timeout is None or timeout < 0 or delay < timeout:
+				return delay
+		if timeout is not None and timeout < 0:
+			return None
+		return timeout
+
+	def _run_timers(self):
+		timers = self.timers
+		now = _time()
+		while timers and timers[0].when <= now:
+			timer = heapq.heappop(timers)
+			if timer.cancelled:
+				continue
+			callback, args = timer.callback, timer.args
+			timer.cancel()
+			try:
+				callback(*args)
+			except:
+				_print_exception()
+
+	def loop_iter(self, timeout = -1):
+		"""
+		Run one iteration of the main loop: wait for the connections to be
+		ready for I/O, for at most timeout seconds (forever if negative),
+		handle them, then run the timers that are due.
+		"""
+		for key, mask in self.selector.select(self._next_timeout(timeout)):
+			try:
+				key.data(mask)
+			except:
+				_print_exception()
+		self._run_timers()
+
+	def loop(self, timeout = None):
+		"""
+		Run the loop until `exit_loop` is called, timeout seconds elapse,
+		or there is nothing left to wait for: no connection, reader, or
+		timer.
+		"""
+		timer = None
+		if timeout is not None:
+			timer = self.call_later(timeout, self.exit_loop)
+		self.do_loop = True
+		while self.do_loop and (self._connections or self._readers or self._has_timers()):
+			self.loop_iter()
+		self.do_loop = False
+		if timer is not None:
+			timer.cancel()
+
+	def close(self):
+		"""
+		Remove all the connections and release the resources of the loop.
+		"""
+		for xmms in list(self._connections):
+			self.remove_connection(xmms)
+		self.selector.close()
+		os.close(self._wakeup_r)
+		os.close(self._wakeup_w)
+		self.timers = []
+
+def _set_nonblocking(fd):
+	try:
+		os.set_blocking(fd, False)
+	except AttributeError:
+		import fcntl
+		flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+		fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
@@ -50,6 +50,39 @@ class GLibConnectorBase(object):
 			self.go.source_remove(self.out_id)
 			self.out_id = None
 
+	def call_later(self, delay, callback, *args):
+		"""
+		Call callback(*args) from the GLib main loop in delay seconds.
+
+		:return: A `GLibTimer` which can be cancelled.
+		"""
+		return GLibTimer(self.go, delay, callback, args)
+
+
+class GLibTimer(object):
+	def __init__(self, gobject, delay, callback, args):
+		self.go = gobject
+		self.callback = callback
+		self.args = args
+		self.source_id = gobject.timeout_add(int(delay * 1000), self._run)
+
+	def _run(self):
+		self.source_id = None
+		callback, args = self.callback, self.args
+		self.cancel()
+		callback(*args)
+		return False
+
+	def cancel(self):
+		"""
+		Do not run the callback.
+		"""
+		if not self.source_id is None:
+			self.go.source_remove(self.source_id)
+			self.source_id = None
+		self.callback = None
+		self.args = None
+
 
 class GLibConnector(GLibConnectorBase):
 	def __init__(self, xmms):
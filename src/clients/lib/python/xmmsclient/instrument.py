@@ -0,0 +1,227 @@
+"""
+
+ Request instrumentation
+
+ XmmsInstrumentation(): per-method counters and latency histograms of the
+                        requests made on one or more connections.
+
+ The instrumentation is hooked into the creation of every result, and the
+ reply is accounted for when it is processed, whether through a callback or
+ `XmmsResult.wait`. Broadcasts and signals are not measured. The overhead
+ is a few dict updates per request, so it can be left enabled in
+ production. Measuring reply sizes costs a serialization of every reply, so
+ it has to be asked for.
+
+	xc = xmmsclient.Xmms('clientname')
+	xc.connect()
+	instr = XmmsInstrumentation().attach(xc)
+	...
+	print(instr.stats()['medialib_get_info']['p99'])
+
+"""
+import threading
+from bisect import bisect_left
+try:
+	from time import monotonic as _time
+except ImportError:
+	from time import time as _time
+
+# Upper bounds of the latency buckets, in seconds.
+DEFAULT_BOUNDS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                  0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class XmmsMethodStats(object):
+	"""
+	Counters and latency histogram of the requests of one method.
+
+	The last bucket of the histogram counts the requests slower than the
+	last bound.
+	"""
+	__slots__ = ('bounds', 'count', 'errors', 'abandoned', 'pending',
+	             'bytes', 'total_time', 'max_time', 'buckets')
+
+	def __init__(self, bounds):
+		self.bounds = bounds
+		self.count = 0
+		self.errors = 0
+		self.abandoned = 0
+		self.pending = 0
+		self.bytes = 0
+		self.total_time = 0.0
+		self.max_time = 0.0
+		self.buckets = [0] * (len(bounds) + 1)
+
+	def _add(self, latency, size, is_error):
+		self.pending -= 1
+		self.count += 1
+		if is_error:
+			self.errors += 1
+		self.bytes += size
+		self.total_time += latency
+		if latency > self.max_time:
+			self.max_time = latency
+		self.buckets[bisect_left(self.bounds, latency)] += 1
+
+	def mean(self):
+		"""
+		:return: The mean latency in seconds, or None if no reply was
+		         received yet.
+		"""
+		if not self.count:
+			return None
+		return self.total_time / self.count
+
+	def percentile(self, p):
+		"""
+		Estimate a latency percentile from the histogram.
+
+		:param p: The percentile, between 0 and 100.
+		:return: The upper bound of the bucket the percentile falls in
+		         (the maximum latency for the last bucket), or None if no
+		         reply was received yet.
+		"""
+		if not self.count:
+			return None
+		rank = self.count * p / 100.0
+		seen = 0
+		for i, n in enumerate(self.buckets):
+			seen += n
+			if n and seen >= rank:
+				if i < len(self.bounds):
+					return min(self.bounds[i], self.max_time)
+				break
+		return self.max_time
+
+	def histogram(self):
+		"""
+		:return: A list of (bound, count) tuples, the last bound being None.
+		"""
+		return list(zip(tuple(self.bounds) + (None,), self.buckets))
+
+	def as_dict(self):
+		return {
+			'count': self.count,
+			'errors': self.errors,
+			'abandoned': self.abandoned,
+			'pending': self.pending,
+			'bytes': self.bytes,
+			'mean': self.mean(),
+			'max': self.max_time,
+			'p50': self.percentile(50),
+			'p90': self.percentile(90),
+			'p99': self.percentile(99),
+			'histogram': self.histogram()
+		}
+
+class XmmsInstrumentation(object):
+	"""
+	Collects statistics about the requests made on the connections it is
+	attached to. One instance may be shared by several connections, e.g.
+	those of an `XmmsPool`.
+	"""
+	def __init__(self, bounds = None, measure_size = False, trace = None):
+		"""
+		:param bounds: Sorted upper bounds of the latency buckets, in
+		               seconds. Defaults to `DEFAULT_BOUNDS`.
+		:param measure_size: Whether to account for the serialized size of
+		                     the replies, which costs a serialization of
+		                     each of them.
+		:param trace: Called as trace(method, latency, size, is_error) for
+		              every reply, e.g. to log slow requests. size is None
+		              when not measured.
+		"""
+		if bounds is None:
+			bounds = DEFAULT_BOUNDS
+		self.bounds = tuple(bounds)
+		self.measure_size = measure_size
+		self.trace = trace
+		self._methods = {}
+		self._lock = threading.Lock()
+
+	def attach(self, xmms):
+		"""
+		Measure the requests made on a connection (an `Xmms` object or a
+		proxy of one, such as `XmmsSync`).
+
+		:return: self
+		"""
+		getattr(xmms, '_xmms', xmms).instrumentation = self
+		return self
+
+	def detach(self, xmms):
+		"""
+		Stop measuring the requests made on a connection. The replies to
+		requests already issued are still accounted for.
+		"""
+		xmms = getattr(xmms, '_xmms', xmms)
+		if xmms.instrumentation is self:
+			xmms.instrumentation = None
+
+	def _get(self, name):
+		stats = self._methods.get(name)
+		if stats is None:
+			stats = self._methods.setdefault(name, XmmsMethodStats(self.bounds))
+		return stats
+
+	def issued(self, name):
+		"""
+		Called when a request is issued.
+
+		:return: A token to be passed to `completed` or `abandoned`.
+		"""
+		with self._lock:
+			self._get(name).pending += 1
+		return (name, _time())
+
+	def completed(self, token, xvalue):
+		"""
+		Called with the `XmmsValue` of the reply to a request.
+		"""
+		name, issued = token
+		latency = _time() - issued
+		size = None
+		if self.measure_size:
+			size = len(xvalue.serialize())
+		is_error = xvalue.is_error()
+		with self._lock:
+			self._get(name)._add(latency, size or 0, is_error)
+		if self.trace is not None:
+			self.trace(name, latency, size, is_error)
+
+	def abandoned(self, token):
+		"""
+		Called when a request is disconnected before its reply came.
+		"""
+		with self._lock:
+			stats = self._get(token[0])
+			stats.pending -= 1
+			stats.abandoned += 1
+
+	def method_stats(self, name):
+		"""
+		:return: The `XmmsMethodStats` of a method, or None.
+		"""
+		return self._methods.get(name)
+
+	def stats(self):
+		"""
+		:return: A dict mapping method names to dicts of counters:
+		         count, errors, abandoned, pending, bytes (0 unless
+		         measure_size is set), mean, max, p50, p90, p99 (latencies
+		         in seconds) and histogram.
+		"""
+		with self._lock:
+			return dict((name, stats.as_dict())
+					for name, stats in self._methods.items())
+
+	def reset(self):
+		"""
+		Clear the statistics. Requests in flight are still counted as
+		pending.
+		"""
+		with self._lock:
+			methods = self._methods
+			self._methods = {}
+			for name, stats in methods.items():
+				if stats.pending:
+					self._get(name).pending = stats.pending
@@ -0,0 +1,174 @@
+import threading
+try:
+	import queue
+except ImportError:
+	import Queue as queue
+try:
+	from time import monotonic as _time
+except ImportError:
+	from time import time as _time
+
+import xmmsapi
+from sync import XmmsSync
+
+class XmmsPool(object):
+	"""
+	A pool of independent connections to the XMMS2 daemon, to be shared by
+	several threads. A connection is only used by one thread at a time,
+	and since waiting for a result does not hold the GIL, requests made
+	from different threads run concurrently.
+
+	Connections are created as needed, up to size, with distinct client
+	names derived from clientname ("clientname-0", "clientname-1", ...).
+
+	>>> import xmmsclient
+	>>> pool = xmmsclient.XmmsPool('clientname', 4)
+	>>> with pool.connection() as xc:
+	...     xc.playback_status()
+	"""
+	def __init__(self, clientname = None, size = 4, path = None, sync = True):
+		"""
+		:param size: Maximum number of connections.
+		:param path: IPC path to connect to, see `XmmsCore.connect`.
+		:param sync: Whether to hand out `XmmsSync` objects or bare
+		             `Xmms` objects.
+		"""
+		if size < 1:
+			raise ValueError("A pool needs at least one connection")
+		if not clientname:
+			clientname = "UnnamedPythonClient"
+		self.clientname = clientname
+		self.size = size
+		self.path = path
+		self.sync = sync
+		self._idle = []
+		self._connections = []
+		self._connecting = 0
+		self._closed = False
+		self._cond = threading.Condition()
+		self._count = 0
+
+	def _new_connection(self, name):
+		xmms = xmmsapi.Xmms(name)
+		xmms.connect(self.path)
+		if self.sync:
+			return XmmsSync(xmms = xmms)
+		return xmms
+
+	def acquire(self, timeout = None):
+		"""
+		Get a connection for the exclusive use of the calling thread. It
+		must be given back with `release` or `discard`.
+
+		:param timeout: How long to wait for a connection when all of them
+		                are in use, forever if None.
+		:return: A connection
+		:raise queue.Empty: If no connection became available in time.
+		:raise RuntimeError: If the pool is closed.
+		"""
+		deadline = None
+		if timeout is not None:
+			deadline = _time() + timeout
+		with self._cond:
+			while True:
+				if self._closed:
+					raise RuntimeError("The pool is closed")
+				if self._idle:
+					return self._idle.pop()
+				if len(self._connections) + self._connecting < self.size:
+					break
+				remaining = None
+				if deadline is not None:
+					remaining = deadline - _time()
+					if remaining <= 0:
+						raise queue.Empty
+				self._cond.wait(remaining)
+			# Reserve the slot, connecting must not block other threads.
+			self._connecting += 1
+			name = "%s-%d" % (self.clientname, self._count)
+			self._count += 1
+		try:
+			xc = self._new_connection(name)
+		except:
+			with self._cond:
+				self._connecting -= 1
+				self._cond.notify()
+			raise
+		with self._cond:
+			self._connecting -= 1
+			if not self._closed:
+				self._connections.append(xc)
+				return xc
+		xc.disconnect()
+		raise RuntimeError("The pool is closed")
+
+	def release(self, xc):
+		"""
+		Give a connection back to the pool.
+
+		:raise RuntimeError: If the connection was already released.
+		"""
+		with self._cond:
+			if xc not in self._connections: # The pool was closed.
+				return
+			if xc in self._idle:
+				raise RuntimeError("The connection was already released")
+			self._idle.append(xc)
+			self._cond.notify()
+
+	def discard(self, xc):
+		"""
+		Remove a broken connection from the pool, letting a new one be
+		created in its place.
+		"""
+		with self._cond:
+			if xc in self._connections:
+				self._connections.remove(xc)
+				if xc in self._idle:
+					self._idle.remove(xc)
+				self._cond.notify()
+		xc.disconnect()
+
+	def connection(self, timeout = None):
+		"""
+		Get a connection to be used in a ``with`` block, see `acquire`.
+		The connection is released at the end of the block, or discarded
+		if the block raised an IOError.
+		"""
+		return _PooledConnection(self, timeout)
+
+	def __len__(self):
+		return len(self._connections)
+
+	def close(self):
+		"""
+		Disconnect all the connections of the pool. Connections in use are
+		disconnected as well, and threads waiting for a connection get a
+		RuntimeError, as do later calls to `acquire`.
+		"""
+		with self._cond:
+			self._closed = True
+			connections = self._connections
+			self._connections = []
+			self._idle = []
+			self._cond.notify_all()
+		for xc in connections:
+			xc.disconnect()
+
+class _PooledConnection(object):
+	def __init__(self, pool, timeout):
+		self.pool = pool
+		self.timeout = timeout
+		self.xc = None
+
+	def __enter__(self):
+		self.xc = self.pool.acquire(self.timeout)
+		return self.xc
+
+	def __exit__(self, exc_type, exc_value, tb):
+		if exc_type is not None and issubclass(exc_type, IOError):
+			self.pool.discard(self.xc)
+		else:
+			self.pool.release(self.xc)
+		self.xc = None
+		return False
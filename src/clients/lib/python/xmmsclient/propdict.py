@@ -6,9 +6,19 @@ except NameError:
 	basestring = (bytes, str)
 
 class PropDict(dict):
+	"""
+	A dict of values indexed by (source, key) tuples, where values can also
+	be looked up by key only. In that case, the value returned is the one
+	from the first source matching the list of preferred sources.
+
+	The preferred (source, key) pair of every key is kept up to date as the
+	dict is modified, so that lookups by key do not depend on the number of
+	entries or sources.
+	"""
 	def __init__(self, srcs):
 		dict.__init__(self)
 		self._sources = srcs
+		self._reindex()
 
 	def set_source_preference(self, sources):
 		"""
@@ -18,6 +28,84 @@ class PropDict(dict):
 		raise DeprecationWarning("This method has been deprecated and should no longer be used. Set the sources list using the 'sources' property.")
 		self._set_sources(sources)
 
+	def _rank(self, source):
+		"""
+		Position of the first preferred source matching source, or None.
+		"""
+		try:
+			return self._ranks[source]
+		except KeyError:
+			pass
+		rank = None
+		for i, src in enumerate(self._sources or ()):
+			if src.endswith('*'):
+				if source.startswith(src[:-1]):
+					rank = i
+					break
+			elif src == source:
+				rank = i
+				break
+		self._ranks[source] = rank
+		return rank
+
+	def _index(self, item):
+		try:
+			source, key = item
+		except (TypeError, ValueError):
+			return
+		if not isinstance(source, basestring):
+			return
+		items = self._by_key.setdefault(key, [])
+		if item not in items:
+			items.append(item)
+		rank = self._rank(source)
+		if rank is None:
+			return
+		best = self._resolved.get(key)
+		if best is None or rank < best[0]:
+			self._resolved[key] = (rank, item)
+
+	def _unindex(self, item):
+		try:
+			source, key = item
+		except (TypeError, ValueError):
+			return
+		items = self._by_key.get(key)
+		if not items or item not in items:
+			return
+		items.remove(item)
+		best = self._resolved.get(key)
+		if best is None or best[1] != item:
+			return
+		# The preferred entry is gone, look for the next best one.
+		del self._resolved[key]
+		for k in items[:]:
+			self._index(k)
+
+	def _reindex(self):
+		self._ranks = {}
+		self._resolved = resolved = {}
+		self._by_key = by_key = {}
+		rank = self._rank
+		for item in dict.keys(self):
+			try:
+				source, key = item
+			except (TypeError, ValueError):
+				continue
+			if not isinstance(source, basestring):
+				continue
+			by_key.setdefault(key, []).append(item)
+			r = rank(source)
+			if r is None:
+				continue
+			best = resolved.get(key)
+			if best is None or r < best[0]:
+				resolved[key] = (r, item)
+
+	def __reduce__(self):
+		# Entries are restored through __setitem__ once the index exists.
+		return (PropDict, (self._sources,), None, None, iter(dict.items(self)))
+
 	def has_key(self, item):
 		try:
 			self.__getitem__(item)
@@ -32,25 +120,58 @@ class PropDict(dict):
 		try:
 			return dict.__getitem__(self, item)
 		except KeyError:
-			if isinstance(item, basestring):
-				for src in self._sources:
-					if src.endswith('*'):
-						for k in self:
-							if k[0].startswith(src[:-1]) and k[1] == item:
-								return dict.__getitem__(self, k)
-					try:
-						t = dict.__getitem__(self, (src, item))
-						return t
-					except KeyError:
-						pass
+			if isinstance(item, basestring) and item in self._resolved:
+				return dict.__getitem__(self, self._resolved[item][1])
 			raise
 
+	def __setitem__(self, item, value):
+		dict.__setitem__(self, item, value)
+		self._index(item)
+
+	def __delitem__(self, item):
+		dict.__delitem__(self, item)
+		self._unindex(item)
+
 	def get(self, item, default=None):
 		try:
 			return self[item]
 		except KeyError:
 			return default
 
+	def setdefault(self, item, default=None):
+		if not dict.__contains__(self, item):
+			self[item] = default
+		return dict.__getitem__(self, item)
+
+	def pop(self, item, *default):
+		had_item = dict.__contains__(self, item)
+		ret = dict.pop(self, item, *default)
+		if had_item:
+			self._unindex(item)
+		return ret
+
+	def popitem(self):
+		item, value = dict.popitem(self)
+		self._unindex(item)
+		return item, value
+
+	def update(self, *a, **kargs):
+		dict.update(self, *a, **kargs)
+		self._reindex()
+
+	def clear(self):
+		dict.clear(self)
+		self._resolved.clear()
+		self._by_key.clear()
+
+	def resolved(self):
+		"""
+		:return: A dict mapping every key to the value from its preferred
+		         source.
+		"""
+		return dict((key, dict.__getitem__(self, item))
+				for key, (rank, item) in self._resolved.items())
+
 	def _get_sources(self):
 		return self._sources
 	def _set_sources(self, val):
@@ -60,5 +181,5 @@ class PropDict(dict):
 			if not isinstance(i, basestring):
 				raise TypeError("Sources need to be strings")
 		self._sources = val
+		self._reindex()
 	sources = property(_get_sources, _set_sources)
-
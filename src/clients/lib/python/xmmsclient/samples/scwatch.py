@@ -7,16 +7,17 @@ import sys
 class ServiceBrowse:
 	def __init__(self, service):
 		self._service = service
-		self._results = dict()
-		self._results[service._path] = service(cb = self.introspect_cb)
+		# The whole API comes in a single reply.
+		self._result = service(recursive = True, cb = self.introspect_cb)
 
 	def __del__(self):
-		for n, r in self._results.items():
-			r.disconnect()
-		self._results.clear()
+		self._result.disconnect()
 
 	def introspect_cb(self, ns, xval):
-		res = self._results.pop(ns._path, None)
+		if ns is not self._service:
+			# Subnamespace introspected on its own, the remote client
+			# does not support recursive introspection.
+			return
 
 		if xval.is_error():
 			# Occur when the target client disconnected without replying.
@@ -28,15 +29,7 @@ class ServiceBrowse:
 			sys.stderr.write("! Introspection error on #%d: %s\n" % (ns._clientid, payload.value()))
 			return
 
-		for attr in dir(ns):
-			if attr and attr[0] == '_':
-				continue
-			obj = getattr(ns, attr)
-			if isinstance(obj, XmmsServiceClient):
-				self._results[obj._path] = obj(cb = self.introspect_cb)
-
-		if not len(self._results):
-			self.print_ns(self._service)
+		self.print_ns(self._service)
 
 	def print_ns(self, ns, prefix = '+ '):
 		name = ns._path and ns._path[-1] or ("Client #%d API" % ns._clientid)
@@ -6,7 +6,249 @@ from xmmsapi import \
 		service_method, \
 		service_broadcast, \
 		service_constant, \
+		service_deferred, \
 		XmmsServiceNamespace, \
 		client_method, \
 		client_broadcast, \
 		XmmsServiceClient
+
+from xmmsvalue import XmmsError, XmmsValueC2C
+
+class XmmsServiceCache(object):
+	"""
+	A cache of the APIs of other clients, as `XmmsServiceClient` objects
+	keyed by client id.
+
+	The whole API of a client is retrieved in a single request, and dropped
+	from the cache as soon as the daemon broadcasts that the client
+	disconnected. The connection has to be driven by a main loop for that
+	broadcast to be received.
+
+	>>> services = XmmsServiceCache(xc)
+	>>> services.get_client(clientid, cb = use_service)
+	>>> service = services.get(clientid) # Waits on a miss
+	"""
+	def __init__(self, xmms):
+		"""
+		:param xmms: An asynchronous connection (e.g. `XmmsLoop`). The
+		             connection wrapped by an `XmmsSync` is used as is.
+		"""
+		self.xmms = getattr(xmms, '_xmms', xmms) # Unwrap XmmsSync
+		self._clients = {}
+		self._pending = {}
+		self._broadcast = self.xmms.broadcast_c2c_client_disconnected(cb = self._disconnected)
+
+	def _disconnected(self, xvalue):
+		if not xvalue.is_error():
+			ids = xvalue.value()
+			if isinstance(ids, int):
+				ids = (ids,)
+			for clientid in ids:
+				self.invalidate(clientid)
+		return True
+
+	def _fetch(self, clientid, cb):
+		pending = self._pending.get(clientid)
+		if pending is not None:
+			pending[0].append(cb)
+			return pending[1]
+		callbacks = [cb]
+		client = XmmsServiceClient(self.xmms, clientid)
+		def _ready(sc, xvalue):
+			if sc is not client: # Subnamespace of a client without recursive introspection
+				return
+			error = _reply_error(xvalue, "No introspection data")
+			# Not cached if invalidated while the request was in flight.
+			if self._pending.get(clientid, (None,))[0] is callbacks:
+				del self._pending[clientid]
+				if error is None:
+					self._clients[clientid] = client
+			for f in callbacks:
+				f(client, error)
+		res = client(recursive = True, cb = _ready)
+		self._pending[clientid] = (callbacks, res)
+		return res
+
+	def __contains__(self, clientid):
+		return clientid in self._clients
+
+	def __len__(self):
+		return len(self._clients)
+
+	def get_client(self, clientid, cb):
+		"""
+		Get the API of a client, from the cache if possible. On a hit, cb
+		is called right away.
+
+		:param cb: Called with the `XmmsServiceClient` of the client, or
+		           None if its API could not be retrieved.
+		"""
+		client = self._clients.get(clientid)
+		if client is not None:
+			cb(client)
+		else:
+			self._fetch(clientid, lambda client, error: cb(error is None and client or None))
+
+	def get(self, clientid):
+		"""
+		Get the API of a client, from the cache if possible, waiting for it
+		otherwise.
+
+		:return: An `XmmsServiceClient`
+		:raise XmmsError: If the API could not be retrieved.
+		"""
+		client = self._clients.get(clientid)
+		if client is not None:
+			return client
+		ret = []
+		self._fetch(clientid, lambda *a: ret.append(a)).wait()
+		client, error = ret[0]
+		if error is not None:
+			raise error
+		return client
+
+	def invalidate(self, clientid):
+		"""
+		Drop the API of a client from the cache.
+		"""
+		self._clients.pop(clientid, None)
+		self._pending.pop(clientid, None)
+
+	def clear(self):
+		"""
+		Drop all the APIs from the cache.
+		"""
+		self._clients.clear()
+		self._pending.clear()
+
+	def close(self):
+		"""
+		Stop listening to client disconnections and empty the cache.
+		"""
+		self._broadcast.disconnect()
+		self.clear()
+
+class XmmsServiceBatch(object):
+	"""
+	A batch of calls to the methods of another client, sent in a single
+	message. The methods are called in order and reply together, so a
+	batch costs one round trip through the daemon whatever its size.
+
+	Each call returns the position its value will have in `values`.
+
+	>>> with XmmsServiceBatch(xc, clientid) as b:
+	...     for id in ids:
+	...         b.call(('org', 'example', 'lookup'), id)
+	>>> lookups = b.values
+
+	With a callback, the batch is sent at the end of the ``with`` block
+	without waiting for the reply, which suits connections driven by a
+	main loop.
+
+	The methods of a batch cannot defer their reply (see
+	`service_deferred`), the calls that try to fail.
+
+	If the batch fails as a whole, e.g. because the client disconnected
+	or does not support batched calls, `error` is set and each value is
+	that error.
+	"""
+	def __init__(self, xmms, clientid, cb = None):
+		"""
+		:param xmms: The connection to send the batch through.
+		:param clientid: The id of the client whose methods are called.
+		:param cb: Called with `values` once the reply is received.
+		"""
+		self._xmms = getattr(xmms, '_xmms', xmms) # Unwrap XmmsSync
+		self.clientid = clientid
+		self.cb = cb
+		self.result = None
+		self.values = None
+		self.error = None
+		self._calls = []
+
+	def call(self, method, *args, **kargs):
+		"""
+		Add a call to the batch.
+
+		:param method: The path to the method, as a tuple of names, a
+		               dotted string or a method of an `XmmsServiceClient`.
+		:return: The position of the value of the call in `values`.
+		"""
+		if self.result is not None:
+			raise RuntimeError("The batch has already been sent")
+		if isinstance(method, client_method):
+			if method._clientid != self.clientid:
+				raise ValueError("The method belongs to another client")
+			method = method._path
+		elif hasattr(method, 'split'):
+			method = method.split('.')
+		method = tuple(method)
+		if not method or not all(hasattr(name, 'split') and name for name in method):
+			raise ValueError("Invalid method path %r" % (method,))
+		self._calls.append((method, args, kargs))
+		return len(self._calls) - 1
+
+	def __len__(self):
+		return len(self._calls)
+
+	def send(self):
+		"""
+		Send the calls of the batch, if any.
+
+		:return: The `XmmsResult` of the batch, or None if it is empty.
+		:raise RuntimeError: If the batch could not be sent.
+		"""
+		if self.result is None and self._calls:
+			self.result = self._xmms.sc_call_batch(self.clientid, self._calls, cb = self._reply)
+		return self.result
+
+	def wait(self):
+		"""
+		Send the calls of the batch if needed, and wait for their values.
+
+		:return: A list of the values of the calls, in order, with an
+		         `XmmsError` in place of the value of failed calls.
+		:raise XmmsError: If the batch failed as a whole.
+		"""
+		if self.send() is None:
+			self.values = []
+		elif self.values is None:
+			self.result.wait()
+		if self.error is not None:
+			raise self.error
+		return self.values
+
+	def _reply(self, xvalue):
+		error = _reply_error(xvalue)
+		if error is None:
+			self.values = XmmsValueC2C(pyval = xvalue).payload.value()
+		else: # The whole batch failed.
+			if str(error) == "unrecognized command":
+				error = XmmsError("The client does not support batched calls")
+			self.error = error
+			self.values = [error] * len(self._calls)
+		if self.cb is not None:
+			self.cb(self.values)
+		return False
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, tb):
+		if exc_type is None:
+			if self.cb is None:
+				self.wait()
+			elif self.send() is None: # Nothing to wait for.
+				self.values = []
+				self.cb(self.values)
+		return False
+
+def _reply_error(xvalue, missing = "No reply"):
+	if xvalue.is_error(): # The client disconnected without replying.
+		return xvalue.get_error()
+	payload = XmmsValueC2C(pyval = xvalue).payload
+	if payload is None:
+		return XmmsError(missing)
+	if payload.is_error():
+		return payload.get_error()
+	return None
@@ -56,4 +56,90 @@ class XmmsSync(xmmsapi.XmmsProxy):
 	def __dir__(self):
 		return dir(self._xmms)
 
+	def batch(self):
+		"""
+		Start a batch of pipelined calls.
+
+		Calls made on the batch are issued back-to-back without waiting
+		for their results, which are all waited for at the end of the
+		``with`` block.
+
+		>>> with xc.batch() as b:
+		...     for id in ids:
+		...         b.medialib_get_info(id)
+		>>> infos = b.values
+
+		:return: An `XmmsSyncBatch`
+		"""
+		return XmmsSyncBatch(self._xmms)
+
+	def gather(self, calls):
+		"""
+		Issue several calls back-to-back and wait for all of them.
+
+		>>> xc.gather([('medialib_get_info', id) for id in ids])
+
+		:param calls: An iterable of (name, arg1, arg2, ...) tuples.
+		:return: A list of the values of the calls, in order, with an
+		         `XmmsError` in place of the value of failed calls.
+		"""
+		b = XmmsSyncBatch(self._xmms)
+		for call in calls:
+			getattr(b, call[0])(*call[1:])
+		return b.wait()
+
+class XmmsSyncBatch(object):
+	"""
+	A batch of pipelined calls on an `XmmsSync` connection, see
+	`XmmsSync.batch`.
+
+	Each call returns the position its value will have in `values`.
+	"""
+	def __init__(self, xmms):
+		self._xmms = xmms
+		self._results = []
+		self.values = None
+
+	def __getattr__(self, name):
+		attr = getattr(self._xmms, name)
+		if not hasattr(attr, '__call__'):
+			raise AttributeError("'%s' is not a method" % name)
+		def _(*args, **kwargs):
+			ret = attr(*args, **kwargs)
+			if not isinstance(ret, xmmsapi.XmmsResult):
+				raise TypeError("'%s' cannot be used in a batch" % name)
+			self._results.append(ret)
+			return len(self._results) - 1
+		return _
+
+	def __len__(self):
+		return len(self._results)
+
+	def wait(self):
+		"""
+		Wait for all the calls of the batch.
+
+		:return: A list of the values of the calls, in order, with an
+		         `XmmsError` in place of the value of failed calls.
+		"""
+		values = []
+		for ret in self._results:
+			ret.wait()
+			xvalue = ret.xvalue
+			if xvalue.is_error():
+				values.append(xvalue.get_error())
+			else:
+				values.append(xvalue.value())
+		self._results = []
+		self.values = values
+		return values
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, tb):
+		if exc_type is None:
+			self.wait()
+		return False
+
 from xmmsvalue import XmmsError
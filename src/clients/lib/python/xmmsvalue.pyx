@@ -3,7 +3,18 @@ Python bindings for xmmsv manipulations.
 """
 
 from xmmsutils cimport *
-from cpython.bytes cimport PyBytes_FromStringAndSize
+from cpython.bytes cimport PyBytes_FromStringAndSize, PyBytes_AS_STRING, PyBytes_GET_SIZE
+from cpython.unicode cimport PyUnicode_DecodeUTF8
+from cpython.dict cimport PyDict_SetItem
+from cpython.mem cimport PyMem_Malloc, PyMem_Free
+from libc.string cimport memcmp, memset, strcmp
+from cpython.buffer cimport PyObject_CheckBuffer, PyObject_GetBuffer, PyBuffer_Release
+from cpython.buffer cimport PyBUF_SIMPLE, PyBUF_FORMAT, PyBUF_C_CONTIGUOUS
+from cpython.buffer cimport PyBUF_WRITABLE, PyBUF_ND, PyBUF_STRIDES
+from cpython.ref cimport Py_INCREF, Py_DECREF
+from libc.stdint cimport INT64_MAX, uint64_t
+from libc.stdlib cimport qsort
+from cpython cimport array
 cimport cython
 from cxmmsvalue cimport *
 
@@ -39,6 +50,125 @@ COLLECTION_TYPE_IDLIST       = XMMS_COLLECTION_TYPE_IDLIST
 
 from propdict import PropDict # xmmsclient.propdict
 
+import array
+import hashlib
+
+try:
+	from collections.abc import Sequence, Mapping
+except ImportError: # Python 2
+	from collections import Sequence, Mapping
+
+
+cdef xmmsv_t *create_native_bin(object value) except NULL:
+	"""
+	Create a bin value straight from the memory of a buffer object.
+	"""
+	cdef Py_buffer buf
+	cdef xmmsv_t *ret
+
+	PyObject_GetBuffer(value, &buf, PyBUF_SIMPLE)
+	try:
+		ret = xmmsv_new_bin(<unsigned char *>buf.buf, buf.len)
+	finally:
+		PyBuffer_Release(&buf)
+	return ret
+
+cdef char _buffer_format(Py_buffer *buf):
+	"""
+	:return: The struct format character of the items of a buffer.
+	"""
+	cdef char fmt = b'B'
+	if buf.format != NULL:
+		fmt = buf.format[0]
+		if fmt in b'@=<>!' and buf.format[1] != 0:
+			fmt = buf.format[1]
+	return fmt
+
+cdef int64_t _buffer_int(Py_buffer *buf, char fmt, Py_ssize_t i) except? -1:
+	"""
+	Read the i-th item of a buffer of integers in one of the
+	``bBhHiIlLqQ`` formats.
+	"""
+	cdef unsigned long long u
+	if fmt == b'b':
+		return (<signed char *>buf.buf)[i]
+	elif fmt == b'B':
+		return (<unsigned char *>buf.buf)[i]
+	elif fmt == b'h':
+		return (<short *>buf.buf)[i]
+	elif fmt == b'H':
+		return (<unsigned short *>buf.buf)[i]
+	elif fmt == b'i':
+		return (<int *>buf.buf)[i]
+	elif fmt == b'I':
+		return (<unsigned int *>buf.buf)[i]
+	elif fmt == b'l':
+		return (<long *>buf.buf)[i]
+	elif fmt == b'q':
+		return (<long long *>buf.buf)[i]
+	if fmt == b'L':
+		u = (<unsigned long *>buf.buf)[i]
+	else:
+		u = (<unsigned long long *>buf.buf)[i]
+	if u > INT64_MAX:
+		raise OverflowError("Value too large to convert to a native integer")
+	return <int64_t>u
+
+cdef int _get_int_buffer(object value, Py_buffer *buf, char *fmt) except -1:
+	"""
+	Get a buffer on value if it is a buffer of integers, see `_buffer_int`.
+
+	:return: 1 if buf was filled, 0 (holding no buffer) for other objects.
+	"""
+	if not PyObject_CheckBuffer(value):
+		return 0
+	try:
+		PyObject_GetBuffer(value, buf, PyBUF_FORMAT | PyBUF_C_CONTIGUOUS)
+	except BufferError:
+		return 0
+	fmt[0] = _buffer_format(buf)
+	if fmt[0] in b'bBhHiIlLqQ':
+		return 1
+	PyBuffer_Release(buf)
+	return 0
+
+cdef xmmsv_t *create_native_buffer_value(object value) except? NULL:
+	"""
+	Create a value from an object supporting the buffer protocol. Buffers
+	of bytes become bin values, buffers of integers become int lists.
+
+	:return: NULL when the buffer format isn't handled or the buffer holds
+	         a scalar (such as a numpy integer), in which case the caller
+	         should fall back to the generic conversion.
+	"""
+	cdef Py_buffer buf
+	cdef xmmsv_t *ret = NULL
+	cdef Py_ssize_t i
+	cdef Py_ssize_t n
+	cdef char fmt
+
+	try:
+		PyObject_GetBuffer(value, &buf, PyBUF_FORMAT | PyBUF_C_CONTIGUOUS)
+	except BufferError:
+		return NULL
+	try:
+		fmt = _buffer_format(&buf)
+		if buf.ndim == 0:
+			pass
+		elif fmt == b'B' or fmt == b'c':
+			ret = xmmsv_new_bin(<unsigned char *>buf.buf, buf.len)
+		elif fmt in b'bhHiIlLqQ':
+			n = buf.len // buf.itemsize
+			ret = xmmsv_new_list()
+			for i in range(n):
+				xmmsv_list_append_int(ret, _buffer_int(&buf, fmt, i))
+	except:
+		if ret != NULL:
+			xmmsv_unref(ret)
+		raise
+	finally:
+		PyBuffer_Release(&buf)
+	return ret
 
 cdef xmmsv_t *create_native_value(value) except NULL:
 	cdef xmmsv_t *ret = NULL
@@ -46,8 +176,24 @@ cdef xmmsv_t *create_native_value(value) except NULL:
 	cdef XmmsValue xv
 	cdef Collection c
 
+	# Exact types first, they cover most of the values sent to the server.
+	t = type(value)
 	if value is None:
 		ret = xmmsv_new_none()
+	elif t is int:
+		ret = xmmsv_new_int(value)
+	elif t is unicode:
+		s = from_unicode(value)
+		ret = xmmsv_new_string(s)
+	elif t is list or t is tuple:
+		ret = create_native_list(value)
+	elif t is dict:
+		ret = xmmsv_new_dict()
+		for key, item in (<dict>value).items():
+			k = from_unicode(key)
+			v = create_native_value(item)
+			xmmsv_dict_set(ret, k, v)
+			xmmsv_unref(v)
 	elif isinstance(value, XmmsValue):
 		xv = value
 		ret = xmmsv_copy(xv.val) # Prevent side effects.
@@ -59,29 +205,189 @@ cdef xmmsv_t *create_native_value(value) except NULL:
 	elif isinstance(value, (unicode, str)):
 		s = from_unicode(value)
 		ret = xmmsv_new_string(s)
-	elif hasattr(value, "keys"):
-		ret = xmmsv_new_dict()
-		for key in value.keys():
-			k = from_unicode(key)
-			v = create_native_value(value[key])
-			xmmsv_dict_set(ret, k, v)
-			xmmsv_unref(v)
+	elif isinstance(value, (bytes, bytearray)):
+		ret = create_native_bin(value)
 	else:
-		try:
-			it = iter(value)
-		except TypeError:
-			raise TypeError("Type '%s' has no corresponding native value type"
-					% value.__class__.__name__)
+		# Buffers come before __index__, which numpy arrays define but
+		# only honor for a single item.
+		if PyObject_CheckBuffer(value):
+			ret = create_native_buffer_value(value)
+		if ret != NULL:
+			pass
+		elif hasattr(value, "__index__"):
+			ret = xmmsv_new_int(value.__index__())
+		elif hasattr(value, "keys"):
+			ret = xmmsv_new_dict()
+			for key in value.keys():
+				k = from_unicode(key)
+				v = create_native_value(value[key])
+				xmmsv_dict_set(ret, k, v)
+				xmmsv_unref(v)
 		else:
-			ret = xmmsv_new_list()
-			for item in value:
+			try:
+				it = iter(value)
+			except TypeError:
+				raise TypeError("Type '%s' has no corresponding native value type"
+						% value.__class__.__name__)
+			else:
+				ret = create_native_list(it)
+	return ret
+
+cdef xmmsv_t *create_native_list(object items) except NULL:
+	cdef xmmsv_t *ret
+	cdef xmmsv_t *v
+
+	ret = xmmsv_new_list()
+	try:
+		for item in items:
+			t = type(item)
+			if t is int:
+				xmmsv_list_append_int(ret, item)
+			elif t is unicode:
+				s = from_unicode(item)
+				xmmsv_list_append_string(ret, <char *>s)
+			else:
 				v = create_native_value(item)
 				xmmsv_list_append(ret, v)
 				xmmsv_unref(v) # the list took its own reference
+	except:
+		xmmsv_unref(ret)
+		raise
 	return ret
 
 class XmmsError(Exception): pass
 
+
+cdef serialize_native(xmmsv_t *val):
+	cdef xmmsv_t *bb
+	bb = xmmsv_new_bitbuffer()
+	try:
+		if not xmmsv_bitbuffer_serialize_value(bb, val):
+			raise ValueError("Failed to serialize value")
+		return PyBytes_FromStringAndSize(<char *>xmmsv_bitbuffer_buffer(bb),
+				xmmsv_bitbuffer_len(bb) // 8)
+	finally:
+		xmmsv_unref(bb)
+
+cdef xmmsv_t *deserialize_native(object data) except NULL:
+	cdef Py_buffer buf
+	cdef xmmsv_t *bb
+	cdef xmmsv_t *ret = NULL
+	cdef bint ok
+
+	PyObject_GetBuffer(data, &buf, PyBUF_SIMPLE)
+	try:
+		# Read straight from the buffer, no intermediate copy.
+		bb = xmmsv_new_bitbuffer_ro(<const_uchar *>buf.buf, buf.len)
+		ok = xmmsv_bitbuffer_deserialize_value(bb, &ret)
+		xmmsv_unref(bb)
+	finally:
+		PyBuffer_Release(&buf)
+	if not ok:
+		raise ValueError("Failed to deserialize value")
+	return ret
+
+def _restore_value(cls, data, sourcepref, ispropdict):
+	cdef XmmsValue v = cls.deserialize(data, sourcepref)
+	v.ispropdict = ispropdict
+	return v
+
+
+cdef class XmmsStringCache:
+	"""
+	Bounded cache sharing the python strings decoded from identical C
+	strings. It is a direct mapped table: each C string hashes to a single
+	slot, and a miss replaces the previous occupant of that slot.
+	"""
+	#cdef Py_ssize_t size
+	#cdef uint64_t *hashes
+	#cdef list keys
+	#cdef list values
+	#cdef readonly unsigned long long hits
+	#cdef readonly unsigned long long misses
+
+	def __cinit__(self, Py_ssize_t size):
+		if size <= 0:
+			raise ValueError("The cache size must be positive")
+		self.hashes = <uint64_t *>PyMem_Malloc(size * sizeof(uint64_t))
+		if self.hashes == NULL:
+			raise MemoryError()
+		self.size = size
+		self.clear()
+
+	def __dealloc__(self):
+		if self.hashes != NULL:
+			PyMem_Free(self.hashes)
+			self.hashes = NULL
+
+	def __len__(self):
+		return self.size
+
+	cdef lookup(self, const_char *s):
+		cdef uint64_t h = 14695981039346656037ULL # FNV-1a
+		cdef Py_ssize_t l = 0
+		cdef Py_ssize_t slot
+
+		while s[l] != 0:
+			h = (h ^ <unsigned char>s[l]) * 1099511628211ULL
+			l += 1
+		slot = h % self.size
+		key = self.keys[slot]
+		if self.hashes[slot] == h and key is not None and \
+				PyBytes_GET_SIZE(key) == l and \
+				memcmp(PyBytes_AS_STRING(key), s, l) == 0:
+			self.hits += 1
+			return self.values[slot]
+		self.misses += 1
+		value = PyUnicode_DecodeUTF8(s, l, "replace")
+		self.hashes[slot] = h
+		self.keys[slot] = PyBytes_FromStringAndSize(s, l)
+		self.values[slot] = value
+		return value
+
+	cpdef clear(self):
+		"""
+		Drop every cached string and reset the counters.
+		"""
+		memset(self.hashes, 0, self.size * sizeof(uint64_t))
+		self.keys = [None] * self.size
+		self.values = [None] * self.size
+		self.hits = 0
+		self.misses = 0
+
+	cpdef stats(self):
+		"""
+		:return: A dict with the size of the cache and its hit/miss counters.
+		"""
+		return dict(size = self.size, hits = self.hits, misses = self.misses)
+
+cdef XmmsStringCache string_cache = None
+
+def set_string_cache_size(size):
+	"""
+	Enable the cache sharing the strings decoded from values, or disable it
+	when size is 0. The cache is disabled by default.
+
+	:param size: Number of slots of the cache.
+	"""
+	global string_cache
+	if size:
+		string_cache = XmmsStringCache(size)
+	else:
+		string_cache = None
+
+def get_string_cache():
+	"""
+	:return: The `XmmsStringCache` in use, or None if disabled.
+	"""
+	return string_cache
+
+cdef decode_string(const_char *s):
+	if string_cache is None:
+		return to_unicode(s)
+	return string_cache.lookup(s)
+
+
 cdef class XmmsValue:
 	#cdef object sourcepref
 	#cdef xmmsv_t *val
@@ -185,7 +491,7 @@ cdef class XmmsValue:
 		cdef char *ret = NULL
 		if not xmmsv_get_string(self.val, <const_char **>&ret):
 			raise ValueError("Failed to retrieve value")
-		return to_unicode(ret)
+		return decode_string(ret)
 
 	cpdef get_bin(self):
 		"""
@@ -214,7 +520,9 @@ cdef class XmmsValue:
 		"""
 		:return: A dictionary containing media info.
 		"""
-		return dict([(k, v.value()) for k,v in self.get_dict_iter()])
+		if xmmsv_get_type(self.val) != XMMSV_TYPE_DICT:
+			raise TypeError("The value is not a dict.")
+		return native_dict(self.val, self.sourcepref)
 
 	cpdef get_dict_iter(self):
 		"""
@@ -226,17 +534,17 @@ cdef class XmmsValue:
 		"""
 		:return: A source dict.
 		"""
-		ret = PropDict(self.sourcepref)
-		for key, values in self.get_dict_iter():
-			for source, value in values.get_dict_iter():
-				ret[(source, key)] = value.value()
-		return ret
+		if xmmsv_get_type(self.val) != XMMSV_TYPE_DICT:
+			raise TypeError("The value is not a dict.")
+		return native_propdict(self.val, self.sourcepref)
 
 	cpdef get_list(self):
 		"""
 		:return: A list of dicts from the result structure.
 		"""
-		return [v.value() for v in self.get_list_iter()]
+		if xmmsv_get_type(self.val) != XMMSV_TYPE_LIST:
+			raise TypeError("The value is not a list.")
+		return native_list(self.val, self.sourcepref)
 
 	cpdef get_list_iter(self):
 		"""
@@ -244,37 +552,139 @@ cdef class XmmsValue:
 		"""
 		return XmmsListIter(self)
 
-	cpdef value(self):
+	cpdef get_columns(self, fields = None):
+		"""
+		Decode a list of dicts, like the result of `coll_query_infos`, into
+		a dict of columns in a single pass.
+
+		Columns holding an integer for every row, and the columns of an
+		empty list, are returned as ``array('q')`` objects, which support
+		the buffer protocol (e.g. ``numpy.frombuffer``). Other columns are
+		returned as lists, with None for the rows missing the field. Equal
+		strings on consecutive rows of a column share a single object, see
+		`set_string_cache_size` to share the others.
+
+		:param fields: The fields to extract. Defaults to every key found in
+		               the rows.
+		:return: A dict mapping each field to its column.
+		"""
+		cdef xmmsv_t *row = NULL
+		cdef xmmsv_t *val = NULL
+		cdef xmmsv_dict_iter_t *it = NULL
+		cdef char *key = NULL
+		cdef ColumnBuilder col
+		cdef list cols = []
+		cdef dict builders = {}
+		cdef int i
+		cdef int j
+		cdef int size
+
+		if xmmsv_get_type(self.val) != XMMSV_TYPE_LIST:
+			raise TypeError("The value is not a list.")
+
+		size = xmmsv_list_get_size(self.val)
+		if fields is not None:
+			for f in fields:
+				col = ColumnBuilder(size, from_unicode(f))
+				builders[f] = col
+				cols.append(col)
+
+		for i in range(size):
+			if not xmmsv_list_get(self.val, i, &row):
+				raise RuntimeError("Failed to retrieve list entry.")
+			if not xmmsv_is_type(row, XMMSV_TYPE_DICT):
+				raise TypeError("List entry %d is not a dict." % i)
+			if fields is not None:
+				for col in cols:
+					if xmmsv_dict_get(row, PyBytes_AS_STRING(col.name), &val):
+						col.set_value(i, val, self.sourcepref)
+				continue
+			if not xmmsv_get_dict_iter(row, &it):
+				raise RuntimeError("Failed to initialize the iterator.")
+			try:
+				j = 0
+				while xmmsv_dict_iter_pair(it, <const_char **>&key, &val):
+					# Rows of a result usually have the same keys in the same
+					# order, so try the column at the same position first.
+					if j < len(cols) and strcmp(key, PyBytes_AS_STRING((<ColumnBuilder>cols[j]).name)) == 0:
+						col = <ColumnBuilder>cols[j]
+					else:
+						f = decode_string(key)
+						col = builders.get(f)
+						if col is None:
+							col = builders[f] = ColumnBuilder(size, PyBytes_FromStringAndSize(key, strlen(key)))
+							cols.append(col)
+					col.set_value(i, val, self.sourcepref)
+					xmmsv_dict_iter_next(it)
+					j += 1
+			finally:
+				xmmsv_dict_iter_explicit_destroy(it)
+				it = NULL
+
+		return dict([(f, (<ColumnBuilder>col).column()) for f, col in builders.items()])
+
+	cpdef get_list_view(self):
+		"""
+		:return: A read-only sequence converting its items on access.
+		"""
+		return XmmsListView(self)
+
+	cpdef get_dict_view(self):
+		"""
+		:return: A read-only mapping converting its values on access.
+		"""
+		return XmmsDictView(self)
+
+	cpdef value(self, lazy = False):
 		"""
 		This can be used instead of most get_* functions in this class.
 
+		:param lazy: If true, lists and dicts are returned as read-only
+		             `XmmsListView` and `XmmsDictView` objects that convert
+		             their content only when accessed.
 		:return: Return value of appropriate data type contained in this result.
 		"""
 		cdef xmmsv_type_t vtype
-		vtype = self.get_type()
+		vtype = xmmsv_get_type(self.val)
 
-		if vtype == XMMSV_TYPE_NONE:
-			return None
-		elif vtype == XMMSV_TYPE_ERROR:
-			return self.get_error()
-		elif vtype == XMMSV_TYPE_INT64:
-			return self.get_int()
-		elif vtype == XMMSV_TYPE_FLOAT:
-			return self.get_float()
-		elif vtype == XMMSV_TYPE_STRING:
-			return self.get_string()
-		elif vtype == XMMSV_TYPE_COLL:
-			return self.get_coll()
-		elif vtype == XMMSV_TYPE_BIN:
-			return self.get_bin()
-		elif vtype == XMMSV_TYPE_LIST:
-			return self.get_list()
+		if vtype == XMMSV_TYPE_LIST:
+			if lazy:
+				return self.get_list_view()
 		elif vtype == XMMSV_TYPE_DICT:
 			if self.ispropdict:
-				return self.get_propdict()
-			return self.get_dict()
-		else:
-			raise TypeError("Unknown value type from the server: %d" % vtype)
+				return native_propdict(self.val, self.sourcepref)
+			if lazy:
+				return self.get_dict_view()
+		return native_value(self.val, self.sourcepref)
+
+	cpdef serialize(self):
+		"""
+		Serialize the value using the xmmsv binary format.
+
+		:return: The serialized value as bytes.
+		:rtype: bytes
+		"""
+		return serialize_native(self.val)
+
+	@classmethod
+	def deserialize(cls, data, sourcepref = None):
+		"""
+		Create a value from data returned by `serialize`.
+
+		:param data: bytes or any object supporting the buffer protocol.
+		:return: A new instance of the class.
+		"""
+		cdef XmmsValue v
+		cdef xmmsv_t *val
+		val = deserialize_native(data)
+		v = cls(sourcepref)
+		v.set_value(val)
+		xmmsv_unref(val)
+		return v
+
+	def __reduce__(self):
+		return (_restore_value,
+				(self.__class__, self.serialize(), self.sourcepref, self.ispropdict))
 
 	cpdef copy(self, cls=None):
 		if cls is None:
@@ -414,7 +824,394 @@ cdef class XmmsDictIter:
 		v.set_value(val)
 
 		xmmsv_dict_iter_next(self.it)
-		return (to_unicode(key), v)
+		return (decode_string(key), v)
+
+
+cdef object native_value(xmmsv_t *val, object sourcepref):
+	"""
+	Convert a native value to the matching python object, recursing
+	directly on the native structure.
+	"""
+	cdef xmmsv_type_t vtype
+	cdef int64_t i = 0
+	cdef float f = 0
+	cdef char *s = NULL
+	cdef unsigned int slen = 0
+
+	vtype = xmmsv_get_type(val)
+	if vtype == XMMSV_TYPE_NONE:
+		return None
+	elif vtype == XMMSV_TYPE_INT64:
+		xmmsv_get_int64(val, &i)
+		return i
+	elif vtype == XMMSV_TYPE_STRING:
+		xmmsv_get_string(val, <const_char **>&s)
+		return decode_string(s)
+	elif vtype == XMMSV_TYPE_DICT:
+		return native_dict(val, sourcepref)
+	elif vtype == XMMSV_TYPE_LIST:
+		return native_list(val, sourcepref)
+	elif vtype == XMMSV_TYPE_FLOAT:
+		xmmsv_get_float(val, &f)
+		return f
+	elif vtype == XMMSV_TYPE_ERROR:
+		xmmsv_get_error(val, <const_char **>&s)
+		return XmmsError(to_unicode(s))
+	elif vtype == XMMSV_TYPE_COLL:
+		return create_coll(val)
+	elif vtype == XMMSV_TYPE_BIN:
+		xmmsv_get_bin(val, <const_uchar **>&s, &slen)
+		return PyBytes_FromStringAndSize(s, slen)
+	raise TypeError("Unknown value type from the server: %d" % vtype)
+
+cdef list native_list(xmmsv_t *val, object sourcepref):
+	cdef xmmsv_t *item = NULL
+	cdef int i
+	cdef int size
+	cdef list ret
+
+	size = xmmsv_list_get_size(val)
+	ret = [None] * size
+	for i in range(size):
+		xmmsv_list_get(val, i, &item)
+		ret[i] = native_value(item, sourcepref)
+	return ret
+
+cdef dict native_dict(xmmsv_t *val, object sourcepref):
+	cdef xmmsv_dict_iter_t *it = NULL
+	cdef xmmsv_t *item = NULL
+	cdef char *key = NULL
+	cdef dict ret = {}
+
+	if not xmmsv_get_dict_iter(val, &it):
+		raise RuntimeError("Failed to initialize the iterator.")
+	try:
+		while xmmsv_dict_iter_pair(it, <const_char **>&key, &item):
+			ret[decode_string(key)] = native_value(item, sourcepref)
+			xmmsv_dict_iter_next(it)
+	finally:
+		xmmsv_dict_iter_explicit_destroy(it)
+	return ret
+
+cdef native_propdict(xmmsv_t *val, object sourcepref):
+	cdef xmmsv_dict_iter_t *it = NULL
+	cdef xmmsv_dict_iter_t *sit = NULL
+	cdef xmmsv_t *values = NULL
+	cdef xmmsv_t *item = NULL
+	cdef char *key = NULL
+	cdef char *source = NULL
+
+	ret = PropDict(sourcepref)
+	if not xmmsv_get_dict_iter(val, &it):
+		raise RuntimeError("Failed to initialize the iterator.")
+	try:
+		while xmmsv_dict_iter_pair(it, <const_char **>&key, &values):
+			if not xmmsv_get_dict_iter(values, &sit):
+				raise TypeError("The value is not a dict.")
+			k = decode_string(key)
+			try:
+				while xmmsv_dict_iter_pair(sit, <const_char **>&source, &item):
+					PyDict_SetItem(ret, (decode_string(source), k), native_value(item, sourcepref))
+					xmmsv_dict_iter_next(sit)
+			finally:
+				xmmsv_dict_iter_explicit_destroy(sit)
+			xmmsv_dict_iter_next(it)
+	finally:
+		xmmsv_dict_iter_explicit_destroy(it)
+	# Entries were added bypassing PropDict.__setitem__, index them at once.
+	ret._reindex()
+	return ret
+
+
+cdef array.array _int64_template = array.array('q')
+
+cdef class ColumnBuilder:
+	"""
+	Accumulate a column for `XmmsValue.get_columns`. Values are stored in an
+	``array('q')`` as long as every row so far provided an integer, and in a
+	list otherwise.
+	"""
+	#cdef int size
+	#cdef int filled
+	#cdef bytes name
+	#cdef array.array ints
+	#cdef list objs
+	#cdef const_char *last
+	#cdef object last_str
+
+	def __cinit__(self, int size, bytes name):
+		self.size = size
+		self.filled = 0
+		self.name = name
+
+	cdef set_int(self, int i, int64_t v):
+		if self.objs is None and self.filled == i:
+			if self.ints is None:
+				self.ints = array.clone(_int64_template, self.size, False)
+			self.ints.data.as_longlongs[i] = v
+			self.filled += 1
+		else:
+			self.set_obj(i, v)
+
+	cdef set_obj(self, int i, object v):
+		if self.objs is None:
+			self.to_list()
+		self.objs[i] = v
+
+	cdef set_value(self, int i, xmmsv_t *val, object sourcepref):
+		cdef int64_t n = 0
+		cdef char *s = NULL
+		cdef xmmsv_type_t vtype
+
+		vtype = xmmsv_get_type(val)
+		if vtype == XMMSV_TYPE_INT64:
+			xmmsv_get_int64(val, &n)
+			self.set_int(i, n)
+		elif vtype == XMMSV_TYPE_STRING:
+			xmmsv_get_string(val, <const_char **>&s)
+			# Sorted or grouped results repeat a string over consecutive rows.
+			if self.last == NULL or strcmp(s, self.last) != 0:
+				self.last = s
+				self.last_str = decode_string(s)
+			self.set_obj(i, self.last_str)
+		else:
+			self.set_obj(i, native_value(val, sourcepref))
+
+	cdef to_list(self):
+		cdef int j
+		self.objs = [None] * self.size
+		for j in range(self.filled):
+			self.objs[j] = self.ints.data.as_longlongs[j]
+		self.ints = None
+
+	cdef column(self):
+		if self.objs is None:
+			if self.filled == self.size:
+				if self.ints is None: # No rows
+					return array.clone(_int64_template, 0, False)
+				return self.ints
+			self.to_list()
+		return self.objs
+
+
+cdef view_value(xmmsv_t *val, object sourcepref):
+	"""
+	Convert a native value, wrapping lists and dicts in lazy views.
+	"""
+	cdef XmmsListView lv
+	cdef XmmsDictView dv
+	cdef XmmsValue v
+	cdef xmmsv_type_t vtype
+
+	vtype = xmmsv_get_type(val)
+	if vtype == XMMSV_TYPE_LIST:
+		lv = XmmsListView.__new__(XmmsListView)
+		lv.set_value(val, sourcepref)
+		return lv
+	elif vtype == XMMSV_TYPE_DICT:
+		dv = XmmsDictView.__new__(XmmsDictView)
+		dv.set_value(val, sourcepref)
+		return dv
+	return native_value(val, sourcepref)
+
+
+cdef class XmmsListView:
+	"""
+	Read-only sequence on a list value. The native list is kept referenced
+	and items are converted only when they are indexed or iterated.
+	"""
+	#cdef object sourcepref
+	#cdef xmmsv_t *val
+
+	def __cinit__(self):
+		self.val = NULL
+
+	def __dealloc__(self):
+		if self.val != NULL:
+			xmmsv_unref(self.val)
+			self.val = NULL
+
+	def __init__(self, XmmsValue value):
+		if value.get_type() != XMMSV_TYPE_LIST:
+			raise TypeError("The value is not a list.")
+		self.set_value(value.val, value.sourcepref)
+
+	cdef set_value(self, xmmsv_t *value, object sourcepref):
+		if self.val != NULL:
+			xmmsv_unref(self.val)
+		self.val = xmmsv_ref(value)
+		self.sourcepref = sourcepref
+
+	cdef item(self, int i):
+		cdef xmmsv_t *val = NULL
+		if not xmmsv_list_get(self.val, i, &val):
+			raise IndexError("Index out of range")
+		return view_value(val, self.sourcepref)
+
+	def __len__(self):
+		return xmmsv_list_get_size(self.val)
+
+	def __getitem__(self, i):
+		cdef int size
+		if isinstance(i, slice):
+			return [self.item(j) for j in range(*i.indices(len(self)))]
+		size = xmmsv_list_get_size(self.val)
+		if i < 0:
+			i += size
+		if i < 0 or i >= size:
+			raise IndexError("Index out of range")
+		return self.item(i)
+
+	def __iter__(self):
+		cdef int i = 0
+		while i < xmmsv_list_get_size(self.val):
+			yield self.item(i)
+			i += 1
+
+	def __reversed__(self):
+		cdef int i = xmmsv_list_get_size(self.val)
+		while i > 0:
+			i -= 1
+			yield self.item(i)
+
+	def __contains__(self, value):
+		for v in self:
+			if v is value or v == value:
+				return True
+		return False
+
+	def __eq__(self, other):
+		if isinstance(other, (XmmsListView, list, tuple)):
+			return len(self) == len(other) and list(self) == list(other)
+		return NotImplemented
+
+	def __ne__(self, other):
+		ret = self.__eq__(other)
+		if ret is NotImplemented:
+			return ret
+		return not ret
+
+	def __repr__(self):
+		return "%s(%r)" % (self.__class__.__name__, self.list())
+
+	def index(self, value, start = 0, stop = None):
+		size = len(self)
+		if stop is None:
+			stop = size
+		for i in range(*slice(start, stop).indices(size)):
+			v = self.item(i)
+			if v is value or v == value:
+				return i
+		raise ValueError("%r is not in list" % (value,))
+
+	def count(self, value):
+		return sum(1 for v in self if v is value or v == value)
+
+	cpdef list(self):
+		"""
+		:return: A _COPY_ of the whole list, fully converted.
+		"""
+		cdef XmmsValue v
+		v = XmmsValue(self.sourcepref)
+		v.set_value(self.val)
+		return v.get_list()
+
+
+cdef class XmmsDictView:
+	"""
+	Read-only mapping on a dict value. The native dict is kept referenced
+	and values are converted only when they are looked up or iterated.
+	"""
+	#cdef object sourcepref
+	#cdef xmmsv_t *val
+
+	def __cinit__(self):
+		self.val = NULL
+
+	def __dealloc__(self):
+		if self.val != NULL:
+			xmmsv_unref(self.val)
+			self.val = NULL
+
+	def __init__(self, XmmsValue value):
+		if value.get_type() != XMMSV_TYPE_DICT:
+			raise TypeError("The value is not a dict.")
+		self.set_value(value.val, value.sourcepref)
+
+	cdef set_value(self, xmmsv_t *value, object sourcepref):
+		if self.val != NULL:
+			xmmsv_unref(self.val)
+		self.val = xmmsv_ref(value)
+		self.sourcepref = sourcepref
+
+	def __len__(self):
+		return xmmsv_dict_get_size(self.val)
+
+	def __getitem__(self, key):
+		cdef xmmsv_t *val = NULL
+		k = from_unicode(key)
+		if not isinstance(k, bytes) or not xmmsv_dict_get(self.val, <char *>k, &val):
+			raise KeyError(key)
+		return view_value(val, self.sourcepref)
+
+	def __contains__(self, key):
+		k = from_unicode(key)
+		if not isinstance(k, bytes):
+			return False
+		return xmmsv_dict_has_key(self.val, <char *>k)
+
+	def __iter__(self):
+		cdef xmmsv_dict_iter_t *it = NULL
+		cdef char *key = NULL
+		if not xmmsv_get_dict_iter(self.val, &it):
+			raise RuntimeError("Failed to initialize the iterator.")
+		try:
+			while xmmsv_dict_iter_pair(it, <const_char **>&key, NULL):
+				yield decode_string(key)
+				xmmsv_dict_iter_next(it)
+		finally:
+			xmmsv_dict_iter_explicit_destroy(it)
+
+	def __eq__(self, other):
+		if isinstance(other, (XmmsDictView, dict)):
+			return self.dict() == dict(other.items())
+		return NotImplemented
+
+	def __ne__(self, other):
+		ret = self.__eq__(other)
+		if ret is NotImplemented:
+			return ret
+		return not ret
+
+	def __repr__(self):
+		return "%s(%r)" % (self.__class__.__name__, self.dict())
+
+	def get(self, key, default = None):
+		try:
+			return self[key]
+		except KeyError:
+			return default
+
+	def keys(self):
+		return list(self)
+
+	def values(self):
+		return [self[k] for k in self]
+
+	def items(self):
+		return [(k, self[k]) for k in self]
+
+	cpdef dict(self):
+		"""
+		:return: A _COPY_ of the whole dict, fully converted.
+		"""
+		cdef XmmsValue v
+		v = XmmsValue(self.sourcepref)
+		v.set_value(self.val)
+		return v.get_dict()
+
+Sequence.register(XmmsListView)
+Mapping.register(XmmsDictView)
 
 
 cdef class CollectionRef:
@@ -436,6 +1233,62 @@ cdef class CollectionRef:
 cdef _idlist_types = (
 		XMMS_COLLECTION_TYPE_IDLIST,
 		)
+
+# Types whose operands can be flattened, reordered and deduplicated.
+cdef _commutative_types = (
+		XMMS_COLLECTION_TYPE_UNION,
+		XMMS_COLLECTION_TYPE_INTERSECTION,
+		)
+
+cdef list _flat_operands(Collection c, xmmsv_coll_type_t colltype):
+	"""
+	Operands of a union or intersection, with those of nested collections
+	of the same type and without attributes merged in.
+	"""
+	cdef Collection op
+	cdef list ret = []
+	for op in c.operands:
+		if xmmsv_coll_get_type(op.coll) == colltype and not xmmsv_dict_get_size(xmmsv_coll_attributes_get(op.coll)):
+			ret.extend(_flat_operands(op, colltype))
+		else:
+			ret.append(op)
+	return ret
+
+cdef list _sorted_unique(list keyed):
+	"""
+	Sort (key, item) pairs on the key and drop those with duplicate keys.
+	Keys are compared through their repr, which is total and stable.
+	"""
+	cdef list ret = []
+	cdef object last = None
+	for r, key, item in sorted([(repr(k), k, i) for k, i in keyed]):
+		if r != last:
+			ret.append((key, item))
+			last = r
+	return ret
+
+cdef tuple _coll_key(Collection c):
+	"""
+	Structural key of a collection tree, equal for collections having the
+	same canonical form.
+	"""
+	cdef xmmsv_coll_type_t colltype = xmmsv_coll_get_type(c.coll)
+	cdef Collection op
+	cdef tuple key
+	attrs = c.attributes.get_dict()
+	attrs = tuple([(k, attrs[k]) for k in sorted(attrs)])
+	ids = c.ids
+	ids = tuple(ids) if ids is not None else ()
+	if colltype in _commutative_types:
+		ops = _sorted_unique([(_coll_key(op), None)
+		                      for op in _flat_operands(c, colltype)])
+		if len(ops) == 1 and not attrs:
+			return ops[0][0]
+		ops = tuple([key for key, _ in ops])
+	else:
+		ops = tuple([_coll_key(op) for op in c.operands])
+	return (colltype, attrs, ids, ops)
+
 cdef class Collection(CollectionRef):
 	#cdef object _attributes
 	#cdef object _operands
@@ -495,6 +1348,95 @@ cdef class Collection(CollectionRef):
 		xmmsv_unref(newcoll)
 		return coll
 
+	cpdef serialize(self):
+		"""
+		Serialize the collection using the xmmsv binary format.
+
+		:return: The serialized collection as bytes.
+		:rtype: bytes
+		"""
+		return serialize_native(self.coll)
+
+	@staticmethod
+	def deserialize(data):
+		"""
+		Create a collection from data returned by `serialize`.
+
+		:param data: bytes or any object supporting the buffer protocol.
+		:return: A new collection.
+		"""
+		cdef xmmsv_t *coll
+		coll = deserialize_native(data)
+		try:
+			if not xmmsv_is_type(coll, XMMSV_TYPE_COLL):
+				raise ValueError("The data is not a serialized collection")
+			return create_coll(coll)
+		finally:
+			xmmsv_unref(coll)
+
+	def __reduce__(self):
+		return (Collection.deserialize, (self.serialize(),))
+
+	cpdef canonical(self):
+		"""
+		Get the canonical form of the collection: nested unions and
+		intersections are flattened, their operands sorted and
+		deduplicated, and those left with a single operand replaced by it.
+		The result matches the same media and is what `__eq__` and
+		`__hash__` compare.
+
+		:return: A new collection.
+		"""
+		cdef xmmsv_coll_type_t colltype = xmmsv_coll_get_type(self.coll)
+		cdef xmmsv_t *newcoll
+		cdef xmmsv_t *v
+		cdef Collection c, op
+		if colltype in _commutative_types:
+			ops = _sorted_unique([(_coll_key(op), op) for op in
+			                      [o.canonical() for o in _flat_operands(self, colltype)]])
+			if len(ops) == 1 and not xmmsv_dict_get_size(xmmsv_coll_attributes_get(self.coll)):
+				return ops[0][1]
+			ops = [op for _, op in ops]
+		else:
+			ops = [op.canonical() for op in self.operands]
+		newcoll = xmmsv_new_coll(colltype)
+		v = xmmsv_copy(xmmsv_coll_attributes_get(self.coll))
+		xmmsv_coll_attributes_set(newcoll, v)
+		xmmsv_unref(v)
+		v = xmmsv_copy(xmmsv_coll_idlist_get(self.coll))
+		xmmsv_coll_idlist_set(newcoll, v)
+		xmmsv_unref(v)
+		try:
+			c = create_coll(newcoll)
+		finally:
+			xmmsv_unref(newcoll)
+		c.operands = ops
+		return c
+
+	cpdef structural_hash(self):
+		"""
+		Get a hash of the canonical form of the collection which, unlike
+		`hash`, is the same across processes (for a given Python version).
+
+		:return: A 64 bits unsigned integer.
+		"""
+		digest = hashlib.sha1(repr(_coll_key(self)).encode('utf-8')).hexdigest()
+		return int(digest[:16], 16)
+
+	def __eq__(self, other):
+		if not isinstance(other, Collection):
+			return NotImplemented
+		return _coll_key(self) == _coll_key(<Collection>other)
+
+	def __ne__(self, other):
+		if not isinstance(other, Collection):
+			return NotImplemented
+		return _coll_key(self) != _coll_key(<Collection>other)
+
+	def __hash__(self):
+		# Collections are mutable, don't modify one used as a dict key.
+		return hash(_coll_key(self))
+
 	def __repr__(self):
 		atr = []
 		operands = []
@@ -743,9 +1685,16 @@ cdef class CollectionOperands(CollectionRef):
 
 	cpdef remove(self, Collection op):
 		"""Remove an operand"""
+		cdef Collection o
 		with cython.nonecheck(True):
 			xmmsv_coll_remove_operand(self.coll, op.coll)
-			self.pylist.remove(op)
+			# Compare by identity, equal operands are not interchangeable here
+			for i, o in enumerate(self.pylist):
+				if o.coll == op.coll:
+					del self.pylist[i]
+					break
+			else:
+				raise ValueError("Not an operand")
 
 	cpdef clear(self):
 		cdef Collection op
@@ -758,7 +1707,139 @@ cdef class CollectionOperands(CollectionRef):
 
 
 
+cdef array.array _list_ids(xmmsv_t *idlist):
+	"""
+	Copy the integers of a list value to an ``array('q')``.
+	"""
+	cdef int n = xmmsv_list_get_size(idlist)
+	cdef int i
+	cdef int64_t x
+	cdef array.array ret = array.clone(_int64_template, n, False)
+	for i in range(n):
+		if not xmmsv_list_get_int64(idlist, i, &x):
+			raise TypeError("Expected a list of integers")
+		ret.data.as_longlongs[i] = x
+	return ret
+
+cdef array.array _ids_array(object ids):
+	"""
+	Copy ids to an ``array('q')``. ids may be an idlist collection, a
+	`CollectionIDList`, a buffer of integers such as ``array('i')`` or any
+	iterable of integers.
+	"""
+	cdef Py_buffer buf
+	cdef array.array ret
+	cdef Py_ssize_t i
+	cdef char fmt
+	if isinstance(ids, Collection):
+		ids = ids.ids
+		if ids is None:
+			raise TypeError("Not an idlist collection")
+	if isinstance(ids, CollectionIDList):
+		return _list_ids(xmmsv_coll_idlist_get((<CollectionIDList>ids).coll))
+	if _get_int_buffer(ids, &buf, &fmt):
+		try:
+			ret = array.clone(_int64_template, buf.len // buf.itemsize, False)
+			for i in range(len(ret)):
+				ret.data.as_longlongs[i] = _buffer_int(&buf, fmt, i)
+		finally:
+			PyBuffer_Release(&buf)
+		return ret
+	if PyObject_CheckBuffer(ids):
+		ids = iter(ids) # array would copy the raw bytes of the buffer
+	return array.array('q', ids)
+
+cdef int _compare_ids(const void *a, const void *b) noexcept nogil:
+	cdef long long x = (<long long *>a)[0]
+	cdef long long y = (<long long *>b)[0]
+	return (x > y) - (x < y)
+
+cdef Py_ssize_t _sort_unique(array.array ids):
+	"""
+	Sort an ``array('q')`` in place and gather its unique ids at its start.
+
+	:return: The number of unique ids.
+	"""
+	cdef long long *d = ids.data.as_longlongs
+	cdef Py_ssize_t n = len(ids)
+	cdef Py_ssize_t i
+	cdef Py_ssize_t j = 0
+	if n == 0:
+		return 0
+	qsort(d, n, sizeof(long long), _compare_ids)
+	for i in range(1, n):
+		if d[i] != d[j]:
+			j += 1
+			d[j] = d[i]
+	return j + 1
+
+# Snapshot of the ids exported through the buffer protocol
+cdef struct _ids_export:
+	void *ids
+	Py_ssize_t shape[1]
+	Py_ssize_t strides[1]
+
+# Set operations on sorted ids
+cdef enum:
+	_IDS_UNION
+	_IDS_INTERSECTION
+	_IDS_DIFFERENCE
+
+cdef array.array _merge_ids(array.array a, array.array b, int op):
+	"""
+	Combine the ids of two arrays as sorted sets.
+
+	:return: A sorted ``array('q')`` without duplicates.
+	"""
+	cdef Py_ssize_t na = _sort_unique(a)
+	cdef Py_ssize_t nb = _sort_unique(b)
+	cdef long long *da = a.data.as_longlongs
+	cdef long long *db = b.data.as_longlongs
+	cdef array.array ret = array.clone(_int64_template, na + nb, False)
+	cdef long long *dr = ret.data.as_longlongs
+	cdef Py_ssize_t i = 0
+	cdef Py_ssize_t j = 0
+	cdef Py_ssize_t k = 0
+	while i < na and j < nb:
+		if da[i] < db[j]:
+			if op != _IDS_INTERSECTION:
+				dr[k] = da[i]
+				k += 1
+			i += 1
+		elif da[i] > db[j]:
+			if op == _IDS_UNION:
+				dr[k] = db[j]
+				k += 1
+			j += 1
+		else:
+			if op != _IDS_DIFFERENCE:
+				dr[k] = da[i]
+				k += 1
+			i += 1
+			j += 1
+	if op != _IDS_INTERSECTION:
+		while i < na:
+			dr[k] = da[i]
+			k += 1
+			i += 1
+	if op == _IDS_UNION:
+		while j < nb:
+			dr[k] = db[j]
+			k += 1
+			j += 1
+	array.resize(ret, k)
+	return ret
+
 cdef class CollectionIDList(CollectionRef):
+	"""
+	The ids of an idlist collection.
+
+	Besides the list interface, ids can be added in bulk from buffers such
+	as ``array('i')``, exported as native 64 bits integers through the
+	buffer protocol (e.g. with ``memoryview`` or ``numpy.frombuffer``), and
+	combined with the `union`, `intersection` and `difference` set
+	operations.
+	"""
 	def __init__(self, Collection c):
 		if c.coll == NULL:
 			raise RuntimeError("Uninitialized collection")
@@ -768,20 +1849,51 @@ cdef class CollectionIDList(CollectionRef):
 		return xmmsv_coll_idlist_get_size(self.coll)
 
 	def __iter__(self):
-		"""Iterate over ids"""
-		cdef int x = -1
-		cdef int l
-		cdef int i = 0
-		l = xmmsv_coll_idlist_get_size(self.coll)
-		while i < l:
-			if not xmmsv_coll_idlist_get_index(self.coll, i, &x):
-				raise RuntimeError("Failed to retrieve id at index %d" % i)
-			yield x
-			i += 1
+		"""Iterate over a snapshot of the ids"""
+		return iter(self.list())
 
 	def list(self):
 		"""Returns a _COPY_ of the idlist as an ordinary list"""
-		return list(self)
+		return self.to_array().tolist()
+
+	cpdef array.array to_array(self):
+		"""
+		:return: A _COPY_ of the idlist as an ``array('q')``.
+		"""
+		return _list_ids(xmmsv_coll_idlist_get(self.coll))
+
+	def __getbuffer__(self, Py_buffer *buffer, int flags):
+		cdef _ids_export *export
+		if flags & PyBUF_WRITABLE:
+			raise BufferError("The ids are exported read-only")
+		# Ids are not stored contiguously, export a snapshot which lives as
+		# long as the view does.
+		ids = self.to_array()
+		export = <_ids_export *>PyMem_Malloc(sizeof(_ids_export))
+		if export == NULL:
+			raise MemoryError()
+		Py_INCREF(ids)
+		export.ids = <void *>ids
+		export.shape[0] = len(ids)
+		export.strides[0] = sizeof(long long)
+		buffer.internal = export
+		buffer.buf = (<array.array>ids).data.as_voidptr
+		buffer.obj = self
+		buffer.len = export.shape[0] * sizeof(long long)
+		buffer.readonly = 1
+		buffer.itemsize = sizeof(long long)
+		buffer.format = NULL
+		if flags & PyBUF_FORMAT:
+			buffer.format = b"q"
+		buffer.ndim = 1
+		buffer.shape = export.shape if flags & PyBUF_ND else NULL
+		buffer.strides = export.strides if flags & PyBUF_STRIDES else NULL
+		buffer.suboffsets = NULL
+
+	def __releasebuffer__(self, Py_buffer *buffer):
+		cdef _ids_export *export = <_ids_export *>buffer.internal
+		Py_DECREF(<object>export.ids)
+		PyMem_Free(export)
 
 	def __repr__(self):
 		return repr(self.list())
@@ -792,9 +1904,28 @@ cdef class CollectionIDList(CollectionRef):
 			raise RuntimeError("Failed to append an id")
 
 	cpdef extend(self, v):
-		cdef int a
-		for a in v:
-			self.append(a)
+		"""
+		Appends ids to the idlist. v may be another `CollectionIDList`, a
+		buffer of integers such as ``array('i')`` or ``bytes``, or any
+		iterable.
+		"""
+		cdef xmmsv_t *idlist = xmmsv_coll_idlist_get(self.coll)
+		cdef array.array ids
+		cdef Py_buffer buf
+		cdef Py_ssize_t i
+		cdef char fmt
+		if _get_int_buffer(v, &buf, &fmt):
+			try:
+				for i in range(buf.len // buf.itemsize):
+					if not xmmsv_list_append_int(idlist, _buffer_int(&buf, fmt, i)):
+						raise RuntimeError("Failed to append an id")
+			finally:
+				PyBuffer_Release(&buf)
+			return
+		ids = _ids_array(v)
+		for i in range(len(ids)):
+			if not xmmsv_list_append_int(idlist, ids.data.as_longlongs[i]):
+				raise RuntimeError("Failed to append an id")
 
 	def __iadd__(self, v):
 		self.extend(v)
@@ -843,6 +1974,30 @@ cdef class CollectionIDList(CollectionRef):
 		if not xmmsv_coll_idlist_clear(self.coll):
 			raise RuntimeError("Failed to clear ids")
 
+	def union(self, other):
+		"""
+		:param other: Ids, as accepted by `extend`.
+		:return: A new `IDList` with the sorted ids present in either
+		         idlist.
+		"""
+		return IDList(_merge_ids(self.to_array(), _ids_array(other), _IDS_UNION))
+
+	def intersection(self, other):
+		"""
+		:param other: Ids, as accepted by `extend`.
+		:return: A new `IDList` with the sorted ids present in both
+		         idlists.
+		"""
+		return IDList(_merge_ids(self.to_array(), _ids_array(other), _IDS_INTERSECTION))
+
+	def difference(self, other):
+		"""
+		:param other: Ids, as accepted by `extend`.
+		:return: A new `IDList` with the sorted ids of this idlist which
+		         are not in other.
+		"""
+		return IDList(_merge_ids(self.to_array(), _ids_array(other), _IDS_DIFFERENCE))
+
 
 # XXX Might not be needed.
 class CollectionWrapper(Collection):
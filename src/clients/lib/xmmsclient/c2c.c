@@ -151,6 +151,22 @@ xmmsc_c2c_get_ready_clients (xmmsc_connection_t *c)
 	                              XMMS_IPC_COMMAND_COURIER_GET_READY_CLIENTS);
 }
 
+/**
+ * Request counters of the client-to-client messages expecting a reply.
+ * The result is a dict with the number of messages still "pending", the
+ * number of those which "expired" without a reply, and the number of
+ * those expecting a single reply which were "replied".
+ * @param c The connection to the server.
+ */
+xmmsc_result_t *
+xmmsc_c2c_get_message_stats (xmmsc_connection_t *c)
+{
+	x_check_conn (c, NULL);
+
+	return xmmsc_send_msg_no_arg (c, XMMS_IPC_OBJECT_COURIER,
+	                              XMMS_IPC_COMMAND_COURIER_GET_MESSAGE_STATS);
+}
+
 /**
  * Request the client-to-client message broadcast.
  * This broadcast gets triggered when messages from other clients are received.
@@ -20,8 +20,10 @@
 
 #define XMMSC_SC_ENTITY_NAME_PATTERN "[_a-zA-Z][_a-zA-Z0-9]*"
 
-static xmmsc_result_t *introspect_internal (xmmsc_connection_t *c, int dest, xmmsv_t *entity, bool enforce_type, xmmsc_sc_interface_entity_type_t type, xmmsv_t *keyfilter);
+static xmmsc_result_t *introspect_internal (xmmsc_connection_t *c, int dest, xmmsv_t *entity, bool enforce_type, xmmsc_sc_interface_entity_type_t type, xmmsv_t *keyfilter, bool recursive);
 static bool validate_entity_name (const char *name);
+static bool validate_call (xmmsv_t *method, xmmsv_t *pargs, xmmsv_t *nargs);
+static xmmsv_t *build_call (xmmsv_t *method, xmmsv_t *pargs, xmmsv_t *nargs);
 
 /**
  * Call a method in another client.
@@ -40,30 +42,11 @@ xmmsc_sc_call (xmmsc_connection_t *c, int dest, xmmsv_t *method,
 
 	x_check_conn (c, NULL);
 	x_api_error_if (!dest, "with 0 as destination client.", NULL);
-	x_api_error_if (!method, "with NULL method path.", NULL);
-	x_api_error_if (!xmmsv_list_get_size (method), "with empty method.", NULL);
-	x_api_error_if (pargs && xmmsv_get_type (pargs) != XMMSV_TYPE_LIST,
-	                "with a non-list of positional arguments.", NULL);
-	x_api_error_if (nargs && xmmsv_get_type (nargs) != XMMSV_TYPE_DICT,
-	                "with a non-dict of named arguments.", NULL);
-	x_api_error_if (!xmmsv_list_restrict_type (method, XMMSV_TYPE_STRING),
-	                "with non-string in method path", NULL);
-
-	/* Normalize NULL to empty values. */
-	pargs = pargs ? xmmsv_ref (pargs) : xmmsv_new_list ();
-	nargs = nargs ? xmmsv_ref (nargs) : xmmsv_new_dict ();
+	if (!validate_call (method, pargs, nargs)) {
+		return NULL;
+	}
 
-	/* Pack the call information in a dict.
-	 * Let the dict steal a reference to pargs and nargs since either
-	 * we created new values or we referenced the old ones above.
-	 */
-	call = xmmsv_build_dict (XMMSV_DICT_ENTRY (XMMSC_SC_CALL_METHOD_KEY,
-	                                           xmmsv_ref (method)),
-	                         XMMSV_DICT_ENTRY (XMMSC_SC_CALL_PARGS_KEY,
-	                                           pargs),
-	                         XMMSV_DICT_ENTRY (XMMSC_SC_CALL_NARGS_KEY,
-	                                           nargs),
-	                         XMMSV_DICT_END);
+	call = build_call (method, pargs, nargs);
 
 	/* And send that dict as the argument to the destination CALL command */
 	msg = xmmsv_build_dict (XMMSV_DICT_ENTRY_INT (XMMSC_SC_CMD_KEY,
@@ -77,6 +60,65 @@ xmmsc_sc_call (xmmsc_connection_t *c, int dest, xmmsv_t *method,
 	return res;
 }
 
+/**
+ * Call several methods in another client, in a single message.
+ * The methods are called in order, and the result is a list of their
+ * return values, where the calls that failed have an error value.
+ *
+ * Methods called this way can not defer their reply.
+ *
+ * @param c The connection structure.
+ * @param dest The destination client's id.
+ * @param calls A non-empty list of calls, each call being a list made of
+ * a method path, and optionally a list of positional arguments and a dict
+ * of named arguments, as passed to #xmmsc_sc_call.
+ */
+xmmsc_result_t *
+xmmsc_sc_call_batch (xmmsc_connection_t *c, int dest, xmmsv_t *calls)
+{
+	xmmsc_result_t *res;
+	xmmsv_t *msg, *batch, *call, *method, *pargs, *nargs;
+	int i, size;
+
+	x_check_conn (c, NULL);
+	x_api_error_if (!dest, "with 0 as destination client.", NULL);
+	x_api_error_if (!calls, "with NULL calls.", NULL);
+	x_api_error_if (!xmmsv_list_get_size (calls), "with empty calls.", NULL);
+	x_api_error_if (!xmmsv_list_restrict_type (calls, XMMSV_TYPE_LIST),
+	                "with non-list in calls.", NULL);
+
+	size = xmmsv_list_get_size (calls);
+	batch = xmmsv_new_list ();
+
+	for (i = 0; i < size; i++) {
+		xmmsv_list_get (calls, i, &call);
+
+		method = pargs = nargs = NULL;
+		xmmsv_list_get (call, 0, &method);
+		xmmsv_list_get (call, 1, &pargs);
+		xmmsv_list_get (call, 2, &nargs);
+
+		if (!validate_call (method, pargs, nargs)) {
+			xmmsv_unref (batch);
+			return NULL;
+		}
+
+		call = build_call (method, pargs, nargs);
+		xmmsv_list_append (batch, call);
+		xmmsv_unref (call);
+	}
+
+	msg = xmmsv_build_dict (XMMSV_DICT_ENTRY_INT (XMMSC_SC_CMD_KEY,
+	                                              XMMSC_SC_CALL_BATCH),
+	                        XMMSV_DICT_ENTRY (XMMSC_SC_ARGS_KEY, batch),
+	                        XMMSV_DICT_END);
+
+	res = xmmsc_c2c_send (c, dest, XMMS_C2C_REPLY_POLICY_SINGLE_REPLY, msg);
+	xmmsv_unref (msg);
+
+	return res;
+}
+
 /**
  * Subscribe to a broadcast from another client.
  * The returned result can be used to set up notifiers as usual.
@@ -175,7 +217,7 @@ xmmsc_sc_introspect_##entity (xmmsc_connection_t *c, int dest, \
 	x_api_error_if (!xmmsv_list_restrict_type (entity, XMMSV_TYPE_STRING), \
 	                "with non-string in " #entity " path", NULL); \
 \
-	return introspect_internal (c, dest, entity, true, type, NULL); \
+	return introspect_internal (c, dest, entity, true, type, NULL, false); \
 }
 
 /**
@@ -196,6 +238,38 @@ xmmsc_sc_introspect_##entity (xmmsc_connection_t *c, int dest, \
  */
 GEN_SC_INTROSPECT_FUNC(namespace, XMMSC_SC_INTERFACE_ENTITY_TYPE_NAMESPACE);
 
+/**
+ * Introspect into a namespace and all its subnamespaces, in a single round
+ * trip.
+ *
+ * The result will carry a dictionary of the same form as the one of
+ * #xmmsc_sc_introspect_namespace, except that "namespaces" is a list of
+ * descriptions of the subnamespaces, themselves of the same form.
+ *
+ * Clients predating recursive introspection ignore the request for it and
+ * only list the names of the subnamespaces, as #xmmsc_sc_introspect_namespace
+ * does.
+ *
+ * @param c The connection structure.
+ * @param dest The non-zero id of the destination client.
+ * @param nms A list of strings forming the path to the remote namespace.
+ * Use an empty list to refer to the root namespace.
+ */
+xmmsc_result_t *
+xmmsc_sc_introspect_namespace_recursive (xmmsc_connection_t *c, int dest,
+                                         xmmsv_t *nms)
+{
+	x_check_conn (c, NULL);
+	x_api_error_if (!dest, "with 0 as destination client.", NULL);
+	x_api_error_if (!nms, "with NULL namespace path.", NULL);
+	x_api_error_if (!xmmsv_list_restrict_type (nms, XMMSV_TYPE_STRING),
+	                "with non-string in namespace path", NULL);
+
+	return introspect_internal (c, dest, nms, true,
+	                            XMMSC_SC_INTERFACE_ENTITY_TYPE_NAMESPACE,
+	                            NULL, true);
+}
+
 /**
  * Introspect into a method.
  *
@@ -258,7 +332,7 @@ xmmsc_sc_introspect_constant (xmmsc_connection_t *c, int dest, xmmsv_t *nms,
 
 	res = introspect_internal (c, dest, nms, true,
 	                           XMMSC_SC_INTERFACE_ENTITY_TYPE_NAMESPACE,
-	                           keyfilter);
+	                           keyfilter, false);
 	xmmsv_unref (keyfilter);
 
 	return res;
@@ -287,7 +361,7 @@ xmmsc_sc_introspect_docstring (xmmsc_connection_t *c, int dest, xmmsv_t *path)
 	keyfilter = xmmsv_new_list ();
 	xmmsv_list_append_string (keyfilter, "docstring");
 
-	res = introspect_internal (c, dest, path, false, 0, keyfilter);
+	res = introspect_internal (c, dest, path, false, 0, keyfilter, false);
 	xmmsv_unref (keyfilter);
 
 	return res;
@@ -506,13 +580,14 @@ xmmsc_sc_namespace_add_broadcast (xmmsc_sc_namespace_t *nms,
  * Ignored otherwise.
  * @param keyfilter Either NULL or a list of keys to be followed in
  * the resulting introspection value.
+ * @param recursive Whether to describe subnamespaces recursively.
  *
  * \sa command_introspect
  */
 static xmmsc_result_t *
 introspect_internal (xmmsc_connection_t *c, int dest, xmmsv_t *entity,
                      bool enforce_type, xmmsc_sc_interface_entity_type_t type,
-                     xmmsv_t *keyfilter)
+                     xmmsv_t *keyfilter, bool recursive)
 {
 	xmmsv_t *args, *msg;
 	xmmsc_result_t *res;
@@ -528,6 +603,10 @@ introspect_internal (xmmsc_connection_t *c, int dest, xmmsv_t *entity,
 		xmmsv_dict_set_int (args, XMMSC_SC_INTROSPECT_TYPE_KEY, type);
 	}
 
+	if (recursive) {
+		xmmsv_dict_set_int (args, XMMSC_SC_INTROSPECT_RECURSIVE_KEY, 1);
+	}
+
 	msg = xmmsv_build_dict (XMMSV_DICT_ENTRY_INT (XMMSC_SC_CMD_KEY,
 	                                              XMMSC_SC_INTROSPECT),
 	                        XMMSV_DICT_ENTRY (XMMSC_SC_ARGS_KEY, args),
@@ -549,3 +628,46 @@ validate_entity_name (const char *name)
 {
 	return !fnmatch (XMMSC_SC_ENTITY_NAME_PATTERN, name, 0);
 }
+
+/**
+ * Check the arguments of a method call.
+ */
+static bool
+validate_call (xmmsv_t *method, xmmsv_t *pargs, xmmsv_t *nargs)
+{
+	x_api_error_if (!method, "with NULL method path.", false);
+	x_api_error_if (xmmsv_get_type (method) != XMMSV_TYPE_LIST,
+	                "with a non-list method path.", false);
+	x_api_error_if (!xmmsv_list_get_size (method), "with empty method.", false);
+	x_api_error_if (pargs && xmmsv_get_type (pargs) != XMMSV_TYPE_LIST,
+	                "with a non-list of positional arguments.", false);
+	x_api_error_if (nargs && xmmsv_get_type (nargs) != XMMSV_TYPE_DICT,
+	                "with a non-dict of named arguments.", false);
+	x_api_error_if (!xmmsv_list_restrict_type (method, XMMSV_TYPE_STRING),
+	                "with non-string in method path", false);
+
+	return true;
+}
+
+/**
+ * Pack the information of a method call in a dict, as expected by the
+ * CALL command.
+ */
+static xmmsv_t *
+build_call (xmmsv_t *method, xmmsv_t *pargs, xmmsv_t *nargs)
+{
+	/* Normalize NULL to empty values. */
+	pargs = pargs ? xmmsv_ref (pargs) : xmmsv_new_list ();
+	nargs = nargs ? xmmsv_ref (nargs) : xmmsv_new_dict ();
+
+	/* Let the dict steal a reference to pargs and nargs since either
+	 * we created new values or we referenced the old ones above.
+	 */
+	return xmmsv_build_dict (XMMSV_DICT_ENTRY (XMMSC_SC_CALL_METHOD_KEY,
+	                                           xmmsv_ref (method)),
+	                         XMMSV_DICT_ENTRY (XMMSC_SC_CALL_PARGS_KEY,
+	                                           pargs),
+	                         XMMSV_DICT_ENTRY (XMMSC_SC_CALL_NARGS_KEY,
+	                                           nargs),
+	                         XMMSV_DICT_END);
+}
@@ -65,6 +65,7 @@ static void xmmsc_sc_broadcast_desc_destroy (xmmsc_sc_broadcast_desc_t *bcast);
 
 static xmmsc_sc_namespace_t *xmmsc_sc_namespace_new_internal (void);
 static xmmsc_sc_interface_entity_t *xmmsc_sc_namespace_lookup_child (xmmsc_sc_namespace_t *nms, xmmsv_t *name);
+static xmmsv_t *xmmsc_sc_namespace_introspect_internal (xmmsc_sc_interface_entity_t *nms, bool recursive);
 
 /**
  * Create a new interface entity.
@@ -622,6 +623,34 @@ xmmsc_sc_broadcast_desc_destroy (xmmsc_sc_broadcast_desc_t *bcast)
  */
 xmmsv_t *
 xmmsc_sc_interface_entity_namespace_introspect (xmmsc_sc_interface_entity_t *nms)
+{
+	return xmmsc_sc_namespace_introspect_internal (nms, false);
+}
+
+/**
+ * Introspect into a namespace interface entity and all its subnamespaces.
+ *
+ * The description has the same form as the one returned by
+ * #xmmsc_sc_interface_entity_namespace_introspect, except that
+ * "namespaces" is a list of descriptions of the subnamespaces, themselves
+ * introspected recursively.
+ *
+ * @param nms The namespace interface entity.
+ * @return A dictionary describing the whole namespace tree.
+ */
+xmmsv_t *
+xmmsc_sc_interface_entity_namespace_introspect_recursive (xmmsc_sc_interface_entity_t *nms)
+{
+	return xmmsc_sc_namespace_introspect_internal (nms, true);
+}
+
+/**
+ * Introspect into a namespace interface entity, and into its subnamespaces if
+ * recursive is true.
+ */
+static xmmsv_t *
+xmmsc_sc_namespace_introspect_internal (xmmsc_sc_interface_entity_t *nms,
+                                        bool recursive)
 {
 	x_list_t *node;
 	xmmsc_sc_namespace_t *namespace;
@@ -642,7 +671,13 @@ xmmsc_sc_interface_entity_namespace_introspect (xmmsc_sc_interface_entity_t *nms
 		/* Introspect each child and add it to the corresponding list */
 		switch (xmmsc_sc_interface_entity_get_type (child)) {
 			case XMMSC_SC_INTERFACE_ENTITY_TYPE_NAMESPACE:
-				xmmsv_list_append (subnamespaces, child->name);
+				if (recursive) {
+					desc = xmmsc_sc_namespace_introspect_internal (child, true);
+					xmmsv_list_append (subnamespaces, desc);
+					xmmsv_unref (desc);
+				} else {
+					xmmsv_list_append (subnamespaces, child->name);
+				}
 				break;
 
 			case XMMSC_SC_INTERFACE_ENTITY_TYPE_METHOD:
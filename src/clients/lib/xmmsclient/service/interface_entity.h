@@ -46,5 +46,6 @@ void xmmsc_sc_namespace_destroy (xmmsc_sc_namespace_t *nms);
 bool xmmsc_sc_namespace_add_child (xmmsc_sc_namespace_t *nms, xmmsc_sc_interface_entity_t *child);
 xmmsc_sc_interface_entity_t *xmmsc_sc_namespace_resolve_path (xmmsc_sc_namespace_t *root, xmmsv_t *path, xmmsc_sc_namespace_t **parent);
 xmmsv_t *xmmsc_sc_interface_entity_namespace_introspect (xmmsc_sc_interface_entity_t *nms);
+xmmsv_t *xmmsc_sc_interface_entity_namespace_introspect_recursive (xmmsc_sc_interface_entity_t *nms);
 
 #endif
@@ -18,12 +18,13 @@
 
 /* commands */
 static xmmsv_t *command_call (xmmsc_connection_t *c, xmmsv_t *call);
+static xmmsv_t *command_call_batch (xmmsc_connection_t *c, xmmsv_t *calls);
 static xmmsv_t *command_broadcast_subscribe (xmmsc_connection_t *c, xmmsv_t *name, int msgid);
 static xmmsv_t *command_introspect (xmmsc_connection_t *c, xmmsv_t *args);
 
 /* utility functions */
 static int on_message_received (xmmsv_t *c2c_msg, void *userdata);
-static xmmsv_t *introspect_interface_entity (xmmsc_sc_interface_entity_t *ifent);
+static xmmsv_t *introspect_interface_entity (xmmsc_sc_interface_entity_t *ifent, bool recursive);
 
 /**
  * Set up the connection to offer service functionality.
@@ -47,10 +48,77 @@ xmmsc_sc_init (xmmsc_connection_t *c)
 	return xmmsc_sc_interface_entity_get_namespace (c->sc_root);
 }
 
+/**
+ * Defer the reply to the method call being handled.
+ * To be called from within a method. The value the method returns is
+ * discarded, and the reply has to be sent later with #xmmsc_sc_reply,
+ * which allows the method to wait for other requests without blocking
+ * the connection.
+ *
+ * @param c The connection structure.
+ * @return The id of the message to reply to, or 0 if no method call is
+ * being handled.
+ */
+int
+xmmsc_sc_reply_defer (xmmsc_connection_t *c)
+{
+	x_check_conn (c, 0);
+	x_api_error_if (!c->sc_call_msgid, "outside of a method call.", 0);
+
+	c->sc_call_deferred = true;
+
+	return c->sc_call_msgid;
+}
+
+/**
+ * Check whether the reply to the method call being handled can be
+ * deferred with #xmmsc_sc_reply_defer. Calls which are part of a
+ * batch can't be deferred.
+ *
+ * @param c The connection structure.
+ * @return Whether the reply can be deferred.
+ */
+bool
+xmmsc_sc_reply_can_defer (xmmsc_connection_t *c)
+{
+	x_check_conn (c, false);
+
+	return c->sc_call_msgid != 0;
+}
+
+/**
+ * Send the reply to a method call deferred with #xmmsc_sc_reply_defer.
+ *
+ * @param c The connection structure.
+ * @param msgid The id returned by #xmmsc_sc_reply_defer.
+ * @param value The value to reply with, an error value if the call
+ * failed. Must not be NULL.
+ * @return Whether the reply was successfully queued.
+ */
+bool
+xmmsc_sc_reply (xmmsc_connection_t *c, int msgid, xmmsv_t *value)
+{
+	xmmsc_result_t *res;
+
+	x_check_conn (c, false);
+	x_api_error_if (msgid <= 0, "with invalid message id.", false);
+	x_api_error_if (!value, "with NULL value.", false);
+
+	res = xmmsc_c2c_reply (c, msgid, XMMS_C2C_REPLY_POLICY_NO_REPLY, value);
+	if (!res) {
+		return false;
+	}
+
+	xmmsc_result_unref (res);
+
+	return true;
+}
+
 static int
 on_message_received (xmmsv_t *c2c_msg, void *userdata)
 {
-	int cmd, msgid;
+	int cmd, msgid, prev_msgid;
+	bool prev_deferred;
 	xmmsc_connection_t *c;
 	xmmsv_t *payload, *sc_args, *reply;
 
@@ -82,7 +150,32 @@ on_message_received (xmmsv_t *c2c_msg, void *userdata)
 	/* And dispatch the command */
 	switch (cmd) {
 		case XMMSC_SC_CALL:
+			/* Methods may process other messages while they run, so
+			 * save the state of the call being handled, if any.
+			 */
+			prev_msgid = c->sc_call_msgid;
+			prev_deferred = c->sc_call_deferred;
+			c->sc_call_msgid = msgid;
+			c->sc_call_deferred = false;
+
 			reply = command_call (c, sc_args);
+
+			if (c->sc_call_deferred && reply) {
+				xmmsv_unref (reply);
+				reply = NULL;
+			}
+			c->sc_call_msgid = prev_msgid;
+			c->sc_call_deferred = prev_deferred;
+			break;
+
+		case XMMSC_SC_CALL_BATCH:
+			/* The calls reply together, so they may not defer. */
+			prev_msgid = c->sc_call_msgid;
+			c->sc_call_msgid = 0;
+
+			reply = command_call_batch (c, sc_args);
+
+			c->sc_call_msgid = prev_msgid;
 			break;
 
 		case XMMSC_SC_BROADCAST_SUBSCRIBE:
@@ -152,6 +245,39 @@ command_call (xmmsc_connection_t *c, xmmsv_t *call)
 	return xmmsc_sc_interface_entity_method_call (method, pargs, nargs);
 }
 
+/**
+ * Implements XMMSC_SC_CALL_BATCH.
+ * This command expects as argument a list of dictionaries, each of them
+ * being the argument of a XMMSC_SC_CALL command. The methods are called
+ * in order, and the reply is the list of their return values.
+ */
+static xmmsv_t *
+command_call_batch (xmmsc_connection_t *c, xmmsv_t *calls)
+{
+	xmmsv_t *call, *ret, *replies;
+	int i, size;
+
+	if (!xmmsv_is_type (calls, XMMSV_TYPE_LIST)) {
+		return xmmsv_new_error ("failed to get the list of calls");
+	}
+
+	size = xmmsv_list_get_size (calls);
+	replies = xmmsv_new_list ();
+
+	for (i = 0; i < size; i++) {
+		xmmsv_list_get (calls, i, &call);
+		if (xmmsv_is_type (call, XMMSV_TYPE_DICT)) {
+			ret = command_call (c, call);
+		} else {
+			ret = xmmsv_new_error ("failed to parse call");
+		}
+		xmmsv_list_append (replies, ret);
+		xmmsv_unref (ret);
+	}
+
+	return replies;
+}
+
 /**
  * Implements XMMSC_SC_BROADCAST_SUBSCRIBE.
  * This command expects a path to a broadcast as its argument.
@@ -176,7 +302,10 @@ command_broadcast_subscribe (xmmsc_connection_t *c, xmmsv_t *path, int msgid)
  * XMMSC_SC_INTROSPECT_PATH_KEY to a path to an interface entity;
  * XMMSC_SC_INTROSPECT_TYPE_KEY optionally, to the expected type of the
  * interface entity;
- * XMMSC_SC_INTROSPECT_KEYFILTER_KEY optionally, to a keyfilter.
+ * XMMSC_SC_INTROSPECT_KEYFILTER_KEY optionally, to a keyfilter;
+ * XMMSC_SC_INTROSPECT_RECURSIVE_KEY optionally, to a nonzero integer if
+ * the subnamespaces of a namespace are to be described as well, rather
+ * than only named.
  *
  * A  keyfilter specifies a list of string keys whose values will be
  * followed in sequence in the interface entity's description dictionary
@@ -199,7 +328,7 @@ command_broadcast_subscribe (xmmsc_connection_t *c, xmmsv_t *path, int msgid)
 static xmmsv_t *
 command_introspect (xmmsc_connection_t *c, xmmsv_t *args)
 {
-	int type;
+	int type, recursive;
 	const char *key;
 	xmmsv_list_iter_t *it;
 	xmmsv_t *path, *ret, *keyfilter, *v;
@@ -220,7 +349,11 @@ command_introspect (xmmsc_connection_t *c, xmmsv_t *args)
 		return xmmsv_new_error ("unexpected type");
 	}
 
-	ret = introspect_interface_entity (ifent);
+	if (!xmmsv_dict_entry_get_int (args, XMMSC_SC_INTROSPECT_RECURSIVE_KEY, &recursive)) {
+		recursive = 0;
+	}
+
+	ret = introspect_interface_entity (ifent, recursive);
 
 	/* Follow trail of keys specified in keyfilter */
 	if (xmmsv_dict_get (args, XMMSC_SC_INTROSPECT_KEYFILTER_KEY, &keyfilter)) {
@@ -248,13 +381,16 @@ command_introspect (xmmsc_connection_t *c, xmmsv_t *args)
  * Introspect an interface entity regardless of type.
  */
 static xmmsv_t *
-introspect_interface_entity (xmmsc_sc_interface_entity_t *ifent)
+introspect_interface_entity (xmmsc_sc_interface_entity_t *ifent, bool recursive)
 {
 	switch (xmmsc_sc_interface_entity_get_type (ifent)) {
 		case XMMSC_SC_INTERFACE_ENTITY_TYPE_METHOD:
 			return xmmsc_sc_interface_entity_method_introspect (ifent);
 
 		case XMMSC_SC_INTERFACE_ENTITY_TYPE_NAMESPACE:
+			if (recursive) {
+				return xmmsc_sc_interface_entity_namespace_introspect_recursive (ifent);
+			}
 			return xmmsc_sc_interface_entity_namespace_introspect (ifent);
 
 		case XMMSC_SC_INTERFACE_ENTITY_TYPE_BROADCAST:
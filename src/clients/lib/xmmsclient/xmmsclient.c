@@ -119,6 +119,8 @@ xmmsc_init (const char *clientname)
 	c->visv = NULL;
 
 	c->sc_root = NULL;
+	c->sc_call_msgid = 0;
+	c->sc_call_deferred = false;
 	return xmmsc_ref (c);
 }
 
@@ -327,6 +327,7 @@ int32_t xmmsc_c2c_get_own_id (xmmsc_connection_t *c) XMMS_PUBLIC;
 xmmsc_result_t *xmmsc_c2c_get_connected_clients (xmmsc_connection_t *c) XMMS_PUBLIC;
 xmmsc_result_t *xmmsc_c2c_ready (xmmsc_connection_t *c) XMMS_PUBLIC;
 xmmsc_result_t *xmmsc_c2c_get_ready_clients (xmmsc_connection_t *c) XMMS_PUBLIC;
+xmmsc_result_t *xmmsc_c2c_get_message_stats (xmmsc_connection_t *c) XMMS_PUBLIC;
 
 /* broadcasts */
 xmmsc_result_t *xmmsc_broadcast_c2c_message (xmmsc_connection_t *c) XMMS_PUBLIC;
@@ -341,7 +342,8 @@ xmmsc_result_t *xmmsc_broadcast_c2c_client_disconnected (xmmsc_connection_t *c)
 typedef enum {
 	XMMSC_SC_CALL,
 	XMMSC_SC_BROADCAST_SUBSCRIBE,
-	XMMSC_SC_INTROSPECT
+	XMMSC_SC_INTROSPECT,
+	XMMSC_SC_CALL_BATCH
 } xmmsc_sc_commands_t;
 
 /* Special keys for message fields. */
@@ -356,6 +358,7 @@ typedef enum {
 #define XMMSC_SC_INTROSPECT_PATH_KEY "libxmmsclient-sc-introspect-path"
 #define XMMSC_SC_INTROSPECT_TYPE_KEY "libxmmsclient-sc-introspect-type"
 #define XMMSC_SC_INTROSPECT_KEYFILTER_KEY "libxmmsclient-sc-introspect-keyfilter"
+#define XMMSC_SC_INTROSPECT_RECURSIVE_KEY "libxmmsclient-sc-introspect-recursive"
 
 typedef struct xmmsc_sc_namespace_St xmmsc_sc_namespace_t;
 typedef xmmsv_t *(*xmmsc_sc_method_t) (xmmsv_t *positional_args, xmmsv_t *named_args, void *user_data);
@@ -387,9 +390,14 @@ xmmsc_result_t *xmmsc_sc_broadcast_subscribe (xmmsc_connection_t *c, int dest, x
 
 /* method call */
 xmmsc_result_t *xmmsc_sc_call (xmmsc_connection_t *c, int dest, xmmsv_t *method, xmmsv_t *pargs, xmmsv_t *nargs) XMMS_PUBLIC;
+xmmsc_result_t *xmmsc_sc_call_batch (xmmsc_connection_t *c, int dest, xmmsv_t *calls) XMMS_PUBLIC;
+int xmmsc_sc_reply_defer (xmmsc_connection_t *c) XMMS_PUBLIC;
+bool xmmsc_sc_reply_can_defer (xmmsc_connection_t *c) XMMS_PUBLIC;
+bool xmmsc_sc_reply (xmmsc_connection_t *c, int msgid, xmmsv_t *value) XMMS_PUBLIC;
 
 /* introspection */
 xmmsc_result_t *xmmsc_sc_introspect_namespace (xmmsc_connection_t *c, int dest, xmmsv_t *nms) XMMS_PUBLIC;
+xmmsc_result_t *xmmsc_sc_introspect_namespace_recursive (xmmsc_connection_t *c, int dest, xmmsv_t *nms) XMMS_PUBLIC;
 xmmsc_result_t *xmmsc_sc_introspect_method (xmmsc_connection_t *c, int dest, xmmsv_t *method) XMMS_PUBLIC;
 xmmsc_result_t *xmmsc_sc_introspect_broadcast (xmmsc_connection_t *c, int dest, xmmsv_t *broadcast) XMMS_PUBLIC;
 xmmsc_result_t *xmmsc_sc_introspect_constant (xmmsc_connection_t *c, int dest, xmmsv_t *nms, const char *key) XMMS_PUBLIC;
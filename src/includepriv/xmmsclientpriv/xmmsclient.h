@@ -64,6 +64,11 @@ struct xmmsc_connection_St {
 	/* anonymous root namespace */
 	xmmsc_sc_interface_entity_t *sc_root;
 
+	/* id of the service method call being handled, and whether the
+	 * method deferred its reply */
+	int sc_call_msgid;
+	bool sc_call_deferred;
+
 	/* we need to hold the connection path to get the hostname */
 	char path[XMMS_PATH_MAX];
 };
@@ -21,6 +21,7 @@
 
 #include <glib.h>
 
+#include <xmms/xmms_config.h>
 #include <xmms/xmms_log.h>
 #include <xmms/xmms_object.h>
 
@@ -36,19 +37,29 @@
  * is expecting a reply from the recipient.
  */
 typedef struct {
+	gint32 msgid;
 	gint32 sender;
 	gint32 destination;
 	uint32_t cookie;
 	xmms_c2c_reply_policy_t reply_policy;
+	gint64 sent;
+	GList *expiry_link;
 } xmms_courier_pending_msg_t;
 
 /**
  * The pool of pending messages.
+ * Messages are indexed by id. Those expecting a single reply are also
+ * queued in the order they were sent, which is the order they expire in
+ * since their deadline is computed from the current reply timeout.
  */
 typedef struct {
 	gint32 last_id;
 	GMutex lock;
-	GTree *messages;
+	GHashTable *messages;
+	GQueue expiring;
+	guint expiry_source;
+	gint64 replied;
+	gint64 expired;
 } xmms_courier_pending_pool_t;
 
 /**
@@ -63,6 +74,8 @@ struct xmms_courier_St {
 	GList *ready;
 	GMutex clients_lock;
 	xmms_courier_pending_pool_t *pending_pool;
+
+	xmms_config_property_t *reply_timeout;
 };
 
 /* Initializers/destroyers */
@@ -76,18 +89,21 @@ static void xmms_courier_client_reply (xmms_courier_t *courier, gint32 msgid, in
 static xmmsv_t *xmms_courier_client_get_connected_clients (xmms_courier_t *courier, xmms_error_t *err);
 static void xmms_courier_client_ready (xmms_courier_t *courier, gint32 clientid, xmms_error_t *err);
 static xmmsv_t *xmms_courier_client_get_ready_clients (xmms_courier_t *courier, xmms_error_t *err);
+static xmmsv_t *xmms_courier_client_get_message_stats (xmms_courier_t *courier, xmms_error_t *err);
 
 /* Private methods */
 static gint32 xmms_courier_store_pending (xmms_courier_t *courier, gint32 sender, gint32 dest, uint32_t cookie, xmms_c2c_reply_policy_t reply_policy);
-static xmms_courier_pending_msg_t *xmms_courier_get_pending (xmms_courier_t *courier, gint32 msgid);
+static gboolean xmms_courier_get_pending (xmms_courier_t *courier, gint32 msgid, gint32 sender, xmms_courier_pending_msg_t *context, xmms_error_t *err);
 static void xmms_courier_remove_pending (xmms_courier_t *courier, gint32 msgid);
+static void xmms_courier_schedule_expiry (xmms_courier_t *courier, gint32 timeout, gint64 now);
+static gboolean xmms_courier_expire_pending (gpointer userdata);
+static void on_reply_timeout_changed (xmms_object_t *object, xmmsv_t *_data, gpointer udata);
 
 /* Helper functions */
 static void write_reply (gint32 dest, xmmsv_t *c2c_msg, uint32_t cookie, xmms_error_t *err);
-static gint compare_int32 (gconstpointer a, gconstpointer b, gpointer unused);
+static void write_error_replies (GList *messages, const gchar *error);
 static void client_connected_cb (xmms_object_t *unused, xmmsv_t *val, gpointer userdata);
 static void client_disconnected_cb (xmms_object_t *unused, xmmsv_t *val, gpointer userdata);
-static gboolean client_disconnected_foreach (gpointer key, gpointer value, gpointer userdata);
 
 #include "courier_ipc.c"
 
@@ -106,6 +122,14 @@ xmms_courier_init (void)
 	courier->manager = xmms_ipc_manager_get();
 	xmms_object_ref(courier->manager);
 
+	/* Seconds after which messages expecting a single reply are
+	 * answered with an error, 0 to wait for the reply forever.
+	 */
+	courier->reply_timeout = xmms_config_property_register ("courier.reply_timeout",
+	                                                        "0",
+	                                                        on_reply_timeout_changed,
+	                                                        courier);
+
 	xmms_courier_register_ipc_commands (XMMS_OBJECT (courier));
 
 	xmms_object_connect (XMMS_OBJECT (courier->manager),
@@ -130,6 +154,9 @@ xmms_courier_destroy (xmms_object_t *object)
 	xmms_courier_t *courier;
 
 	courier = (xmms_courier_t *) object;
+	xmms_config_property_callback_remove (courier->reply_timeout,
+	                                      on_reply_timeout_changed,
+	                                      courier);
 	g_list_free (courier->clients);
 	g_list_free (courier->ready);
 	g_mutex_clear (&courier->clients_lock);
@@ -152,7 +179,8 @@ xmms_courier_pending_pool_init (void)
 
 	ret = g_new0 (xmms_courier_pending_pool_t, 1);
 	g_mutex_init (&ret->lock);
-	ret->messages = g_tree_new_full (compare_int32, NULL, NULL, g_free);
+	ret->messages = g_hash_table_new_full (NULL, NULL, NULL, g_free);
+	g_queue_init (&ret->expiring);
 
 	return ret;
 }
@@ -164,8 +192,12 @@ static void
 xmms_courier_pending_pool_destroy (xmms_courier_pending_pool_t *pending)
 {
 	/* Free the pool of pending messages */
+	if (pending->expiry_source) {
+		g_source_remove (pending->expiry_source);
+	}
 	g_mutex_clear (&pending->lock);
-	g_tree_destroy (pending->messages);
+	g_queue_clear (&pending->expiring);
+	g_hash_table_destroy (pending->messages);
 	g_free (pending);
 
 	return;
@@ -308,43 +340,27 @@ xmms_courier_client_reply (xmms_courier_t *courier, gint32 reply_to,
                            uint32_t cookie, xmms_error_t *err)
 {
 	xmmsv_t *c2c_msg;
-	xmms_courier_pending_msg_t *context;
+	xmms_courier_pending_msg_t context;
 	gint32 dest;
 	gint32 msgid;
 
 	/* Restore the context of the original message from the pending pool */
-	context = xmms_courier_get_pending (courier, reply_to);
-	if (context == NULL) {
-		xmms_error_set (err, XMMS_ERROR_NOENT, "pending message not found");
-		return;
-	}
-
-	/* Check if the answering client was the destination of the message */
-	if (sender != context->destination) {
-		xmms_error_set (err, XMMS_ERROR_PERMISSION, "sender mismatch in reply");
+	if (!xmms_courier_get_pending (courier, reply_to, sender, &context, err)) {
 		return;
 	}
 
 	/* Send the message as usual */
 	msgid = 0;
-	dest = context->sender;
+	dest = context.sender;
 	if (reply_policy != XMMS_C2C_REPLY_POLICY_NO_REPLY) {
 		msgid = xmms_courier_store_pending (courier, sender, dest, cookie,
 		                                    reply_policy);
 	}
 
 	c2c_msg = xmmsv_c2c_message_format (sender, dest, msgid, payload);
-	send_reply (courier, reply_policy, c2c_msg, context->cookie, cookie, err);
+	send_reply (courier, reply_policy, c2c_msg, context.cookie, cookie, err);
 	xmmsv_unref (c2c_msg);
 
-	if (context->reply_policy == XMMS_C2C_REPLY_POLICY_SINGLE_REPLY) {
-		/* Remove the context if no more replies are expected. */
-		xmms_courier_remove_pending (courier, reply_to);
-	}
-
-	/* May or not be invalid, don't use this anymore. */
-	context = NULL;
-
 	return;
 }
 
@@ -408,8 +424,31 @@ xmms_courier_client_get_ready_clients (xmms_courier_t *courier,
 	return ret;
 }
 
+/**
+ * Get counters of the client-to-client messages expecting a reply.
+ */
+static xmmsv_t *
+xmms_courier_client_get_message_stats (xmms_courier_t *courier,
+                                       xmms_error_t *err)
+{
+	xmmsv_t *ret;
+	xmms_courier_pending_pool_t *pending = courier->pending_pool;
+
+	g_mutex_lock (&pending->lock);
+	ret = xmmsv_build_dict (XMMSV_DICT_ENTRY_INT ("pending",
+	                                              g_hash_table_size (pending->messages)),
+	                        XMMSV_DICT_ENTRY_INT ("expired", pending->expired),
+	                        XMMSV_DICT_ENTRY_INT ("replied", pending->replied),
+	                        XMMSV_DICT_END);
+	g_mutex_unlock (&pending->lock);
+
+	return ret;
+}
+
 /**
  * Save the context of a pending client-to-client message.
+ * Messages expecting a single reply are queued to expire once a reply
+ * timeout is configured.
  *
  * @param sender the id of the sender client
  * @param dest the id of the recipient client
@@ -422,11 +461,13 @@ xmms_courier_store_pending (xmms_courier_t *courier, gint32 sender,
                             gint32 dest, uint32_t cookie,
                             xmms_c2c_reply_policy_t reply_policy)
 {
-	gint32 msgid;
+	gint32 msgid, timeout;
 	xmms_courier_pending_msg_t *entry;
 	xmms_courier_pending_pool_t *pending = courier->pending_pool;
 
-	entry = g_new (xmms_courier_pending_msg_t, 1);
+	timeout = xmms_config_property_get_int (courier->reply_timeout);
+
+	entry = g_new0 (xmms_courier_pending_msg_t, 1);
 	entry->sender = sender;
 	entry->destination = dest;
 	entry->cookie = cookie;
@@ -436,8 +477,19 @@ xmms_courier_store_pending (xmms_courier_t *courier, gint32 sender,
 
 	/* Register the next non-zero id available */
 	msgid = ++pending->last_id;
-	g_tree_insert (pending->messages, GINT_TO_POINTER (msgid),
-	               (gpointer) entry);
+	entry->msgid = msgid;
+	g_hash_table_insert (pending->messages, GINT_TO_POINTER (msgid),
+	                     (gpointer) entry);
+
+	if (reply_policy == XMMS_C2C_REPLY_POLICY_SINGLE_REPLY) {
+		entry->sent = g_get_monotonic_time ();
+		g_queue_push_tail (&pending->expiring, entry);
+		entry->expiry_link = g_queue_peek_tail_link (&pending->expiring);
+
+		if (!pending->expiry_source) {
+			xmms_courier_schedule_expiry (courier, timeout, entry->sent);
+		}
+	}
 
 	g_mutex_unlock (&pending->lock);
 
@@ -446,22 +498,56 @@ xmms_courier_store_pending (xmms_courier_t *courier, gint32 sender,
 }
 
 /**
- * Restore the context of a pending client-to-client message.
+ * Restore the context of a pending client-to-client message that is
+ * being replied to. The message is removed from the pool if no more
+ * replies are expected, so that it can't expire meanwhile.
  *
  * @param msgid the id of the message
+ * @param sender the id of the replying client
+ * @param context filled with a copy of the context of the message
+ * @param err set if the message can't be replied to by that client
+ *
+ * @return TRUE if the message may be replied to
  */
-static xmms_courier_pending_msg_t *
-xmms_courier_get_pending (xmms_courier_t *courier, gint32 msgid)
+static gboolean
+xmms_courier_get_pending (xmms_courier_t *courier, gint32 msgid,
+                          gint32 sender, xmms_courier_pending_msg_t *context,
+                          xmms_error_t *err)
 {
 	xmms_courier_pending_msg_t *msg;
 	xmms_courier_pending_pool_t *pending = courier->pending_pool;
 
 	g_mutex_lock (&pending->lock);
 	msg = (xmms_courier_pending_msg_t *)
-	      g_tree_lookup (pending->messages, GINT_TO_POINTER (msgid));
+	      g_hash_table_lookup (pending->messages, GINT_TO_POINTER (msgid));
+
+	if (msg == NULL) {
+		g_mutex_unlock (&pending->lock);
+		xmms_error_set (err, XMMS_ERROR_NOENT, "pending message not found");
+		return FALSE;
+	}
+
+	/* Check if the answering client was the destination of the message */
+	if (sender != msg->destination) {
+		g_mutex_unlock (&pending->lock);
+		xmms_error_set (err, XMMS_ERROR_PERMISSION, "sender mismatch in reply");
+		return FALSE;
+	}
+
+	*context = *msg;
+
+	if (msg->reply_policy == XMMS_C2C_REPLY_POLICY_SINGLE_REPLY) {
+		/* Remove the context if no more replies are expected. */
+		if (msg->expiry_link) {
+			g_queue_delete_link (&pending->expiring, msg->expiry_link);
+		}
+		g_hash_table_remove (pending->messages, GINT_TO_POINTER (msgid));
+		pending->replied++;
+	}
+
 	g_mutex_unlock (&pending->lock);
 
-	return msg;
+	return TRUE;
 }
 
 /**
@@ -472,16 +558,125 @@ xmms_courier_get_pending (xmms_courier_t *courier, gint32 msgid)
 static void
 xmms_courier_remove_pending (xmms_courier_t *courier, gint32 msgid)
 {
+	xmms_courier_pending_msg_t *msg;
 	xmms_courier_pending_pool_t *pending = courier->pending_pool;
 
 	g_mutex_lock (&pending->lock);
-	g_tree_remove (pending->messages, GINT_TO_POINTER (msgid));
+	msg = (xmms_courier_pending_msg_t *)
+	      g_hash_table_lookup (pending->messages, GINT_TO_POINTER (msgid));
+	if (msg != NULL) {
+		if (msg->expiry_link) {
+			g_queue_delete_link (&pending->expiring, msg->expiry_link);
+		}
+		g_hash_table_remove (pending->messages, GINT_TO_POINTER (msgid));
+	}
 	g_mutex_unlock (&pending->lock);
 
 	XMMS_DBG ("Removed pending message %d", msgid);
 	return;
 }
 
+/**
+ * Schedule the expiry of the first message of the expiry queue.
+ * Must be called with the lock of the pending pool held.
+ *
+ * @param timeout the reply timeout in seconds, 0 to never expire
+ * @param now the current monotonic time
+ */
+static void
+xmms_courier_schedule_expiry (xmms_courier_t *courier, gint32 timeout,
+                              gint64 now)
+{
+	gint64 delay, deadline;
+	xmms_courier_pending_msg_t *first;
+	xmms_courier_pending_pool_t *pending = courier->pending_pool;
+
+	first = g_queue_peek_head (&pending->expiring);
+	if (first == NULL || timeout <= 0) {
+		pending->expiry_source = 0;
+		return;
+	}
+
+	/* Round up to the next millisecond */
+	deadline = first->sent + timeout * G_TIME_SPAN_SECOND;
+	delay = MAX (0, (deadline - now + 999) / 1000);
+	pending->expiry_source = g_timeout_add ((guint) delay,
+	                                        xmms_courier_expire_pending,
+	                                        courier);
+}
+
+/**
+ * Reply an error to the senders of the messages whose reply timed out,
+ * and forget about them.
+ */
+static gboolean
+xmms_courier_expire_pending (gpointer userdata)
+{
+	gint32 timeout;
+	gint64 now;
+	GList *expired = NULL;
+	xmms_courier_t *courier = (xmms_courier_t *) userdata;
+	xmms_courier_pending_msg_t *msg;
+	xmms_courier_pending_pool_t *pending = courier->pending_pool;
+
+	timeout = xmms_config_property_get_int (courier->reply_timeout);
+	now = g_get_monotonic_time ();
+
+	g_mutex_lock (&pending->lock);
+
+	/* The timeout changed meanwhile and another source replaced this one */
+	if (g_source_is_destroyed (g_main_current_source ())) {
+		g_mutex_unlock (&pending->lock);
+		return FALSE;
+	}
+
+	while (timeout > 0 &&
+	       (msg = g_queue_peek_head (&pending->expiring)) != NULL &&
+	       msg->sent + timeout * G_TIME_SPAN_SECOND <= now) {
+		g_queue_pop_head (&pending->expiring);
+		g_hash_table_steal (pending->messages, GINT_TO_POINTER (msg->msgid));
+		expired = g_list_prepend (expired, msg);
+		pending->expired++;
+
+		XMMS_DBG ("Pending message %d expired", msg->msgid);
+	}
+
+	xmms_courier_schedule_expiry (courier, timeout, now);
+
+	g_mutex_unlock (&pending->lock);
+
+	write_error_replies (g_list_reverse (expired), "reply timed out");
+	g_list_free_full (expired, g_free);
+
+	/* A new source has been scheduled if needed */
+	return FALSE;
+}
+
+/**
+ * Gets called when the config property "courier.reply_timeout" has changed.
+ * The deadlines of the pending messages are computed from the new value,
+ * so the expiry is rescheduled accordingly.
+ */
+static void
+on_reply_timeout_changed (xmms_object_t *object, xmmsv_t *_data,
+                          gpointer udata)
+{
+	gint32 timeout;
+	xmms_courier_t *courier = (xmms_courier_t *) udata;
+	xmms_courier_pending_pool_t *pending = courier->pending_pool;
+
+	timeout = xmms_config_property_get_int (courier->reply_timeout);
+
+	g_mutex_lock (&pending->lock);
+
+	if (pending->expiry_source) {
+		g_source_remove (pending->expiry_source);
+	}
+	xmms_courier_schedule_expiry (courier, timeout, g_get_monotonic_time ());
+
+	g_mutex_unlock (&pending->lock);
+}
+
 /**
  * Write a reply message to a client.
  *
@@ -508,6 +703,31 @@ write_reply (gint32 dest, xmmsv_t *c2c_msg, uint32_t cookie,
 	return;
 }
 
+/**
+ * Reply an error to the senders of pending messages.
+ *
+ * @param messages a list of #xmms_courier_pending_msg_t
+ * @param error the error message
+ */
+static void
+write_error_replies (GList *messages, const gchar *error)
+{
+	GList *node;
+	xmmsv_t *err_reply;
+	xmms_error_t err;
+	xmms_courier_pending_msg_t *msg;
+
+	err_reply = xmmsv_new_error (error);
+
+	for (node = messages; node; node = g_list_next (node)) {
+		msg = (xmms_courier_pending_msg_t *) node->data;
+		xmms_error_reset (&err);
+		write_reply (msg->sender, err_reply, msg->cookie, &err);
+	}
+
+	xmmsv_unref (err_reply);
+}
+
 /**
  * Callback for client connect signal.
  * Add the new client's id to the list of clients.
@@ -538,89 +758,54 @@ static void
 client_disconnected_cb (xmms_object_t *unused, xmmsv_t *val, gpointer userdata)
 {
 	gint32 id;
-	guint remove_count;
-	GList *to_remove, *node;
+	gpointer value;
+	GHashTableIter iter;
+	GList *orphans = NULL, *removed = NULL;
 	xmms_courier_t *courier;
+	xmms_courier_pending_msg_t *entry;
+	xmms_courier_pending_pool_t *pending;
 
 	xmmsv_get_int32 (val, &id);
 	courier = (xmms_courier_t *) userdata;
+	pending = courier->pending_pool;
 
 	g_mutex_lock (&courier->clients_lock);
 	courier->clients = g_list_remove (courier->clients, GINT_TO_POINTER (id));
 	courier->ready = g_list_remove (courier->ready, GINT_TO_POINTER (id));
 	g_mutex_unlock (&courier->clients_lock);
 
-	/* Prepare a list with the disconnected client's id */
-	to_remove = g_list_append (NULL, GINT_TO_POINTER (id));
-
-	/* Fill it with the ids of pending messages that involved that client */
-	g_tree_foreach (courier->pending_pool->messages,
-	                client_disconnected_foreach,
-	                &to_remove);
-
-	/* And remove those messages.
-	 * Last entry in the list is still the id, so ignore it.
-	 */
-	node = to_remove;
-	remove_count = g_list_length (to_remove)-1;
-	while (remove_count-- > 0) {
-		xmms_courier_remove_pending (courier, GPOINTER_TO_INT (node->data));
-		node = g_list_next (node);
-	}
-
-	g_assert (g_list_length (node) == 1);
-	g_assert (node->data == GINT_TO_POINTER (id));
-
-	g_list_free (to_remove);
-
-	return;
-}
-
-static gboolean
-client_disconnected_foreach (gpointer key, gpointer value, gpointer userdata)
-{
-	gint32 client;
-	GList *last, **to_remove;
-	xmmsv_t *err_reply;
-	xmms_error_t err;
-	xmms_courier_pending_msg_t *entry;
+	/* Remove the pending messages that involved that client */
+	g_mutex_lock (&pending->lock);
 
-	to_remove = (GList **) userdata;
-	entry = (xmms_courier_pending_msg_t *) value;
+	g_hash_table_iter_init (&iter, pending->messages);
+	while (g_hash_table_iter_next (&iter, NULL, &value)) {
+		entry = (xmms_courier_pending_msg_t *) value;
+		if (entry->destination != id && entry->sender != id) {
+			continue;
+		}
 
-	/* Get the disconnected client's id, which is
-	 * always the last element in the list.
-	 */
-	last = g_list_last (*to_remove);
-	client = GPOINTER_TO_INT (last->data);
-
-	if (entry->destination == client || entry->sender == client) {
-		if (entry->destination == client) {
-			/* Reply an error to pending messages whose
-			 * destination is the disconnected client.
-			 */
-			err_reply = xmmsv_new_error ("destination client disconnected");
-			write_reply (entry->sender, err_reply, entry->cookie, &err);
-			xmmsv_unref (err_reply);
+		if (entry->expiry_link) {
+			g_queue_delete_link (&pending->expiring, entry->expiry_link);
+			entry->expiry_link = NULL;
 		}
+		g_hash_table_iter_steal (&iter);
 
-		*to_remove = g_list_prepend (*to_remove, key);
+		if (entry->destination == id) {
+			orphans = g_list_prepend (orphans, entry);
+		} else {
+			removed = g_list_prepend (removed, entry);
+		}
 	}
 
-	return FALSE;
-}
+	g_mutex_unlock (&pending->lock);
 
-static gint
-compare_int32 (gconstpointer a, gconstpointer b, gpointer unused)
-{
-	gint32 va = GPOINTER_TO_INT (a);
-	gint32 vb = GPOINTER_TO_INT (b);
+	/* Reply an error to pending messages whose destination is the
+	 * disconnected client.
+	 */
+	write_error_replies (orphans, "destination client disconnected");
 
-	if (va < vb) {
-		return -1;
-	} else if (va > vb) {
-		return 1;
-	} else {
-		return 0;
-	}
+	g_list_free_full (orphans, g_free);
+	g_list_free_full (removed, g_free);
+
+	return;
 }
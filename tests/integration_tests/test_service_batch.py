@@ -0,0 +1,149 @@
+# XMMS2 - X Music Multiplexer System
+# Copyright (C) 2003-2023 XMMS2 Team
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+
+# Needs a running daemon and the python bindings:
+# python -m unittest discover -s tests/integration_tests -p test_service_batch.py -v
+
+import threading
+import unittest
+
+import xmmsclient
+from xmmsclient import XmmsError
+from xmmsclient.service import XmmsServiceBatch, XmmsServiceClient, \
+        XmmsServiceNamespace, method_arg, service_method, service_deferred
+
+class Calc(XmmsServiceNamespace):
+    """Methods called in batches."""
+    namespace_path = ('org', 'xmms2', 'test')
+
+    @service_method(positional = [method_arg('x', 'integer', 'A number.')])
+    def double(self, x):
+        if x < 0:
+            raise ValueError("negative %d" % x)
+        return x * 2
+
+    @service_method()
+    def later(self):
+        return service_deferred()
+
+    @service_method()
+    def old_peer(self):
+        # The error a client without batch support replies to a batch.
+        raise ValueError("unrecognized command")
+
+class OldPeerConnection(object):
+    """Sends batches to a method answering like an old client."""
+    def __init__(self, xc):
+        self.xc = xc
+
+    def sc_call_batch(self, dest, calls, cb = None):
+        return self.xc.sc_call(dest, Calc.namespace_path + ('old_peer',), cb = cb)
+
+class TestServiceBatch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.service = xmmsclient.XmmsLoop('test_service')
+        cls.service.connect()
+        cls.calc = Calc(cls.service)
+        cls.calc.register()
+        cls.thread = threading.Thread(target = cls.service.loop)
+        cls.thread.daemon = True
+        cls.thread.start()
+
+        cls.xc = xmmsclient.Xmms('test_batch')
+        cls.xc.connect()
+        cls.clientid = cls.service.client_id
+        cls.client = XmmsServiceClient(cls.xc, cls.clientid)
+        cls.client(recursive = True).wait()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.service.exit_loop()
+        cls.thread.join()
+        cls.xc.disconnect()
+        cls.service.disconnect()
+
+    def batch(self, cb = None):
+        return XmmsServiceBatch(self.xc, self.clientid, cb = cb)
+
+    def test_values_in_order(self):
+        with self.batch() as b:
+            for i in range(10):
+                self.assertEqual(i, b.call('org.xmms2.test.double', i))
+        self.assertEqual([i * 2 for i in range(10)], b.values)
+        self.assertIsNone(b.error)
+
+    def test_errors_in_place(self):
+        with self.batch() as b:
+            b.call('org.xmms2.test.double', 1)
+            b.call('org.xmms2.test.double', -1)
+            b.call('org.xmms2.test.nothing')
+            b.call('org.xmms2.test.later')
+            b.call('org.xmms2.test.double', 2)
+        self.assertEqual(2, b.values[0])
+        self.assertIsInstance(b.values[1], XmmsError)
+        self.assertIn("negative -1", str(b.values[1]))
+        self.assertIsInstance(b.values[2], XmmsError)
+        self.assertIsInstance(b.values[3], XmmsError)
+        self.assertIn("batched calls cannot defer", str(b.values[3]))
+        self.assertEqual(4, b.values[4])
+        self.assertIsNone(b.error)
+
+    def test_method_paths(self):
+        with self.batch() as b:
+            b.call('org.xmms2.test.double', 1)
+            b.call(('org', 'xmms2', 'test', 'double'), 1)
+            b.call(self.client.org.xmms2.test.double, 1)
+        self.assertEqual([2, 2, 2], b.values)
+
+        b = XmmsServiceBatch(self.xc, self.clientid + 1)
+        self.assertRaises(ValueError, b.call, self.client.org.xmms2.test.double, 1)
+
+    def test_malformed_calls(self):
+        b = self.batch()
+        self.assertRaises(ValueError, b.call, ())
+        self.assertRaises(ValueError, b.call, '')
+        self.assertRaises(ValueError, b.call, 'org..double')
+        self.assertRaises(ValueError, b.call, ('org', 3))
+        self.assertEqual(0, len(b))
+        self.assertEqual([], b.wait())
+
+    def test_callback(self):
+        got = []
+        with self.batch(cb = got.append) as b:
+            b.call('org.xmms2.test.double', 21)
+        b.result.wait()
+        self.assertEqual([[42]], got)
+
+        with self.batch(cb = got.append) as b:
+            pass
+        self.assertEqual([[42], []], got)
+
+    def test_old_peer(self):
+        b = XmmsServiceBatch(OldPeerConnection(self.xc), self.clientid)
+        b.call('org.xmms2.test.double', 1)
+        b.call('org.xmms2.test.double', 2)
+        self.assertRaises(XmmsError, b.wait)
+        self.assertIn("does not support batched calls", str(b.error))
+        self.assertEqual([b.error, b.error], b.values)
+
+    def test_missing_client(self):
+        got = []
+        with XmmsServiceBatch(self.xc, self.clientid + 1000, cb = got.append) as b:
+            b.call('org.xmms2.test.double', 1)
+        b.result.wait()
+        self.assertIsInstance(b.error, XmmsError)
+        self.assertEqual([[b.error]], got)
+
+if __name__ == '__main__':
+    unittest.main()
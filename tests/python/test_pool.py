@@ -0,0 +1,120 @@
+# XMMS2 - X Music Multiplexer System
+# Copyright (C) 2003-2023 XMMS2 Team
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+
+import threading
+import time
+import unittest
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+from xmmsclient import XmmsPool
+
+class Connection(object):
+    def __init__(self, name):
+        self.name = name
+        self.connected = True
+
+    def disconnect(self):
+        self.connected = False
+
+class Pool(XmmsPool):
+    """A pool handing out placeholder connections, no daemon needed."""
+    def __init__(self, size, connect_delay = 0, fail = False):
+        XmmsPool.__init__(self, "test", size)
+        self.connect_delay = connect_delay
+        self.fail = fail
+
+    def _new_connection(self, name):
+        time.sleep(self.connect_delay)
+        if self.fail:
+            raise IOError("connection refused")
+        return Connection(name)
+
+def in_thread(func, *args):
+    ret = []
+    def run():
+        try:
+            ret.append(func(*args))
+        except Exception as e:
+            ret.append(e)
+    t = threading.Thread(target = run)
+    t.daemon = True
+    t.start()
+    return t, ret
+
+class TestXmmsPool(unittest.TestCase):
+    def test_release_reuses(self):
+        pool = Pool(2)
+        xc = pool.acquire()
+        pool.release(xc)
+        self.assertIs(pool.acquire(), xc)
+        self.assertEqual(len(pool), 1)
+
+    def test_double_release(self):
+        pool = Pool(2)
+        xc = pool.acquire()
+        pool.release(xc)
+        self.assertRaises(RuntimeError, pool.release, xc)
+        self.assertIs(pool.acquire(), xc)
+        self.assertIsNot(pool.acquire(), xc)
+        self.assertEqual(len(pool), 2)
+
+    def test_discard_wakes_waiter(self):
+        pool = Pool(1)
+        xc = pool.acquire()
+        t, ret = in_thread(pool.acquire)
+        time.sleep(0.05)
+        pool.discard(xc)
+        t.join(2)
+        self.assertFalse(t.is_alive())
+        self.assertIsInstance(ret[0], Connection)
+        self.assertIsNot(ret[0], xc)
+        self.assertFalse(xc.connected)
+
+    def test_close_wakes_waiter(self):
+        pool = Pool(1)
+        pool.acquire()
+        t, ret = in_thread(pool.acquire)
+        time.sleep(0.05)
+        pool.close()
+        t.join(2)
+        self.assertFalse(t.is_alive())
+        self.assertIsInstance(ret[0], RuntimeError)
+        self.assertRaises(RuntimeError, pool.acquire)
+
+    def test_timeout(self):
+        pool = Pool(1)
+        pool.acquire()
+        self.assertRaises(queue.Empty, pool.acquire, 0.05)
+
+    def test_failed_connect_frees_slot(self):
+        pool = Pool(1, fail = True)
+        self.assertRaises(IOError, pool.acquire)
+        pool.fail = False
+        self.assertIsInstance(pool.acquire(0.5), Connection)
+
+    def test_connect_outside_lock(self):
+        pool = Pool(2, connect_delay = 0.3)
+        xc = pool.acquire()
+        t, ret = in_thread(pool.acquire)
+        time.sleep(0.05)
+        start = time.time()
+        pool.release(xc)
+        self.assertLess(time.time() - start, 0.2)
+        t.join(2)
+        self.assertEqual(len(pool), 2)
+
+if __name__ == '__main__':
+    unittest.main()
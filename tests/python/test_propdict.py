@@ -0,0 +1,53 @@
+# XMMS2 - X Music Multiplexer System
+# Copyright (C) 2003-2023 XMMS2 Team
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+
+# PYTHONPATH=<built python bindings> python -m unittest discover -s tests/python -v
+
+import copy
+import pickle
+import unittest
+
+from xmmsclient.propdict import PropDict
+
+class TestPropDictPickle(unittest.TestCase):
+    def make(self):
+        pd = PropDict(["client/*", "server"])
+        pd[("server", "title")] = "Server title"
+        pd[("client/foo", "title")] = "Client title"
+        pd[("plugin/id3v2", "artist")] = "Artist"
+        pd["plain"] = 1
+        return pd
+
+    def check(self, pd):
+        self.assertIsInstance(pd, PropDict)
+        self.assertEqual(pd.sources, ["client/*", "server"])
+        self.assertEqual(pd["title"], "Client title")
+        self.assertEqual(pd[("server", "title")], "Server title")
+        self.assertEqual(pd["plain"], 1)
+        self.assertNotIn("artist", pd)
+        self.assertEqual(pd.resolved(), {"title": "Client title"})
+
+        del pd[("client/foo", "title")]
+        self.assertEqual(pd["title"], "Server title")
+
+    def test_round_trip_all_protocols(self):
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            pd = pickle.loads(pickle.dumps(self.make(), protocol))
+            self.check(pd)
+
+    def test_copy(self):
+        self.check(copy.copy(self.make()))
+        self.check(copy.deepcopy(self.make()))
+
+if __name__ == '__main__':
+    unittest.main()
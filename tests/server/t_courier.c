@@ -0,0 +1,420 @@
+/*  XMMS2 - X Music Multiplexer System
+ *  Copyright (C) 2003-2023 XMMS2 Team
+ *
+ *  PLUGINS ARE NOT CONSIDERED TO BE DERIVED WORK !!!
+ *
+ *  This library is free software; you can redistribute it and/or
+ *  modify it under the terms of the GNU Lesser General Public
+ *  License as published by the Free Software Foundation; either
+ *  version 2.1 of the License, or (at your option) any later version.
+ *
+ *  This library is distributed in the hope that it will be useful,
+ *  but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ *  Lesser General Public License for more details.
+ */
+
+#include <stdarg.h>
+#include <signal.h>
+#include <unistd.h>
+
+#include "xcu.h"
+
+#include <glib.h>
+
+#include <xmmspriv/xmms_log.h>
+#include <xmmspriv/xmms_ipc.h>
+#include <xmmspriv/xmms_config.h>
+#include <xmmspriv/xmms_courier.h>
+
+#include <xmmsc/xmmsc_idnumbers.h>
+#include <xmmsc/xmmsc_ipc_transport.h>
+
+#define MAX_CLIENTS 3
+
+static xmms_courier_t *courier;
+static gchar *socket_path;
+static xmms_ipc_transport_t *transports[MAX_CLIENTS];
+
+/* Call a courier command on behalf of a client, taking ownership of the
+ * NULL terminated arguments. Errors are returned as error values.
+ */
+static xmmsv_t *
+courier_call (gint cmd, gint32 client, ...)
+{
+	xmms_object_cmd_arg_t arg;
+	xmmsv_t *entry, *params;
+	va_list ap;
+
+	params = xmmsv_new_list ();
+
+	va_start (ap, client);
+	while ((entry = va_arg (ap, xmmsv_t *)) != NULL) {
+		xmmsv_list_append (params, entry);
+		xmmsv_unref (entry);
+	}
+	va_end (ap);
+
+	xmms_object_cmd_arg_init (&arg);
+	arg.args = params;
+	arg.client = client;
+
+	xmms_object_cmd_call (XMMS_OBJECT (courier), cmd, &arg);
+	xmmsv_unref (params);
+
+	if (xmms_error_isok (&arg.error)) {
+		return arg.retval != NULL ? arg.retval : xmmsv_new_none ();
+	}
+
+	if (arg.retval != NULL) {
+		xmmsv_unref (arg.retval);
+	}
+
+	return xmmsv_new_error (arg.error.message);
+}
+
+static gboolean
+courier_send (gint32 sender, gint32 dest, xmms_c2c_reply_policy_t policy)
+{
+	xmmsv_t *ret;
+	gboolean ok;
+
+	ret = courier_call (XMMS_IPC_COMMAND_COURIER_SEND_MESSAGE, sender,
+	                    xmmsv_new_int (dest), xmmsv_new_int (policy),
+	                    xmmsv_new_dict (), NULL);
+	ok = !xmmsv_is_error (ret);
+	xmmsv_unref (ret);
+
+	return ok;
+}
+
+static gboolean
+courier_reply (gint32 sender, gint32 msgid, xmms_c2c_reply_policy_t policy)
+{
+	xmmsv_t *ret;
+	gboolean ok;
+
+	ret = courier_call (XMMS_IPC_COMMAND_COURIER_REPLY, sender,
+	                    xmmsv_new_int (msgid), xmmsv_new_int (policy),
+	                    xmmsv_new_dict (), NULL);
+	ok = !xmmsv_is_error (ret);
+	xmmsv_unref (ret);
+
+	return ok;
+}
+
+static gint
+get_stat (const gchar *name)
+{
+	xmmsv_t *stats;
+	gint32 value = -1;
+
+	stats = courier_call (XMMS_IPC_COMMAND_COURIER_GET_MESSAGE_STATS, 0, NULL);
+	xmmsv_dict_entry_get_int32 (stats, name, &value);
+	xmmsv_unref (stats);
+
+	return value;
+}
+
+static gint
+count_clients (void)
+{
+	xmmsv_t *clients;
+	gint size;
+
+	clients = courier_call (XMMS_IPC_COMMAND_COURIER_GET_CONNECTED_CLIENTS,
+	                        0, NULL);
+	size = xmmsv_list_get_size (clients);
+	xmmsv_unref (clients);
+
+	return size;
+}
+
+/* Run the main loop, which accepts clients and expires messages, for
+ * msec milliseconds.
+ */
+static void
+run_main_loop (gint msec)
+{
+	gint64 end = g_get_monotonic_time () + msec * G_TIME_SPAN_MILLISECOND;
+
+	while (g_get_monotonic_time () < end) {
+		g_main_context_iteration (NULL, FALSE);
+		g_usleep (G_TIME_SPAN_MILLISECOND);
+	}
+}
+
+/* Run the main loop until a statistic reaches a value, or for 2 seconds. */
+static void
+wait_for_stat (const gchar *name, gint value)
+{
+	gint i;
+
+	for (i = 0; i < 200 && get_stat (name) != value; i++) {
+		run_main_loop (10);
+	}
+}
+
+static gint32
+connect_client (gint index)
+{
+	xmmsv_t *clients;
+	gint32 id = -1;
+	gint i, count;
+
+	count = count_clients ();
+
+	transports[index] = xmms_ipc_client_init (socket_path);
+	CU_ASSERT_PTR_NOT_NULL_FATAL (transports[index]);
+
+	for (i = 0; i < 200 && count_clients () == count; i++) {
+		run_main_loop (10);
+	}
+
+	clients = courier_call (XMMS_IPC_COMMAND_COURIER_GET_CONNECTED_CLIENTS,
+	                        0, NULL);
+	CU_ASSERT_EQUAL_FATAL (count + 1, xmmsv_list_get_size (clients));
+	xmmsv_list_get_int32 (clients, count, &id);
+	xmmsv_unref (clients);
+
+	return id;
+}
+
+static void
+disconnect_client (gint index)
+{
+	gint i, count;
+
+	if (transports[index] == NULL) {
+		return;
+	}
+
+	count = count_clients ();
+
+	xmms_ipc_transport_destroy (transports[index]);
+	transports[index] = NULL;
+
+	for (i = 0; i < 200 && count_clients () == count; i++) {
+		run_main_loop (10);
+	}
+}
+
+static gboolean
+quit_main_loop (gpointer loop)
+{
+	g_main_loop_quit (loop);
+	return FALSE;
+}
+
+/* Send a message from another thread, like the per client IPC threads. */
+static gpointer
+send_from_thread (gpointer clients)
+{
+	gint32 *ids = clients;
+
+	if (!courier_send (ids[0], ids[1], XMMS_C2C_REPLY_POLICY_SINGLE_REPLY)) {
+		return GINT_TO_POINTER (-1);
+	}
+
+	return GINT_TO_POINTER (get_stat ("pending"));
+}
+
+static void
+set_reply_timeout (const gchar *seconds)
+{
+	xmms_config_property_t *prop;
+
+	prop = xmms_config_lookup ("courier.reply_timeout");
+	xmms_config_property_set_data (prop, seconds);
+}
+
+SETUP (courier) {
+	/* The test clients never read, so the daemon may write to a socket
+	 * that is already closed. Like the daemon, don't die of it.
+	 */
+	signal (SIGPIPE, SIG_IGN);
+
+	xmms_ipc_init ();
+	xmms_log_init (0);
+
+	xmms_config_init ("memory://");
+
+	courier = xmms_courier_init ();
+
+	socket_path = g_strdup_printf ("unix:///tmp/xmms2-test-courier-%d",
+	                               (gint) getpid ());
+	xmms_ipc_setup_server (socket_path);
+
+	return 0;
+}
+
+CLEANUP () {
+	gint i;
+
+	for (i = 0; i < MAX_CLIENTS; i++) {
+		disconnect_client (i);
+	}
+
+	xmms_object_unref (courier); courier = NULL;
+	xmms_config_shutdown ();
+	xmms_ipc_shutdown ();
+
+	g_free (socket_path); socket_path = NULL;
+
+	return 0;
+}
+
+/* Message ids are handed out in sequence by each courier, from 1. */
+
+CASE (test_stats)
+{
+	gint32 a, b;
+
+	a = connect_client (0);
+	b = connect_client (1);
+
+	CU_ASSERT_EQUAL (0, get_stat ("pending"));
+
+	CU_ASSERT_TRUE (courier_send (a, b, XMMS_C2C_REPLY_POLICY_SINGLE_REPLY));
+	CU_ASSERT_TRUE (courier_send (a, b, XMMS_C2C_REPLY_POLICY_MULTI_REPLY));
+	CU_ASSERT_TRUE (courier_send (a, b, XMMS_C2C_REPLY_POLICY_NO_REPLY));
+	CU_ASSERT_EQUAL (2, get_stat ("pending"));
+
+	/* Only the destination may reply */
+	CU_ASSERT_FALSE (courier_reply (a, 1, XMMS_C2C_REPLY_POLICY_NO_REPLY));
+
+	CU_ASSERT_TRUE (courier_reply (b, 1, XMMS_C2C_REPLY_POLICY_NO_REPLY));
+	CU_ASSERT_EQUAL (1, get_stat ("pending"));
+	CU_ASSERT_EQUAL (1, get_stat ("replied"));
+
+	/* Replied messages are forgotten */
+	CU_ASSERT_FALSE (courier_reply (b, 1, XMMS_C2C_REPLY_POLICY_NO_REPLY));
+
+	/* Messages expecting several replies stay pending, and are not
+	 * counted as replied.
+	 */
+	CU_ASSERT_TRUE (courier_reply (b, 2, XMMS_C2C_REPLY_POLICY_NO_REPLY));
+	CU_ASSERT_TRUE (courier_reply (b, 2, XMMS_C2C_REPLY_POLICY_NO_REPLY));
+	CU_ASSERT_EQUAL (1, get_stat ("pending"));
+	CU_ASSERT_EQUAL (1, get_stat ("replied"));
+	CU_ASSERT_EQUAL (0, get_stat ("expired"));
+
+	/* Sending to a client which is not connected fails */
+	CU_ASSERT_FALSE (courier_send (a, b + 100, XMMS_C2C_REPLY_POLICY_SINGLE_REPLY));
+	CU_ASSERT_EQUAL (1, get_stat ("pending"));
+}
+
+CASE (test_timeout)
+{
+	gint32 a, b;
+
+	a = connect_client (0);
+	b = connect_client (1);
+
+	set_reply_timeout ("1");
+
+	CU_ASSERT_TRUE (courier_send (a, b, XMMS_C2C_REPLY_POLICY_SINGLE_REPLY));
+	CU_ASSERT_TRUE (courier_send (a, b, XMMS_C2C_REPLY_POLICY_MULTI_REPLY));
+	CU_ASSERT_TRUE (courier_send (a, b, XMMS_C2C_REPLY_POLICY_SINGLE_REPLY));
+	CU_ASSERT_TRUE (courier_reply (b, 3, XMMS_C2C_REPLY_POLICY_NO_REPLY));
+
+	run_main_loop (500);
+	CU_ASSERT_EQUAL (2, get_stat ("pending"));
+	CU_ASSERT_EQUAL (0, get_stat ("expired"));
+
+	wait_for_stat ("expired", 1);
+	CU_ASSERT_EQUAL (1, get_stat ("expired"));
+	CU_ASSERT_EQUAL (1, get_stat ("replied"));
+
+	/* Messages expecting several replies never expire */
+	CU_ASSERT_EQUAL (1, get_stat ("pending"));
+
+	/* Too late to reply */
+	CU_ASSERT_FALSE (courier_reply (b, 1, XMMS_C2C_REPLY_POLICY_NO_REPLY));
+}
+
+CASE (test_timeout_thread)
+{
+	GMainLoop *loop;
+	GThread *thread;
+	gint32 ids[2];
+
+	ids[0] = connect_client (0);
+	ids[1] = connect_client (1);
+
+	set_reply_timeout ("1");
+
+	/* Messages sent from other threads expire while the main loop sleeps */
+	loop = g_main_loop_new (NULL, FALSE);
+	g_timeout_add (2000, quit_main_loop, loop);
+
+	thread = g_thread_new ("courier-test", send_from_thread, ids);
+	g_main_loop_run (loop);
+	CU_ASSERT_EQUAL (1, GPOINTER_TO_INT (g_thread_join (thread)));
+	g_main_loop_unref (loop);
+
+	CU_ASSERT_EQUAL (1, get_stat ("expired"));
+	CU_ASSERT_EQUAL (0, get_stat ("pending"));
+}
+
+CASE (test_timeout_change)
+{
+	gint32 a, b;
+
+	a = connect_client (0);
+	b = connect_client (1);
+
+	/* Messages sent without a timeout expire once one is set */
+	CU_ASSERT_TRUE (courier_send (a, b, XMMS_C2C_REPLY_POLICY_SINGLE_REPLY));
+	set_reply_timeout ("60");
+	CU_ASSERT_TRUE (courier_send (a, b, XMMS_C2C_REPLY_POLICY_SINGLE_REPLY));
+
+	/* Lowering the timeout applies to the messages already sent */
+	set_reply_timeout ("1");
+	wait_for_stat ("expired", 2);
+	CU_ASSERT_EQUAL (2, get_stat ("expired"));
+	CU_ASSERT_EQUAL (0, get_stat ("pending"));
+
+	/* Removing the timeout cancels the expiry */
+	CU_ASSERT_TRUE (courier_send (a, b, XMMS_C2C_REPLY_POLICY_SINGLE_REPLY));
+	set_reply_timeout ("0");
+	run_main_loop (1500);
+	CU_ASSERT_EQUAL (1, get_stat ("pending"));
+	CU_ASSERT_EQUAL (2, get_stat ("expired"));
+}
+
+CASE (test_disconnect)
+{
+	gint32 a, b, c;
+
+	a = connect_client (0);
+	b = connect_client (1);
+	c = connect_client (2);
+
+	set_reply_timeout ("1");
+
+	CU_ASSERT_TRUE (courier_send (a, b, XMMS_C2C_REPLY_POLICY_SINGLE_REPLY));
+	CU_ASSERT_TRUE (courier_send (b, a, XMMS_C2C_REPLY_POLICY_MULTI_REPLY));
+	CU_ASSERT_TRUE (courier_send (a, c, XMMS_C2C_REPLY_POLICY_SINGLE_REPLY));
+	CU_ASSERT_TRUE (courier_send (c, a, XMMS_C2C_REPLY_POLICY_MULTI_REPLY));
+	CU_ASSERT_EQUAL (4, get_stat ("pending"));
+
+	/* Messages to and from the client are dropped, others are kept */
+	disconnect_client (1);
+	wait_for_stat ("pending", 2);
+	CU_ASSERT_EQUAL (2, get_stat ("pending"));
+
+	CU_ASSERT_TRUE (courier_reply (a, 4, XMMS_C2C_REPLY_POLICY_NO_REPLY));
+	CU_ASSERT_FALSE (courier_reply (a, 2, XMMS_C2C_REPLY_POLICY_NO_REPLY));
+
+	/* Dropped messages don't expire */
+	wait_for_stat ("expired", 1);
+	CU_ASSERT_EQUAL (1, get_stat ("expired"));
+	CU_ASSERT_EQUAL (1, get_stat ("pending"));
+
+	disconnect_client (0);
+	wait_for_stat ("pending", 0);
+	CU_ASSERT_EQUAL (0, get_stat ("pending"));
+	CU_ASSERT_EQUAL (1, get_stat ("expired"));
+	CU_ASSERT_EQUAL (0, get_stat ("replied"));
+}